@@ -0,0 +1,291 @@
+# candidates.py
+"""
+Generadores de candidatos perezosos para el motor de crack.
+
+* Máscaras estilo hashcat (`?d?d?d?d?d?d?d?d`, `WPA?u?u?d?d?d?d`, -1 ?l?d …).
+* Derivadas de los ESSID del fichero de hashes (ESSID+año, variantes, …).
+
+Todo generador expone `keyspace` y `batches(start, stop)`: cada lote es un
+bloque de bytes `cand\\n…` listo para escribir en el stdin de hashcat, así el
+espacio de claves nunca toca disco y se puede trocear por rangos (shards)
+para paralelizar o reanudar.
+"""
+from __future__ import annotations
+import string, time
+from itertools import islice, product
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+
+import wordlists
+
+BATCH = 1 << 16                       # candidatos por lote por defecto
+WPA_MIN, WPA_MAX = 8, 63
+
+CHARSETS = {
+    "l": string.ascii_lowercase.encode(),
+    "u": string.ascii_uppercase.encode(),
+    "d": string.digits.encode(),
+    "h": b"0123456789abcdef",
+    "H": b"0123456789ABCDEF",
+    "s": b" !\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~",
+}
+CHARSETS["a"] = CHARSETS["l"] + CHARSETS["u"] + CHARSETS["d"] + CHARSETS["s"]
+PLACEHOLDER = b"\x00"                 # nunca aparece en los charsets imprimibles
+
+
+def _expand(spec: str, custom: dict[str, bytes]) -> bytes:
+    """`?l?d` / literales → conjunto de bytes (sin repetidos, orden estable)."""
+    out = bytearray()
+    i = 0
+    while i < len(spec):
+        if spec[i] == "?" and i + 1 < len(spec):
+            k = spec[i + 1]
+            out += custom[k] if k in custom else CHARSETS[k] if k in CHARSETS else b"?"
+            i += 2
+        else:
+            out += spec[i].encode()
+            i += 1
+    return bytes(dict.fromkeys(out))
+
+
+class Mask:
+    """
+    Máscara hashcat. Las posiciones finales se precalculan como plantilla de
+    longitud fija; cada prefijo se materializa con un único `bytes.replace`,
+    de modo que generar un lote cuesta poco más que un memcpy.
+    """
+
+    TAIL_MAX = 1 << 17                # tamaño máximo de la plantilla (líneas)
+
+    def __init__(self, mask: str, custom: Optional[Sequence[str]] = None):
+        self.mask = mask
+        cs: dict[str, bytes] = {}
+        for n, spec in enumerate(custom or (), start=1):
+            cs[str(n)] = _expand(spec, cs)
+        self.positions: list[bytes] = []
+        i = 0
+        while i < len(mask):
+            if mask[i] == "?" and i + 1 < len(mask):
+                k = mask[i + 1]
+                if k == "?":
+                    self.positions.append(b"?")
+                elif k in cs or k in CHARSETS:
+                    self.positions.append(cs.get(k) or CHARSETS[k])
+                else:
+                    raise ValueError(f"charset desconocido ?{k}")
+                i += 2
+            else:
+                self.positions.append(mask[i].encode())
+                i += 1
+        self.width = len(self.positions)
+        self.keyspace = 1
+        for p in self.positions:
+            self.keyspace *= len(p)
+        # parte fija final (plantilla) / prefijo variable
+        t, size = self.width, 1
+        while t > 0 and size * len(self.positions[t - 1]) <= self.TAIL_MAX:
+            t -= 1
+            size *= len(self.positions[t])
+        self.split = t
+        self.tail_n = size
+        self._template: Optional[bytes] = None
+
+    def __repr__(self):
+        return f"Mask({self.mask!r}, keyspace={self.keyspace})"
+
+    @property
+    def valid(self) -> bool:
+        return WPA_MIN <= self.width <= WPA_MAX
+
+    def _tpl(self) -> bytes:
+        if self._template is None:
+            pre = PLACEHOLDER * self.split
+            self._template = b"".join(pre + bytes(c) + b"\n"
+                                      for c in product(*self.positions[self.split:]))
+        return self._template
+
+    def candidate(self, i: int) -> bytes:
+        out = bytearray()
+        for p in reversed(self.positions):
+            i, r = divmod(i, len(p))
+            out.append(p[r])
+        return bytes(reversed(out))
+
+    def _prefixes(self, first: int) -> Iterator[bytes]:
+        """Prefijos (odómetro) empezando por el nº `first`."""
+        pos = self.positions[:self.split]
+        if not pos:
+            yield b""
+            return
+        digits = []
+        for p in reversed(pos):
+            first, r = divmod(first, len(p))
+            digits.append(r)
+        digits.reverse()
+        while True:
+            yield bytes(p[d] for p, d in zip(pos, digits))
+            j = len(pos) - 1
+            while j >= 0:
+                digits[j] += 1
+                if digits[j] < len(pos[j]):
+                    break
+                digits[j] = 0
+                j -= 1
+            if j < 0:
+                return
+
+    def batches(self, start: int = 0, stop: Optional[int] = None,
+                size: int = BATCH) -> Iterator[tuple[int, bytes]]:
+        stop = self.keyspace if stop is None else min(stop, self.keyspace)
+        if start >= stop:
+            return
+        tpl, n, L = self._tpl(), self.tail_n, self.width + 1
+        hole = PLACEHOLDER * self.split
+        i = start
+        for pre in self._prefixes(start // n):
+            block = tpl.replace(hole, pre) if self.split else tpl
+            a = i % n
+            b = min(n, a + (stop - i))
+            while a < b:                        # trocea en lotes de `size`
+                e = min(b, a + size)
+                yield e - a, block[a * L:e * L]
+                i += e - a
+                a = e
+            if i >= stop:
+                return
+
+
+class WordSource:
+    """Lista en memoria (p.ej. candidatos derivados del ESSID) con la misma interfaz."""
+
+    def __init__(self, words: Iterable[bytes], name: str = "lista"):
+        self.words = [w for w in dict.fromkeys(words) if WPA_MIN <= len(w) <= WPA_MAX]
+        self.keyspace = len(self.words)
+        self.name = name
+
+    def __repr__(self):
+        return f"WordSource({self.name!r}, keyspace={self.keyspace})"
+
+    def batches(self, start: int = 0, stop: Optional[int] = None,
+                size: int = BATCH) -> Iterator[tuple[int, bytes]]:
+        stop = self.keyspace if stop is None else min(stop, self.keyspace)
+        for a in range(start, stop, size):
+            chunk = self.words[a:min(stop, a + size)]
+            yield len(chunk), b"\n".join(chunk) + b"\n"
+
+
+class FileSource:
+    """Word-list en disco (o comprimida), leída en streaming por lotes de líneas."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.keyspace = count_lines(self.path)
+
+    def __repr__(self):
+        return f"FileSource({self.path.name!r}, keyspace={self.keyspace})"
+
+    def batches(self, start: int = 0, stop: Optional[int] = None,
+                size: int = BATCH) -> Iterator[tuple[int, bytes]]:
+        stop = self.keyspace if stop is None else min(stop, self.keyspace)
+        with wordlists.open_words(self.path) as fh:
+            for _ in islice(fh, start):
+                pass
+            i = start
+            while i < stop:
+                lines = list(islice(fh, min(size, stop - i)))
+                if not lines:
+                    return
+                i += len(lines)
+                blk = b"".join(lines)
+                yield len(lines), blk if blk.endswith(b"\n") else blk + b"\n"
+
+
+def count_lines(path: str | Path) -> int:
+    n, last = 0, b"\n"
+    with wordlists.open_words(path) as fh:
+        while chunk := fh.read(1 << 20):
+            n += chunk.count(b"\n")
+            last = chunk[-1:]
+    return n + (last != b"\n")
+
+
+# ── candidatos derivados del ESSID ───────────────────────────
+SUFFIXES = [b"", b"1", b"12", b"123", b"1234", b"12345", b"123456", b"12345678",
+            b"!", b"01", b"2024!", b"wifi", b"WIFI", b"_wifi", b"pass", b"admin"]
+
+
+def essid_words(essids: Iterable[str], years: Optional[range] = None) -> Iterator[bytes]:
+    """
+    Patrones típicos de laboratorio / router doméstico a partir del ESSID:
+    variantes de mayúsculas, sin separadores, + año, + sufijos comunes, y el
+    bloque hexadecimal/numérico final que muchos routers repiten en la clave.
+    """
+    years = years or range(1990, time.localtime().tm_year + 2)
+    for essid in essids:
+        base = essid.strip()
+        if not base:
+            continue
+        parts = [p for p in base.replace("-", " ").replace("_", " ").split() if p]
+        variants = dict.fromkeys([base, base.lower(), base.upper(), base.capitalize(),
+                                  "".join(parts), "".join(parts).lower(),
+                                  *parts, *(p.lower() for p in parts)])
+        for v in variants:
+            vb = v.encode()
+            for suf in SUFFIXES:
+                yield vb + suf
+            for y in years:
+                yield vb + str(y).encode()
+                yield vb + str(y % 100).zfill(2).encode()
+        # sufijo tipo «vodafone4D78» / «MOVISTAR-WIFI6-0348»: repetido / rellenado
+        tail = parts[-1] if parts else base
+        tail = tail[-4:] if len(tail) >= 4 else tail
+        if tail.isalnum():
+            for t in (tail, tail.lower(), tail.upper()):
+                tb = t.encode()
+                yield tb * 2
+                yield (tb * 4)[:8]
+                yield tb.rjust(8, b"0")
+                yield b"12345678"[:8 - len(tb)] + tb
+
+
+# ── combinación de fuentes / shards ──────────────────────────
+class Chain:
+    """Concatena fuentes en un único espacio de índices [0, keyspace)."""
+
+    def __init__(self, sources: Sequence):
+        self.sources = [s for s in sources if s.keyspace]
+        self.keyspace = sum(s.keyspace for s in self.sources)
+
+    def __repr__(self):
+        return " + ".join(map(repr, self.sources)) or "Chain()"
+
+    def batches(self, start: int = 0, stop: Optional[int] = None,
+                size: int = BATCH) -> Iterator[tuple[int, bytes]]:
+        stop = self.keyspace if stop is None else min(stop, self.keyspace)
+        base = 0
+        for s in self.sources:
+            a, b = max(start - base, 0), min(stop - base, s.keyspace)
+            if a < b:
+                yield from s.batches(a, b, size)
+            base += s.keyspace
+            if base >= stop:
+                return
+
+
+def shards(keyspace: int, n: int, start: int = 0) -> list[tuple[int, int]]:
+    """Divide [start, keyspace) en `n` rangos contiguos casi iguales."""
+    n = max(1, n)
+    span = keyspace - start
+    cuts = [start + span * i // n for i in range(n + 1)]
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
+
+
+def bench(src, seconds: float = 2.0, size: int = BATCH) -> float:
+    """Candidatos/s que produce `src` (sin motor detrás)."""
+    n = 0
+    t0 = time.perf_counter()
+    for cnt, _ in src.batches(0, None, size):
+        n += cnt
+        if time.perf_counter() - t0 >= seconds:
+            break
+    return n / max(time.perf_counter() - t0, 1e-9)
@@ -0,0 +1,145 @@
+# cap_merge.py
+"""
+Fusión de capturas solapadas (p.ej. `bueno.pcapng` + varios `dump-*.pcapng`
+de la misma sesión) en un único pcapng.
+
+- Mezcla k-way por timestamp: un paquete en vuelo por fichero, así que la
+  memoria no depende del tamaño de las capturas.
+- Duplicados: huella del frame 802.11 (direcciones, nº de secuencia y
+  cuerpo, sin radiotap ni FCS y con el bit de retry a 0) dentro de una
+  ventana deslizante de `window` s. Dos radios que oyen el mismo frame, o
+  dos dumps que lo contienen, dejan una sola copia.
+- Con `useful` sólo pasa lo que usa hcxpcapngtool: EAPOL, (re)asociaciones
+  y un beacon / probe-response por (BSSID, ESSID). Los frames de control
+  (sin nº de secuencia) no pasan nunca.
+"""
+from __future__ import annotations
+import hashlib, heapq, struct
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import pcapng_io
+
+WINDOW = 2.0                           # s en los que un frame repetido es duplicado
+USEFUL_MGMT = {0, 2}                   # assoc / reassoc request
+BEACONS = {5, 8}                       # probe response / beacon
+
+SHB = struct.pack("<IIIHHq", pcapng_io.BT_SHB, 28, pcapng_io.BOM, 1, 0, -1) + struct.pack("<I", 28)
+
+
+def _idb(linktype: int) -> bytes:
+    """IDB sin opciones: if_tsresol por defecto = µs, que es lo que se escribe."""
+    return struct.pack("<IIHHII", pcapng_io.BT_IDB, 20, linktype, 0, 0, 20)
+
+
+def _epb(iid: int, ts: float, data: bytes) -> bytes:
+    t = int(round(ts * 1e6))
+    pad = -len(data) % 4
+    blen = 32 + len(data) + pad
+    return (struct.pack("<IIIIIII", pcapng_io.BT_EPB, blen, iid, t >> 32, t & 0xFFFFFFFF,
+                        len(data), len(data)) + data + bytes(pad) + struct.pack("<I", blen))
+
+
+def _has_fcs(linktype: int, data: bytes) -> bool:
+    """Flag "FCS al final" de radiotap (campo Flags, bit 0x10)."""
+    if linktype != pcapng_io.LT_80211_RADIOTAP or len(data) < 8:
+        return False
+    present = first = struct.unpack_from("<I", data, 4)[0]
+    o = 8
+    while present & 0x80000000 and o + 4 <= len(data):          # bitmaps extendidos
+        present = struct.unpack_from("<I", data, o)[0]
+        o += 4
+    if not first & 0x2:
+        return False
+    if first & 0x1:                                              # TSFT: 8 B alineados a 8
+        o = (o + 7) & ~7
+        o += 8
+    return o < len(data) and bool(data[o] & 0x10)
+
+
+def fingerprint(linktype: int, data: bytes) -> Optional[bytes]:
+    """Huella del frame 802.11 tal como viajó por el aire (None si está truncado)."""
+    o = pcapng_io.dot11_offset(linktype, data)
+    end = len(data) - (4 if _has_fcs(linktype, data) else 0)
+    if end < o + 24:
+        return None
+    d = bytearray(data[o:end])
+    d[1] &= ~0x08                                                # retry
+    return hashlib.blake2b(d, digest_size=12).digest()
+
+
+class Dedup:
+    """Huellas vistas en los últimos `window` s (los timestamps llegan ordenados)."""
+
+    def __init__(self, window: float = WINDOW):
+        self.window = window
+        self.seen: dict[bytes, float] = {}
+        self.order: deque[tuple[float, bytes]] = deque()
+
+    def fresh(self, ts: float, key: bytes) -> bool:
+        while self.order and self.order[0][0] < ts - self.window:
+            t, k = self.order.popleft()
+            if self.seen.get(k) == t:
+                del self.seen[k]
+        last = self.seen.get(key)
+        self.seen[key] = ts
+        self.order.append((ts, key))
+        return last is None or ts - last > self.window
+
+
+def _source(path: Path, n: int, stats: dict) -> Iterator[tuple[float, int, pcapng_io.Packet]]:
+    with pcapng_io.open_capture(path) as fh:
+        for pkt in pcapng_io.iter_packets(fh):
+            stats["read"] += 1
+            yield pkt.ts, n, pkt
+
+
+def merge(inputs: Iterable[str | Path], out: str | Path, window: float = WINDOW,
+          useful: bool = True) -> dict:
+    """Fusiona `inputs` en `out`; devuelve contadores globales y por fichero."""
+    inputs = [Path(p) for p in inputs]
+    per = {str(p): {"read": 0, "kept": 0, "dup": 0, "size": p.stat().st_size} for p in inputs}
+    dedup = Dedup(window)
+    ifaces: dict[int, int] = {}                                  # linktype → iid de salida
+    beacons: set[tuple[str, Optional[str]]] = set()
+    tot = {"read": 0, "kept": 0, "dup": 0, "skipped": 0, "beacons": 0}
+    streams = [_source(p, i, per[str(p)]) for i, p in enumerate(inputs)]
+    with pcapng_io.Writer(out) as w:
+        w.block(SHB)
+        for ts, n, pkt in heapq.merge(*streams, key=lambda x: x[0]):
+            tot["read"] += 1
+            info = pcapng_io.decode(pkt.linktype, pkt.data)
+            if info is None or info.ftype == 1:
+                tot["skipped"] += 1
+                continue
+            if useful and not info.eapol:
+                if info.ftype == 0 and info.subtype in BEACONS:
+                    ess = pcapng_io.beacon_essid(pkt.linktype, pkt.data)
+                    if (info.bssid, ess) in beacons:
+                        tot["skipped"] += 1
+                        continue
+                    beacons.add((info.bssid, ess))
+                    tot["beacons"] += 1
+                elif not (info.ftype == 0 and info.subtype in USEFUL_MGMT):
+                    tot["skipped"] += 1
+                    continue
+            key = fingerprint(pkt.linktype, pkt.data)
+            if key is None:
+                tot["skipped"] += 1
+                continue
+            if not dedup.fresh(ts, key):
+                tot["dup"] += 1
+                per[str(inputs[n])]["dup"] += 1
+                continue
+            iid = ifaces.get(pkt.linktype)
+            if iid is None:
+                iid = ifaces[pkt.linktype] = len(ifaces)
+                w.block(_idb(pkt.linktype))
+            w.packet(_epb(iid, ts, pkt.data))
+            tot["kept"] += 1
+            per[str(inputs[n])]["kept"] += 1
+    tot["size_in"] = sum(v["size"] for v in per.values())
+    tot["size_out"] = Path(out).stat().st_size
+    tot["files"] = per
+    return tot
@@ -0,0 +1,205 @@
+# capstore.py
+"""
+Capturas comprimidas: `x.pcapng.gz` / `.xz` (stdlib) y `.zst` si está
+instalado `zstandard`.
+
+- `compress`: comprime en streaming a un .tmp y lo sustituye atómicamente;
+  el original sólo se borra cuando la copia está completa.
+- `open_stream`: lectura con un hilo de readahead que descomprime por
+  delante del consumidor (cola acotada), así el parseo de bloques y el
+  códec trabajan a la vez y nunca hace falta descomprimir a disco.
+"""
+from __future__ import annotations
+import gzip, lzma, os, queue, shutil, threading
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXT = {"gz": ".gz", "xz": ".xz", "zst": ".zst"}
+LEVEL = {"gz": 6, "xz": 6, "zst": 10}
+DEFAULT = "gz"
+CHUNK = 1 << 20                       # bytes descomprimidos por lectura del hilo
+DEPTH = 8                             # chunks en cola como mucho
+
+
+def available() -> list[str]:
+    return [c for c in EXT if c != "zst" or zstandard is not None]
+
+
+def codec_of(path: str | Path) -> Optional[str]:
+    name = str(path)
+    return next((c for c, e in EXT.items() if name.endswith(e)), None)
+
+
+def is_capture(path: str | Path) -> bool:
+    name = Path(path).name
+    return name.endswith(".pcapng") or any(name.endswith(".pcapng" + e) for e in EXT.values())
+
+
+def captures(cap_dir: Path) -> list[Path]:
+    """Capturas del directorio, comprimidas o no."""
+    return sorted(p for p in cap_dir.iterdir() if is_capture(p))
+
+
+def stem(path: str | Path) -> str:
+    """Nombre sin la extensión del códec (`a.pcapng.gz` → `a.pcapng`)."""
+    c = codec_of(path)
+    return Path(path).name[:-len(EXT[c])] if c else Path(path).name
+
+
+# ── códecs ───────────────────────────────────────────────────
+def _reader(path: Path, codec: str) -> BinaryIO:
+    if codec == "gz":
+        return gzip.open(path, "rb")
+    if codec == "xz":
+        return lzma.open(path, "rb")
+    if zstandard is None:
+        raise RuntimeError(f"{path.name}: hace falta `pip install zstandard`")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+def _writer(path: Path, codec: str, level: Optional[int]) -> BinaryIO:
+    level = LEVEL[codec] if level is None else level
+    if codec == "gz":
+        return gzip.open(path, "wb", compresslevel=level)
+    if codec == "xz":
+        return lzma.open(path, "wb", preset=level)
+    if zstandard is None:
+        raise RuntimeError("zstd no disponible: `pip install zstandard`")
+    return zstandard.ZstdCompressor(level=level).stream_writer(open(path, "wb"), closefd=True)
+
+
+def compress(path: str | Path, codec: str = DEFAULT, level: Optional[int] = None,
+             keep: bool = False) -> Path:
+    """`x.pcapng` → `x.pcapng.<códec>` (conserva el mtime); devuelve la ruta nueva."""
+    path = Path(path)
+    dst = path.with_name(path.name + EXT[codec])
+    tmp = dst.with_name(dst.name + ".tmp")
+    try:
+        with open(path, "rb") as src, _writer(tmp, codec, level) as out:
+            shutil.copyfileobj(src, out, CHUNK)
+        shutil.copystat(path, tmp)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+    if not keep:
+        path.unlink()
+    return dst
+
+
+# ── lectura con readahead ────────────────────────────────────
+class ReadAhead:
+    """
+    Fichero de sólo lectura sobre un descompresor que corre en otro hilo.
+    `seek` hacia delante descarta; hacia atrás reabre y vuelve a avanzar
+    (correcto pero caro: los lectores de este repo sólo avanzan).
+    """
+
+    def __init__(self, opener: Callable[[], BinaryIO], chunk: int = CHUNK, depth: int = DEPTH):
+        self.opener, self.chunk, self.depth = opener, chunk, depth
+        self._start()
+
+    def _start(self):
+        self.src = self.opener()
+        self.q: queue.Queue = queue.Queue(self.depth)
+        self.halt = threading.Event()
+        self.buf, self.off, self.pos, self.eof = b"", 0, 0, False
+        self.th = threading.Thread(target=self._fill, daemon=True)
+        self.th.start()
+
+    def _fill(self):
+        try:
+            while not self.halt.is_set():
+                data = self.src.read(self.chunk)
+                self._put(data)
+                if not data:
+                    return
+        except EOFError:                      # comprimido truncado: lo leído vale
+            self._put(b"")
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self.halt.is_set():
+            try:
+                self.q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        item = self.q.get()
+        if isinstance(item, Exception):
+            self.eof = True
+            raise item
+        if not item:
+            self.eof = True
+            return False
+        self.buf, self.off = self.buf[self.off:] + item, 0
+        return True
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            while self._more():
+                pass
+            n = len(self.buf) - self.off
+        while len(self.buf) - self.off < n and self._more():
+            pass
+        out = self.buf[self.off:self.off + n]
+        self.off += len(out)
+        self.pos += len(out)
+        return out
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 2:
+            raise OSError("seek desde el final no soportado en una captura comprimida")
+        target = offset if whence == 0 else self.pos + offset
+        if target < self.pos:
+            self.close()
+            self._start()
+        left = target - self.pos
+        while left > 0:
+            avail = len(self.buf) - self.off
+            if avail >= left:
+                self.off += left
+                self.pos += left
+                break
+            self.pos += avail
+            left -= avail
+            self.buf, self.off = b"", 0
+            if not self._more():
+                break
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+    def close(self):
+        self.halt.set()
+        try:
+            while True:
+                self.q.get_nowait()
+        except queue.Empty:
+            pass
+        self.th.join()
+        self.src.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_stream(path: str | Path, readahead: bool = True) -> BinaryIO:
+    path = Path(path)
+    codec = codec_of(path)
+    if readahead:
+        return ReadAhead(lambda: _reader(path, codec))
+    return _reader(path, codec)
@@ -0,0 +1,323 @@
+# channel_plan.py
+"""
+Reparto del tiempo de captura entre canales.
+
+`DwellPlanner` decide en qué canal escuchar y cuánto. Cada canal tiene una
+tasa estimada de capturas útiles nuevas (PMKID de un AP o EAPOL de un par
+AP↔cliente aún no visto) por segundo de escucha: parte de la densidad que
+vio el escáner (APs + clientes) y se corrige con lo que se va capturando,
+olvidando lo antiguo (los pares ya capturados no vuelven a contar, así que
+un canal "agotado" pierde peso solo). El tiempo se reparte en proporción a
+esas tasas (con un mínimo para seguir explorando) por deficit round-robin.
+
+El cambio de canal va por un único camino de control de larga vida
+(`open_tuner`): ioctl SIOCSIWFREQ si el proceso es root, o un `sudo sh`
+persistente al que se le escriben los `iw … set channel`, en vez de un
+`sudo iw` nuevo por salto. `SimRadio` + `simulate` reproducen una banda con
+APs y clientes para comparar contra el salto fijo sin hardware.
+"""
+from __future__ import annotations
+import bisect, fcntl, math, os, random, shlex, socket, struct, subprocess, threading, time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pcapng_io
+
+MIN_DWELL = 2.0                       # s (hcxdumptool necesita unos s para sacar un PMKID)
+MAX_DWELL = 10.0
+CYCLE = 30.0                          # s: una "vuelta" reparte esto según las cuotas
+PRIOR_S = 60.0                        # s de escucha "virtuales" que vale la densidad del escáner
+PRIOR_RATE = 0.01                     # capturas/s esperadas por AP (+2× por cliente)
+EXPLORE = 0.05                        # cuota mínima (× la media) para no abandonar un canal
+HALF_LIFE = 300.0                     # s: vida media de lo aprendido
+CHANNELS_24 = list(range(1, 14))
+
+
+# ── planificador ─────────────────────────────────────────────
+class DwellPlanner:
+    def __init__(self, channels: Iterable[int] = (), density: Optional[dict] = None):
+        """
+        `density`: {canal: (aps, clientes)} del escáner (claves int o str). Con
+        ella sólo se reparten los canales donde hay algo (+ `channels`); sin
+        ella, todos los de `channels` por igual hasta que haya capturas.
+        """
+        d = {int(k): v for k, v in (density or {}).items() if sum(v)}
+        self.channels = sorted(set(channels) | set(d)) if d else sorted(set(channels))
+        self.hits: dict[int, float] = {}
+        self.time: dict[int, float] = {}
+        self.used: dict[int, float] = {c: 0.0 for c in self.channels}
+        for c in self.channels:
+            aps, clients = d.get(c, (0, 0)) if d else (1, 0)
+            self.hits[c] = PRIOR_RATE * (aps + 2 * clients) * PRIOR_S
+            self.time[c] = PRIOR_S
+        self.elapsed = 0.0
+
+    def rate(self, ch: int) -> float:
+        """Capturas nuevas por s de escucha (media a posteriori)."""
+        return self.hits[ch] / self.time[ch]
+
+    def shares(self) -> dict[int, float]:
+        r = {c: self.rate(c) for c in self.channels}
+        floor = EXPLORE * (sum(r.values()) / len(r) or 1.0)
+        w = {c: v + floor for c, v in r.items()}
+        tot = sum(w.values())
+        return {c: v / tot for c, v in w.items()}
+
+    def _decay(self, secs: float):
+        f = 0.5 ** (secs / HALF_LIFE)
+        for c in self.channels:
+            self.hits[c] *= f
+            self.time[c] = max(1.0, self.time[c] * f)
+            self.used[c] *= f
+
+    def next(self) -> tuple[int, float]:
+        """(canal, s de escucha): el canal más por debajo de su cuota (deficit round-robin)."""
+        sh = self.shares()
+        used = sum(self.used.values())
+        ch = max(self.channels, key=lambda c: sh[c] * (used + CYCLE) - self.used[c])
+        return ch, min(MAX_DWELL, max(MIN_DWELL, sh[ch] * CYCLE))
+
+    def spent(self, ch: int, secs: float):
+        self._decay(secs)
+        self.time[ch] += secs
+        self.used[ch] += secs
+        self.elapsed += secs
+
+    def credit(self, ch: int, n: int = 1):
+        if ch in self.hits:
+            self.hits[ch] += n
+
+    def drop(self, ch: int):
+        """Canal que el driver no acepta: fuera del reparto."""
+        if ch in self.channels and len(self.channels) > 1:
+            self.channels.remove(ch)
+
+
+class FixedHop:
+    """Salto fijo (lo que hace hcxdumptool con -t): misma escucha en cada canal, en orden."""
+
+    def __init__(self, channels: Iterable[int], dwell: float = 5.0):
+        self.channels = list(channels)
+        self.dwell = dwell
+        self.i = -1
+
+    def next(self) -> tuple[int, float]:
+        self.i = (self.i + 1) % len(self.channels)
+        return self.channels[self.i], self.dwell
+
+    def spent(self, ch: int, secs: float):
+        pass
+
+    def credit(self, ch: int, n: int = 1):
+        pass
+
+    def drop(self, ch: int):
+        if len(self.channels) > 1:
+            self.channels.remove(ch)
+
+
+# ── camino de control ────────────────────────────────────────
+class WextTuner:
+    """SIOCSIWFREQ sobre un socket abierto una vez (root; cfg80211 lo traduce a nl80211)."""
+    SIOCSIWFREQ = 0x8B04
+    IW_FREQ_FIXED = 0x01
+
+    def __init__(self, iface: str):
+        self.iface = iface
+        self.name = os.fsencode(iface)[:15]
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def set(self, ch: int):
+        # struct iwreq: ifr_name[16] + iw_freq {s32 m; s16 e; u8 i; u8 flags}
+        req = struct.pack("16sihBB", self.name, ch, 0, 0, self.IW_FREQ_FIXED).ljust(32, b"\0")
+        fcntl.ioctl(self.sock, self.SIOCSIWFREQ, req)
+
+    def close(self):
+        self.sock.close()
+
+
+class ShellTuner:
+    """Un `sudo sh` de larga vida: sólo se ejecuta `iw`, sin sudo/PAM por salto."""
+
+    def __init__(self, iface: str):
+        self.iface = iface
+        cmd = ["sh"] if os.geteuid() == 0 else ["sudo", "sh"]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     text=True, bufsize=1)
+
+    def set(self, ch: int):
+        self.proc.stdin.write(f"iw dev {shlex.quote(self.iface)} set channel {int(ch)} 2>/dev/null; echo $?\n")
+        self.proc.stdin.flush()
+        rc = self.proc.stdout.readline().strip()
+        if rc != "0":
+            raise OSError(f"iw set channel {ch}: {rc or 'shell cerrado'}")
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+
+
+def open_tuner(iface: str, first: int):
+    """ioctl si se puede; si no (sin root o driver sin WEXT), el shell persistente."""
+    if os.geteuid() == 0:
+        t = WextTuner(iface)
+        try:
+            t.set(first)
+            return t
+        except OSError:
+            t.close()
+    t = ShellTuner(iface)
+    t.set(first)
+    return t
+
+
+# ── realimentación desde la captura ──────────────────────────
+def useful_key(info: pcapng_io.FrameInfo) -> Optional[tuple]:
+    """Qué aporta un frame: PMKID de un AP o el M2/M4 de un par AP↔cliente."""
+    if info.pmkid:
+        return ("pmkid", info.bssid)
+    if info.eapol in (2, 4):
+        return ("eapol", info.bssid, info.client)
+    return None
+
+
+class CaptureTail:
+    """Lee los bloques nuevos de un pcapng que hcxdumptool sigue escribiendo."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.off = 0
+        self.lt = pcapng_io.LT_80211_RADIOTAP
+        self.res = 1e-6
+
+    def poll(self) -> list[tuple[float, tuple]]:
+        """(ts, clave útil) de los frames nuevos; un bloque a medias se relee después."""
+        out = []
+        try:
+            fh = open(self.path, "rb")
+        except OSError:
+            return out
+        with fh:
+            fh.seek(self.off)
+            for btype, _, raw, end in pcapng_io.iter_blocks(fh):
+                self.off += len(raw)
+                if btype == pcapng_io.BT_IDB:
+                    self.lt = struct.unpack_from(end + "H", raw, 8)[0]
+                    self.res = pcapng_io._tsresol(raw[16:-4], end)
+                elif btype == pcapng_io.BT_EPB:
+                    _, th, tl, caplen = struct.unpack_from(end + "IIII", raw, 8)
+                    info = pcapng_io.decode(self.lt, raw[28:28 + caplen])
+                    key = useful_key(info) if info and info.eapol else None
+                    if key:
+                        out.append((((th << 32) | tl) * self.res, key))
+        return out
+
+
+class Hopper(threading.Thread):
+    """
+    Hilo de saltos durante la captura: pide canal/escucha al planificador,
+    sintoniza y, al acabar cada escucha, atribuye lo capturado al canal en el
+    que estaba la interfaz según el timestamp de cada frame.
+    """
+
+    def __init__(self, planner, tuner, current: Callable[[], Optional[Path]],
+                 on_hop: Optional[Callable[[int, float], None]] = None):
+        super().__init__(daemon=True)
+        self.planner, self.tuner, self.current, self.on_hop = planner, tuner, current, on_hop
+        self.stop = threading.Event()
+        self.seen: set[tuple] = set()
+        self.hops, self.useful = 0, 0
+        self.log_t: list[float] = []                  # inicio de cada escucha (epoch)
+        self.log_ch: list[int] = []
+        self.tail: Optional[CaptureTail] = None
+
+    def _channel_at(self, ts: float) -> Optional[int]:
+        i = bisect.bisect_right(self.log_t, ts) - 1
+        return self.log_ch[i] if i >= 0 else None
+
+    def _collect(self):
+        path = self.current()
+        if path is None:
+            return
+        if self.tail is None or self.tail.path != Path(path):
+            self.tail = CaptureTail(path)
+        for ts, key in self.tail.poll():
+            if key not in self.seen:
+                self.seen.add(key)
+                self.useful += 1
+                ch = self._channel_at(ts)
+                if ch is not None:
+                    self.planner.credit(ch)
+
+    def run(self):
+        while not self.stop.is_set():
+            ch, dwell = self.planner.next()
+            try:
+                self.tuner.set(ch)
+            except OSError:
+                self.planner.drop(ch)
+                self.stop.wait(0.5)
+                continue
+            self.hops += 1
+            self.log_t.append(time.time())
+            self.log_ch.append(ch)
+            if self.on_hop:
+                self.on_hop(ch, dwell)
+            t0 = time.monotonic()
+            self.stop.wait(dwell)
+            self.planner.spent(ch, time.monotonic() - t0)
+            self._collect()
+
+
+# ── simulación ───────────────────────────────────────────────
+class SimRadio:
+    """
+    Banda simulada. `layout` = {canal: (aps, clientes_por_ap)}. Cada par
+    AP↔cliente hace un handshake cada ~`reconnect` s (Poisson) y una parte
+    de los APs entrega su PMKID tras ~`pmkid_delay` s de escucha en su canal.
+    Sólo se captura lo que ocurre en el canal sintonizado.
+    """
+
+    def __init__(self, layout: dict[int, tuple[int, int]], reconnect: float = 300.0,
+                 pmkid_frac: float = 0.5, pmkid_delay: float = 2.0, seed: int = 1):
+        self.rng = random.Random(seed)
+        self.reconnect, self.pmkid_delay = reconnect, pmkid_delay
+        self.pairs: dict[int, list[tuple[str, str]]] = {}
+        self.pmkid_aps: dict[int, list[str]] = {}
+        for ch, (aps, clients) in layout.items():
+            names = [f"ap{ch}-{i}" for i in range(aps)]
+            self.pairs[ch] = [(a, f"{a}-c{j}") for a in names for j in range(clients)]
+            self.pmkid_aps[ch] = [a for a in names if self.rng.random() < pmkid_frac]
+
+    def listen(self, ch: int, dwell: float) -> list[tuple]:
+        out = []
+        p = 1 - math.exp(-dwell / self.reconnect)
+        for a, c in self.pairs.get(ch, ()):
+            if self.rng.random() < p:
+                out.append(("eapol", a, c))
+        q = 1 - math.exp(-dwell / self.pmkid_delay)
+        for a in self.pmkid_aps.get(ch, ()):
+            if self.rng.random() < q:
+                out.append(("pmkid", a))
+        return out
+
+
+def simulate(layout: dict[int, tuple[int, int]], policy, seconds: float = 1800.0,
+             hop_cost: float = 0.01, seed: int = 1, **radio) -> dict:
+    """Corre `policy` (DwellPlanner / FixedHop) contra SimRadio; `hop_cost` = s muertos por salto."""
+    sim = SimRadio(layout, seed=seed, **radio)
+    seen: set[tuple] = set()
+    t, hops = 0.0, 0
+    while t < seconds:
+        ch, dwell = policy.next()
+        dwell = min(dwell, seconds - t)
+        t += hop_cost + dwell
+        hops += 1
+        new = [k for k in sim.listen(ch, dwell) if k not in seen]
+        seen.update(new)
+        policy.spent(ch, dwell)
+        policy.credit(ch, len(new))
+    hs = sum(1 for k in seen if k[0] == "eapol")
+    return {"seconds": seconds, "hops": hops, "handshakes": hs, "pmkids": len(seen) - hs,
+            "per_min": len(seen) / (seconds / 60)}
@@ -0,0 +1,439 @@
+# cluster.py
+"""
+Crack repartido entre varias máquinas del laboratorio.
+
+Un coordinador TCP trocea (hashes, fuente de candidatos) en unidades de
+trabajo por rango del espacio de claves; los workers las alquilan con un
+plazo (lease), mandan latidos mientras su hashcat trabaja y devuelven lo
+hallado. Un lease vencido (worker caído, red cortada) vuelve a la cola.
+
+Protocolo: una línea JSON por mensaje sobre una conexión persistente.
+
+    worker → {"op": "hello", "worker": id, "token": …}   ← {"job": {source, hashes, rev}}
+    worker → {"op": "lease", "rev": n}                    ← {"unit": {id, a, b}} | {"wait": s} | {"done": true}
+    worker → {"op": "beat", "unit": id, "found": […], "status": {…}}  ← {"ok": true, "cancel": bool}
+    worker → {"op": "result", "unit": id, "found": […]}   ← {"ok": true}
+
+Fuentes: word-list (rangos de bytes alineados a línea; cada worker necesita
+la misma word-list en local) o máscara (rangos de índices, se genera en el
+propio worker). Una word-list comprimida se trocea en bytes del contenido
+descomprimido: el coordinador la recorre una vez para fijar los cortes y
+cada worker descomprime en streaming hasta su rango.
+"""
+from __future__ import annotations
+import hmac, ipaddress, json, mmap, multiprocessing, os, socket, socketserver
+import tempfile, threading, time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Optional
+
+import candidates, crack_engine, hash22000, results, sharding, telemetry, wordlists, wpa_crypto
+
+PORT = 7722
+BIND = "127.0.0.1"                    # fuera de loopback solo con token
+LEASE = 120.0                         # s sin latido antes de reasignar una unidad
+BEAT = 10.0                           # s entre latidos del worker
+UNIT_BYTES = 32 << 20                 # tamaño de unidad para word-lists
+UNIT_CANDS = 1 << 24                  # tamaño de unidad para máscaras
+
+
+# ── unidades de trabajo ──────────────────────────────────────
+def wordlist_source(path: str | Path) -> dict:
+    path = Path(path)
+    return {"kind": "wordlist", "path": str(path), "size": path.stat().st_size,
+            "packed": wordlists.is_packed(path)}
+
+
+def mask_source(mask: str, custom: Optional[list[str]] = None) -> dict:
+    return {"kind": "mask", "mask": mask, "custom": list(custom or [])}
+
+
+def units(source: dict, size: Optional[int] = None) -> list[tuple[int, int]]:
+    """Rangos [a, b) de la fuente: bytes alineados a línea o índices de máscara."""
+    if source["kind"] == "mask":
+        ks = candidates.Mask(source["mask"], source["custom"]).keyspace
+        return candidates.shards(ks, -(-ks // (size or UNIT_CANDS)))
+    if not source["size"]:
+        return []
+    size = size or UNIT_BYTES
+    if source.get("packed"):
+        cuts = wordlists.cuts(source["path"], size)
+        return [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
+    with open(source["path"], "rb") as fh, \
+         mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        cuts = sorted({sharding.align(mm, p, len(mm)) for p in range(0, len(mm), size)} | {len(mm)})
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
+
+
+def loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ── coordinador ──────────────────────────────────────────────
+class Coordinator:
+    """Estado central: cola de unidades, leases vigentes y hashes pendientes."""
+
+    def __init__(self, hashf: str | Path, source: dict, work: list[tuple[int, int]],
+                 lease: float = LEASE, token: Optional[str] = None,
+                 on_found: Optional[Callable[[str, str], None]] = None,
+                 on_unit: Optional[Callable[[int], None]] = None,
+                 tel: Optional[telemetry.Telemetry] = None):
+        self.hashf = str(hashf)
+        self.source = source
+        self.units = work
+        self.lease = lease
+        self.token = token
+        self.on_found = on_found
+        self.on_unit = on_unit
+        self.tel = tel                        # estado hashcat que llega en los latidos
+        self.remaining = {h.mic: h for h in hash22000.read(hashf)}
+        self.pending = deque(range(len(work)))
+        self.leases: dict[int, list] = {}     # unidad → [worker, vencimiento]
+        self.done: set[int] = set()
+        self.found: dict[str, tuple[str, str]] = {}
+        self.per_worker: dict[str, int] = {}
+        self.reissued = 0
+        self.rejected = 0                     # resultados de workers que no verifican
+        self.rev = 0
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self._check()
+
+    @property
+    def complete(self) -> bool:
+        return not self.remaining or len(self.done) == len(self.units)
+
+    def _check(self):
+        if self.complete:
+            self.finished.set()
+
+    def _expire(self):
+        now = time.monotonic()
+        for u, (w, deadline) in list(self.leases.items()):
+            if deadline < now:
+                del self.leases[u]
+                self.pending.appendleft(u)
+                self.reissued += 1
+
+    def _add_found(self, lines: list[str]):
+        """Acepta lo hallado solo si la contraseña corresponde a su hash (PMK)."""
+        new = []
+        for line in lines:
+            hit = crack_engine.parse_found(line)
+            mic = line.split(":", 1)[0].lower()
+            if not hit or mic not in self.remaining:
+                continue
+            h = self.remaining[mic]
+            # None = tipo que no se comprueba aquí (AES-CMAC): se acepta como hashcat
+            if wpa_crypto.verify(h, wpa_crypto.pmk(results.unhex(hit[1]), bytes.fromhex(h.essid))) is False:
+                self.rejected += 1
+                continue
+            del self.remaining[mic]
+            self.found[mic] = hit
+            new.append(line)
+            if self.on_found:
+                self.on_found(*hit)
+        if new:
+            self.rev += 1
+            crack_engine.record(self.hashf, new)
+
+    def job(self) -> dict:
+        return {"source": self.source, "rev": self.rev,
+                "hashes": [h.raw for h in self.remaining.values()]}
+
+    # ── operaciones del protocolo ────────────────────────────
+    def handle(self, worker: str, msg: dict) -> dict:
+        op = msg.get("op")
+        with self.lock:
+            if op == "lease":
+                if self.complete:
+                    return {"done": True}
+                self._expire()
+                reply: dict = {}
+                if msg.get("rev") != self.rev:
+                    reply["job"] = self.job()
+                if not self.pending:
+                    reply["wait"] = min(5.0, self.lease / 4)
+                    return reply
+                u = self.pending.popleft()
+                self.leases[u] = [worker, time.monotonic() + self.lease]
+                a, b = self.units[u]
+                reply["unit"] = {"id": u, "a": a, "b": b}
+                return reply
+            if op == "beat":
+                self._add_found(msg.get("found", []))
+                u = msg.get("unit")
+                if u in self.leases and self.leases[u][0] == worker:
+                    self.leases[u][1] = time.monotonic() + self.lease
+                st = msg.get("status")
+                if self.tel and st and st != self.tel.latest.get(worker):   # sin repetir muestra
+                    self.tel.add(worker, st)
+                self._check()
+                return {"ok": True, "cancel": not self.remaining}
+            if op == "result":
+                self._add_found(msg.get("found", []))
+                u = msg.get("unit")
+                if isinstance(u, int) and 0 <= u < len(self.units) and u not in self.done:
+                    self.done.add(u)
+                    self.leases.pop(u, None)
+                    if u in self.pending:                 # re-emitida pero ya hecha
+                        self.pending.remove(u)
+                    a, b = self.units[u]
+                    self.per_worker[worker] = self.per_worker.get(worker, 0) + b - a
+                    if self.on_unit:
+                        self.on_unit(u)
+                if self.tel:
+                    self.tel.finish(worker)
+                self._check()
+                return {"ok": True}
+        return {"error": f"op desconocida {op!r}"}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        with self.server.coord.lock:
+            self.server.active += 1
+
+    def finish(self):
+        with self.server.coord.lock:
+            self.server.active -= 1
+        super().finish()
+
+    def handle(self):
+        coord: Coordinator = self.server.coord
+        worker = None
+        for raw in self.rfile:
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                break
+            if worker is None:
+                tok = coord.token or ""
+                if msg.get("op") != "hello" or not hmac.compare_digest(str(msg.get("token") or ""), tok):
+                    self._send({"error": "hello/token inválido"})
+                    break
+                worker = f"{msg.get('worker') or 'w'}@{self.client_address[0]}"
+                with coord.lock:
+                    self._send({"job": coord.job()})
+                continue
+            self._send(coord.handle(worker, msg))
+
+    def _send(self, obj: dict):
+        self.wfile.write(json.dumps(obj).encode() + b"\n")
+
+
+class Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, coord: Coordinator, bind: tuple[str, int] = (BIND, PORT)):
+        if not coord.token and not loopback(bind[0]):
+            raise ValueError(f"escuchar en {bind[0]} sin token expone los hashes a la red")
+        self.coord = coord
+        self.active = 0                       # conexiones de workers abiertas
+        super().__init__(bind, _Handler)
+
+    def serve(self, poll: float = 0.5, grace: float = 15.0) -> dict:
+        """
+        Atiende hasta completar (todo crackeado o todas las unidades hechas) y
+        espera hasta `grace` s a que los workers conectados reciban el `done`.
+        """
+        th = threading.Thread(target=self.serve_forever, args=(poll,), daemon=True)
+        th.start()
+        t0 = time.perf_counter()
+        try:
+            while not self.coord.finished.wait(poll):
+                pass
+            elapsed = time.perf_counter() - t0
+            deadline = time.monotonic() + grace
+            while self.active and time.monotonic() < deadline:
+                time.sleep(0.1)
+        finally:
+            self.shutdown()
+            self.server_close()
+        c = self.coord
+        return {"elapsed": elapsed, "units": len(c.units), "done": len(c.done),
+                "reissued": c.reissued, "rejected": c.rejected, "found": len(c.found), "per_worker": dict(c.per_worker)}
+
+
+# ── worker ───────────────────────────────────────────────────
+class _Conn:
+    def __init__(self, host: str, port: int, retry: float):
+        deadline = time.monotonic() + retry
+        while True:
+            try:
+                self.sock = socket.create_connection((host, port), timeout=30)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+        self.rfile = self.sock.makefile("rb")
+        self.lock = threading.Lock()
+
+    def call(self, **msg) -> dict:
+        with self.lock:
+            self.sock.sendall(json.dumps(msg).encode() + b"\n")
+            line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("coordinador desconectado")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ConnectionError(reply["error"])
+        return reply
+
+    def close(self):
+        self.sock.close()
+
+
+def _read_new(path: str, seen: list[int]) -> list[str]:
+    """Líneas completas añadidas a `path` desde la última lectura."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(seen[0])
+            data = f.read()
+    except OSError:
+        return []
+    data = data[:data.rfind(b"\n") + 1]
+    seen[0] += len(data)
+    return data.decode(errors="replace").splitlines()
+
+
+def _feed(proc, source: dict, a: int, b: int, wordlist: Optional[str]):
+    if source["kind"] == "mask":
+        for _, blk in candidates.Mask(source["mask"], source["custom"]).batches(a, b):
+            proc.stdin.write(blk)
+        return
+    path = wordlist or source["path"]
+    if os.path.getsize(path) != source["size"]:
+        raise RuntimeError(f"{path}: la word-list local no coincide con la del coordinador")
+    if source.get("packed"):
+        for piece in wordlists.iter_range(path, a, b):
+            proc.stdin.write(piece)
+        return
+    with open(path, "rb") as fh, \
+         mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        sharding.write_range(proc.stdin, mm, a, b)
+
+
+def work(host: str, port: int = PORT, name: Optional[str] = None, token: Optional[str] = None,
+         wordlist: Optional[str] = None, devices: Optional[str] = None,
+         cores: Optional[set[int]] = None, beat: float = BEAT, retry: float = 30.0,
+         extra: Optional[list[str]] = None) -> dict:
+    """
+    Bucle del worker: alquila unidades hasta que el coordinador diga `done`.
+    `wordlist` = ruta local si difiere de la del coordinador.
+    """
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    conn = _Conn(host, port, retry)
+    stats = {"units": 0, "found": 0}
+    with tempfile.TemporaryDirectory(prefix="wpa2lab-w-") as tmp:
+        hashf = os.path.join(tmp, "job.22000")
+        source, rev = None, None
+        try:
+            reply = conn.call(op="hello", worker=name, token=token)
+            while not reply.get("done"):
+                if "job" in reply:                # hashes pendientes (cambian al crackear)
+                    job = reply["job"]
+                    source, rev = job["source"], job["rev"]
+                    Path(hashf).write_text("".join(h + "\n" for h in job["hashes"]))
+                if "unit" in reply:
+                    stats["found"] += _run_unit(conn, hashf, source, reply["unit"], tmp,
+                                                wordlist, devices, cores, beat, extra or [])
+                    stats["units"] += 1
+                elif "wait" in reply:
+                    time.sleep(reply["wait"])
+                reply = conn.call(op="lease", rev=rev)
+        finally:
+            conn.close()
+    return stats
+
+
+def _run_unit(conn: _Conn, hashf: str, source: dict, unit: dict, tmp: str,
+              wordlist: Optional[str], devices: Optional[str], cores: Optional[set[int]],
+              beat: float, extra: list[str]) -> int:
+    out = os.path.join(tmp, f"found-{unit['id']}")
+    seen = [0]
+    dev = ["-d", devices] if devices else []
+    tel = telemetry.Telemetry()
+    proc = crack_engine.launch(
+        ["-m", "22000", hashf, "--quiet", "--potfile-disable",
+         "--session", f"wpa2lab-w{os.getpid()}", "-o", out, "--outfile-format", "1,2",
+         *dev, *extra], tel,
+        cores=cores)
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(beat):
+            try:
+                r = conn.call(op="beat", unit=unit["id"], found=_read_new(out, seen),
+                              status=tel.latest.get("0"))
+            except (OSError, ConnectionError):
+                return
+            if r.get("cancel"):
+                proc.kill()                       # ya no queda nada que crackear
+                return
+    th = threading.Thread(target=heartbeat, daemon=True)
+    th.start()
+    try:
+        _feed(proc, source, unit["a"], unit["b"], wordlist)
+    except (BrokenPipeError, OSError):
+        pass
+    finally:
+        try:
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        proc.wait()
+        stop.set()
+        th.join()
+    found = _read_new(out, seen)
+    conn.call(op="result", unit=unit["id"], found=found)
+    return len(found)
+
+
+# ── banco de pruebas local ───────────────────────────────────
+def _local_worker(port: int, n: int, cores: Optional[set[int]], token: Optional[str],
+                  beat: float):
+    work("127.0.0.1", port, name=f"local{n}", token=token, cores=cores, beat=beat)
+
+
+def local(hashf: str | Path, source: dict, n: int, unit: Optional[int] = None,
+          lease: float = LEASE, beat: float = BEAT) -> dict:
+    """Coordinador + `n` workers locales (cada uno fijado a un grupo de cores)."""
+    work_units = units(source, unit)
+    coord = Coordinator(hashf, source, work_units, lease=lease)
+    srv = Server(coord, ("127.0.0.1", 0))
+    port = srv.server_address[1]
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_local_worker, daemon=True,
+                         args=(port, i, g if n > 1 else None, None, beat))
+             for i, g in enumerate(sharding.cpu_groups(n))]
+    for p in procs:
+        p.start()
+    try:
+        st = srv.serve()
+    finally:
+        for p in procs:
+            p.join(5)
+            if p.is_alive():
+                p.terminate()
+    span = sum(b - a for a, b in work_units)
+    st.update(workers=n, span=span, rate=span / st["elapsed"] if st["elapsed"] else 0.0)
+    return st
+
+
+def bench(hashf: str | Path, source: dict, counts: list[int], unit: Optional[int] = None) -> list[dict]:
+    """Throughput con 1, 2, 4… workers locales sobre el mismo trabajo."""
+    rows = []
+    for n in counts:
+        st = local(hashf, source, n, unit)
+        st["speedup"] = st["rate"] / rows[0]["rate"] if rows and rows[0]["rate"] else 1.0
+        rows.append(st)
+    return rows
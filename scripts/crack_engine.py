@@ -0,0 +1,190 @@
+# crack_engine.py
+"""
+Motor de crack: envoltorio fino sobre hashcat -m 22000.
+
+Los candidatos se escriben en el stdin de hashcat (modo straight sin
+diccionario), así cualquier generador de `candidates` alimenta al motor sin
+pasar por disco. Con varios workers cada uno recibe un rango del espacio de
+claves; el progreso por rango se guarda en `<hash>.resume.json` para poder
+reanudar tras Ctrl-C.
+"""
+from __future__ import annotations
+import json, os, subprocess, threading, time
+from pathlib import Path
+from typing import Callable, Optional
+
+import candidates, telemetry
+
+HASHCAT = os.environ.get("WPA2LAB_HASHCAT", "hashcat")
+
+
+def parse_found(line: str) -> Optional[tuple[str, str]]:
+    """
+    Línea de --show / --outfile-format 1,2 en 22000:
+    PMKID|MIC:MAC_AP:MAC_CLIENTE:ESSID:contraseña (la contraseña puede llevar ':').
+    """
+    parts = line.rstrip("\n").split(":")
+    if len(parts) >= 5:
+        return parts[3], ":".join(parts[4:])
+    return None
+
+
+def cracked_path(hashf: str | Path) -> Path:
+    """Resultados devueltos por workers remotos o por un crack multi-hash (formato --show)."""
+    return Path(f"{hashf}.cracked")
+
+
+def record(hashf: str | Path, lines: list[str]):
+    with open(cracked_path(hashf), "a") as fh:
+        fh.writelines(l.rstrip("\n") + "\n" for l in lines)
+
+
+def show(hashf: str | Path) -> list[tuple[str, str]]:
+    """(ESSID, contraseña) ya en el potfile local o devueltos por el clúster."""
+    try:
+        out = subprocess.check_output([HASHCAT, "-m", "22000", "--show", str(hashf)],
+                                      text=True, stderr=subprocess.DEVNULL)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        out = ""
+    try:
+        out += cracked_path(hashf).read_text(errors="replace")
+    except OSError:
+        pass
+    return list(dict.fromkeys(hit for hit in map(parse_found, out.splitlines()) if hit))
+
+
+def launch(args: list[str], tel: Optional[telemetry.Telemetry] = None, worker: str = "0",
+           stdin=subprocess.PIPE, cores: Optional[set[int]] = None, **kw) -> subprocess.Popen:
+    """
+    hashcat en su propia sesión (Ctrl-C no le llega y termina lo ya leído);
+    con `tel`, estado JSON por stdout leído en un hilo aparte; con `cores`,
+    fijado a esos cores.
+    """
+    proc = subprocess.Popen([HASHCAT, *args, *(telemetry.args() if tel else [])],
+                            stdin=stdin, stdout=subprocess.PIPE if tel else subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True, **kw)
+    if cores:
+        # tras arrancar y no en preexec_fn (inseguro con hilos); hashcat crea
+        # sus hilos después, al inicializar, y heredan la afinidad
+        try:
+            os.sched_setaffinity(proc.pid, cores)
+        except OSError:
+            pass                              # ya terminó, o cores no disponibles
+    if tel:
+        tel.follow(proc, worker)
+    return proc
+
+
+# ── reanudación ──────────────────────────────────────────────
+class Resume:
+    """Posición alcanzada en cada shard, por generador, junto al fichero de hashes."""
+
+    def __init__(self, hashf: str | Path, key: str, ranges: list[tuple[int, int]]):
+        self.path = Path(f"{hashf}.resume.json")
+        self.key = key
+        self.lock = threading.Lock()
+        try:
+            self.all = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.all = {}
+        saved = self.all.get(key)
+        if saved and [tuple(s[:2]) for s in saved] == ranges:
+            self.pos = [s[2] for s in saved]
+        else:
+            self.pos = [a for a, _ in ranges]
+        self.ranges = ranges
+
+    @property
+    def done(self) -> int:
+        return sum(p - a for p, (a, _) in zip(self.pos, self.ranges))
+
+    def update(self, shard: int, pos: int):
+        with self.lock:
+            self.pos[shard] = pos
+            finished = all(p >= b for p, (_, b) in zip(self.pos, self.ranges))
+            if finished:
+                self.all.pop(self.key, None)
+            else:
+                self.all[self.key] = [[a, b, p] for (a, b), p in zip(self.ranges, self.pos)]
+            if not self.all:
+                self.path.unlink(missing_ok=True)
+                return
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.all))
+            os.replace(tmp, self.path)
+
+
+# ── streaming hacia hashcat ──────────────────────────────────
+def _worker(hashf: str, src, shard: int, a: int, b: int, resume: Optional[Resume],
+            stats: dict, lock: threading.Lock, stop: threading.Event,
+            on_batch: Optional[Callable[[int], None]], extra: list[str],
+            tel: Optional[telemetry.Telemetry], batch: int):
+    proc = launch(["-m", "22000", hashf, "--quiet",
+                   "--session", f"wpa2lab-{os.getpid()}-{shard}", *extra], tel, str(shard))
+    pos, gen = a, 0.0
+    it = src.batches(a, b, batch)
+    try:
+        while not stop.is_set():
+            t = time.perf_counter()
+            nxt = next(it, None)
+            gen += time.perf_counter() - t
+            if nxt is None:
+                break
+            cnt, data = nxt
+            proc.stdin.write(data)
+            pos += cnt
+            if on_batch:
+                on_batch(cnt)
+    except (BrokenPipeError, OSError):
+        pass                                  # hashcat terminó (todo crackeado)
+    finally:
+        try:
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        proc.wait()
+        if resume:
+            resume.update(shard, pos)
+        with lock:
+            stats["candidates"] += pos - a
+            stats["gen_s"] += gen
+
+
+def stream(hashf: str | Path, src, start: int = 0, stop: Optional[int] = None,
+           workers: int = 1, on_batch: Optional[Callable[[int], None]] = None,
+           resume: bool = False, extra: Optional[list[str]] = None,
+           tel: Optional[telemetry.Telemetry] = None, batch: int = candidates.BATCH) -> dict:
+    """
+    Crackea `hashf` con los candidatos [start, stop) de `src`, repartidos en
+    `workers` procesos hashcat, en lotes de `batch` candidatos. Devuelve
+    contadores y throughput de generación vs. crack (cand/s).
+    """
+    stop_i = src.keyspace if stop is None else min(stop, src.keyspace)
+    ranges = candidates.shards(stop_i, workers, start)
+    res = Resume(hashf, f"{src!r}[{start}:{stop_i}]", ranges) if resume else None
+    stats = {"candidates": 0, "gen_s": 0.0, "skipped": res.done if res else 0}
+    if stats["skipped"] and on_batch:
+        on_batch(stats["skipped"])                  # la barra arranca donde se quedó
+    lock, halt = threading.Lock(), threading.Event()
+    t0 = time.perf_counter()
+    threads = []
+    for n, (a, b) in enumerate(ranges):
+        a = res.pos[n] if res else a
+        th = threading.Thread(target=_worker, daemon=True,
+                              args=(str(hashf), src, n, a, b, res, stats, lock,
+                                    halt, on_batch, extra or [], tel, batch))
+        th.start()
+        threads.append(th)
+    try:
+        for th in threads:
+            while th.is_alive():
+                th.join(0.2)
+    except KeyboardInterrupt:
+        halt.set()
+        for th in threads:
+            th.join()
+        stats["interrupted"] = True
+    stats["elapsed"] = time.perf_counter() - t0
+    stats["gen_rate"] = stats["candidates"] / stats["gen_s"] if stats["gen_s"] else 0.0
+    stats["crack_rate"] = stats["candidates"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
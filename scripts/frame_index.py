@@ -0,0 +1,204 @@
+# frame_index.py
+"""
+Índice sidecar por captura: `<captura>.idx`.
+
+Una pasada streaming genera un registro fijo por frame útil
+(offset, ts, BSSID, cliente, tipo, subtipo, mensaje EAPOL, PMKID, replay);
+después cualquier consulta («PMKIDs del AP X», «pares M1/M2 del cliente Y»)
+se responde sin releer el pcapng y los frames se recuperan con seek.
+El índice se invalida si cambian el tamaño o el mtime de la captura.
+"""
+from __future__ import annotations
+import bisect, os, struct
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+import pcapng_io
+
+MAGIC   = b"W2IX"
+VERSION = 1
+HDR     = struct.Struct("<4sHQqII")            # magic, ver, size, mtime_ns, n_hdr, n_rec
+REC     = struct.Struct("<Qd6s6sBBBBQ")        # 40 bytes por frame
+
+
+class Record(NamedTuple):
+    offset:  int
+    ts:      float
+    bssid:   str
+    client:  str
+    ftype:   int
+    subtype: int
+    eapol:   int
+    pmkid:   bool
+    replay:  int
+
+
+def idx_path(capture: str | Path) -> Path:
+    return Path(f"{capture}.idx")
+
+
+class FrameIndex:
+    def __init__(self, capture: Path, headers: list[int], records: list[Record]):
+        self.capture = capture
+        self.headers = headers            # offsets de SHB/IDB (para reescribir)
+        self.records = records
+
+    # ── consultas ────────────────────────────────────────────
+    def select(self, bssid: Optional[str] = None, client: Optional[str] = None,
+               eapol: Optional[Iterable[int]] = None, pmkid: Optional[bool] = None,
+               ftype: Optional[int] = None) -> list[Record]:
+        bssid = bssid.upper() if bssid else None
+        client = client.upper() if client else None
+        msgs = set(eapol) if eapol is not None else None
+        return [r for r in self.records
+                if (bssid is None or r.bssid == bssid)
+                and (client is None or r.client == client)
+                and (msgs is None or r.eapol in msgs)
+                and (pmkid is None or r.pmkid == pmkid)
+                and (ftype is None or r.ftype == ftype)]
+
+    def pmkids(self, bssid: Optional[str] = None) -> list[Record]:
+        return self.select(bssid=bssid, pmkid=True)
+
+    def pairs(self, client: Optional[str] = None, bssid: Optional[str] = None,
+              first: int = 1, second: int = 2) -> list[tuple[Record, Record]]:
+        """
+        Pares Mx/My del mismo AP↔cliente. Para M1/M2 y M3/M4 el replay
+        counter coincide; para M2/M3 el de M3 es el de M2 + 1.
+        """
+        delta = 1 if (first, second) == (2, 3) else 0
+        a = self.select(bssid=bssid, client=client, eapol=(first,))
+        b = {}
+        for r in self.select(bssid=bssid, client=client, eapol=(second,)):
+            b.setdefault((r.bssid, r.client, r.replay), r)
+        out = []
+        for r in a:
+            m = b.get((r.bssid, r.client, r.replay + delta))
+            if m is not None:
+                out.append((r, m))
+        return out
+
+    # ── acceso a los frames ──────────────────────────────────
+    def _sections(self, fh) -> list[tuple[int, str, list[bytes]]]:
+        """(offset, orden de bytes, bloques SHB/IDB) de cada sección."""
+        out: list[tuple[int, str, list[bytes]]] = []
+        for off in self.headers:
+            raw = pcapng_io.read_block_at(fh, off, out[-1][1] if out else "<")
+            if struct.unpack_from("<I", raw)[0] == pcapng_io.BT_SHB:
+                out.append((off, pcapng_io.shb_order(raw), []))
+            if out:
+                out[-1][2].append(raw)
+        return out
+
+    def _by_section(self, fh, records: Iterable[Record]):
+        """Cada sección con sus frames (en orden de fichero) y su orden de bytes."""
+        secs = self._sections(fh) or [(0, "<", [])]
+        starts = [off for off, _, _ in secs]
+        groups: list[list[Record]] = [[] for _ in secs]
+        for r in records:
+            groups[max(0, bisect.bisect_right(starts, r.offset) - 1)].append(r)
+        for (_, end, hdrs), recs in zip(secs, groups):
+            yield end, hdrs, sorted(recs, key=lambda r: r.offset)
+
+    def frames(self, records: Iterable[Record]) -> Iterator[bytes]:
+        """Bloques EPB crudos, por seek directo."""
+        with pcapng_io.open_capture(self.capture) as fh:
+            for end, _, recs in list(self._by_section(fh, records)):
+                for r in recs:
+                    yield pcapng_io.read_block_at(fh, r.offset, end)
+
+    def extract(self, records: Iterable[Record], dest: str | Path) -> int:
+        """
+        Escribe un pcapng con las cabeceras originales y sólo esos frames;
+        cada sección lleva delante sus propios SHB/IDB.
+        """
+        with pcapng_io.open_capture(self.capture) as fh, pcapng_io.Writer(dest) as out:
+            for end, hdrs, recs in list(self._by_section(fh, records)):
+                for raw in hdrs:
+                    out.block(raw)
+                for r in recs:
+                    out.packet(pcapng_io.read_block_at(fh, r.offset, end))
+            return out.count
+
+
+# ── construcción / carga ─────────────────────────────────────
+def build(capture: str | Path) -> FrameIndex:
+    capture = Path(capture)
+    st = capture.stat()
+    headers: list[int] = []
+    records: list[Record] = []
+    with pcapng_io.open_capture(capture) as fh:
+        for pkt in pcapng_io.iter_packets(fh, headers):
+            info = pcapng_io.decode(pkt.linktype, pkt.data)
+            if info is None or info.ftype == 1:
+                continue
+            records.append(Record(pkt.offset, pkt.ts, info.bssid, info.client,
+                                  info.ftype, info.subtype, info.eapol,
+                                  info.pmkid, info.replay))
+    _save(capture, st, headers, records)
+    return FrameIndex(capture, headers, records)
+
+
+def _save(capture: Path, st: os.stat_result, headers: list[int], records: list[Record]):
+    buf = bytearray(HDR.pack(MAGIC, VERSION, st.st_size, st.st_mtime_ns,
+                             len(headers), len(records)))
+    buf += struct.pack(f"<{len(headers)}Q", *headers)
+    for r in records:
+        buf += REC.pack(r.offset, r.ts, pcapng_io.mac_bytes(r.bssid),
+                        pcapng_io.mac_bytes(r.client), r.ftype, r.subtype,
+                        r.eapol, r.pmkid, r.replay)
+    tmp = idx_path(capture).with_suffix(".idx.tmp")
+    try:
+        tmp.write_bytes(buf)
+        os.replace(tmp, idx_path(capture))
+    except OSError:
+        pass                              # directorio de sólo lectura: índice en memoria
+
+
+def _read(capture: Path) -> Optional[FrameIndex]:
+    p = idx_path(capture)
+    try:
+        blob = p.read_bytes()
+        magic, ver, size, mtime, n_hdr, n_rec = HDR.unpack_from(blob, 0)
+    except (OSError, struct.error):
+        return None
+    st = capture.stat()
+    if magic != MAGIC or ver != VERSION or size != st.st_size or mtime != st.st_mtime_ns:
+        return None
+    pos = HDR.size
+    headers = list(struct.unpack_from(f"<{n_hdr}Q", blob, pos))
+    pos += 8 * n_hdr
+    mac = pcapng_io.mac
+    records = [Record(o, ts, mac(b), mac(c), ft, st_, e, bool(pm), rp)
+               for o, ts, b, c, ft, st_, e, pm, rp
+               in REC.iter_unpack(blob[pos:pos + REC.size * n_rec])]
+    return FrameIndex(capture, headers, records)
+
+
+def move(idx: FrameIndex, capture: str | Path) -> FrameIndex:
+    """
+    El mismo índice para otra copia del contenido (p.ej. la captura ya
+    comprimida: los offsets son del flujo descomprimido, que no cambia).
+    """
+    capture = Path(capture)
+    idx_path(idx.capture).unlink(missing_ok=True)
+    _save(capture, capture.stat(), idx.headers, idx.records)
+    return FrameIndex(capture, idx.headers, idx.records)
+
+
+def load(capture: str | Path, rebuild: bool = False) -> FrameIndex:
+    """Índice fresco de `capture`; lo (re)genera si falta o está caducado."""
+    capture = Path(capture)
+    idx = None if rebuild else _read(capture)
+    return idx if idx is not None else build(capture)
+
+
+def is_fresh(capture: str | Path) -> bool:
+    """Sólo mira la cabecera del .idx (no carga los registros)."""
+    try:
+        with open(idx_path(capture), "rb") as fh:
+            magic, ver, size, mtime, _, _ = HDR.unpack(fh.read(HDR.size))
+        st = Path(capture).stat()
+    except (OSError, struct.error):
+        return False
+    return (magic, ver, size, mtime) == (MAGIC, VERSION, st.st_size, st.st_mtime_ns)
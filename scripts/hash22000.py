@@ -0,0 +1,155 @@
+# hash22000.py
+"""
+Utilidades para ficheros hashcat 22000 (WPA*01 PMKID / WPA*02 EAPOL).
+
+    WPA*TIPO*PMKID|MIC*MAC_AP*MAC_CLIENTE*ESSID*ANONCE*EAPOL*MESSAGEPAIR
+
+Incluye el triaje: por cada (AP, cliente, ESSID) basta un registro bueno,
+así que se puntúa cada línea con el byte MESSAGEPAIR y se descarta el resto.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+# ── MESSAGEPAIR (hcxtools) ───────────────────────────────────
+MP_PAIR      = 0x07      # 0 M1M2 challenge · 1 M1M4 · 2 M2M3 · 3,4 M3… · 5 M3M4
+MP_APLESS    = 0x10      # ataque sin AP → no hace falta corrección de nonce
+MP_LE        = 0x20      # router little-endian detectado
+MP_BE        = 0x40      # router big-endian detectado
+MP_NO_RC     = 0x80      # replay counter NO comprobado → NC obligatoria
+NC_DEFAULT   = 8         # --nonce-error-corrections por defecto en hashcat
+
+PAIR_NAMES = {0: "M1M2", 1: "M1M4", 2: "M2M3", 3: "M2M3", 4: "M3M4", 5: "M3M4"}
+
+
+class HashLine(NamedTuple):
+    kind:   str          # "01" PMKID · "02" EAPOL
+    mic:    str
+    ap:     str
+    client: str
+    essid:  str          # hex, tal cual en la línea
+    anonce: str
+    eapol:  str
+    mp:     int
+    raw:    str
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return self.ap, self.client, self.essid
+
+    @property
+    def essid_text(self) -> str:
+        try:
+            return bytes.fromhex(self.essid).decode(errors="replace")
+        except ValueError:
+            return self.essid
+
+
+def parse(line: str) -> Optional[HashLine]:
+    line = line.strip()
+    parts = line.split("*")
+    if len(parts) != 9 or parts[0] != "WPA" or parts[1] not in ("01", "02"):
+        return None
+    try:
+        mp = int(parts[8] or "0", 16)
+    except ValueError:
+        return None
+    return HashLine(parts[1], parts[2].lower(), parts[3].lower(), parts[4].lower(),
+                    parts[5].lower(), parts[6].lower(), parts[7].lower(), mp, line)
+
+
+def read(path: str | Path) -> list[HashLine]:
+    with open(path, errors="ignore") as fh:
+        return [h for h in map(parse, fh) if h is not None]
+
+
+def write(path: str | Path, lines: Iterable[HashLine]):
+    Path(path).write_text("".join(h.raw + "\n" for h in lines))
+
+
+# ── triaje ───────────────────────────────────────────────────
+def work(h: HashLine, nc: int = NC_DEFAULT) -> int:
+    """
+    Comprobaciones que hashcat hace por candidato (tras el PBKDF2 del ESSID):
+    1 si no hace falta corregir nonce, 1+nc con endianness conocida y
+    1+2·nc si hay que probar ambas.
+    """
+    if h.kind == "01" or h.mp & MP_APLESS or not h.mp & MP_NO_RC:
+        return 1
+    if h.mp & (MP_LE | MP_BE):
+        return 1 + nc
+    return 1 + 2 * nc
+
+
+def score(h: HashLine) -> int:
+    """Mayor = mejor. PMKID y pares autorizados con replay counter comprobado arriba."""
+    if h.kind == "01":
+        return 100
+    s = 50
+    if h.mp & MP_PAIR:                 # autorizado (el cliente conocía la PSK)
+        s += 20
+    if not h.mp & MP_NO_RC:
+        s += 20
+    if h.mp & MP_APLESS:
+        s += 5
+    if h.mp & (MP_LE | MP_BE):
+        s += 3
+    return s
+
+
+def label(h: HashLine) -> str:
+    if h.kind == "01":
+        return "PMKID"
+    rc = "RC✗" if h.mp & MP_NO_RC else "RC✓"
+    return f"{PAIR_NAMES.get(h.mp & MP_PAIR, '?')} {rc}"
+
+
+def triage(lines: list[HashLine]) -> tuple[list[HashLine], dict]:
+    """
+    Conjunto mínimo suficiente: el mejor registro por (AP, cliente, ESSID),
+    conservando el orden de aparición. Devuelve (líneas, informe).
+    """
+    best: dict[tuple, HashLine] = {}
+    order: list[tuple] = []
+    for h in lines:
+        k = h.key
+        cur = best.get(k)
+        if cur is None:
+            order.append(k)
+            best[k] = h
+        elif (score(h), -work(h)) > (score(cur), -work(cur)):
+            best[k] = h
+    kept = [best[k] for k in order]
+    report = {
+        "before":        len(lines),
+        "after":         len(kept),
+        "work_before":   sum(work(h) for h in lines),
+        "work_after":    sum(work(h) for h in kept),
+        "essids":        len({h.essid for h in kept}),
+        "pmkid":         sum(h.kind == "01" for h in kept),
+        "eapol":         sum(h.kind == "02" for h in kept),
+    }
+    return kept, report
+
+
+def merge(paths: Iterable[str | Path]) -> tuple[list[HashLine], dict]:
+    """
+    Varios .22000 en un solo conjunto: sin líneas repetidas y triado entre
+    ficheros. hashcat hace un PBKDF2 por candidato y ESSID distinto, así que
+    `passes` (ESSID por fichero, sumados) frente a `essids` es lo que se ahorra.
+    """
+    seen: set[str] = set()
+    lines: list[HashLine] = []
+    passes = files = total = 0
+    for p in paths:
+        ls = read(p)
+        files += 1
+        total += len(ls)
+        passes += len({h.essid for h in ls})
+        for h in ls:
+            if h.raw not in seen:
+                seen.add(h.raw)
+                lines.append(h)
+    kept, rep = triage(lines)
+    rep.update(files=files, read=total, passes=passes)
+    return kept, rep
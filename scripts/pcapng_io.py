@@ -0,0 +1,332 @@
+# pcapng_io.py
+"""
+Lector/escritor mínimo de pcapng en streaming (sin scapy).
+
+Sólo entiende lo que escribe hcxdumptool: SHB, IDB, EPB/SPB y bloques
+desconocidos (que se saltan). Cada paquete se decodifica hasta la cabecera
+802.11 y, si es EAPOL-Key, hasta el número de mensaje / PMKID.
+"""
+from __future__ import annotations
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+import capstore
+
+# ── tipos de bloque / linktypes ──────────────────────────────
+BT_SHB = 0x0A0D0D0A
+BT_IDB = 0x00000001
+BT_SPB = 0x00000003
+BT_EPB = 0x00000006
+BOM    = 0x1A2B3C4D
+
+LT_80211          = 105
+LT_80211_RADIOTAP = 127
+
+EAPOL_SNAP = b"\xaa\xaa\x03\x00\x00\x00\x88\x8e"
+PMKID_KDE  = b"\xdd\x14\x00\x0f\xac\x04"
+ZERO16     = bytes(16)
+
+
+class Packet(NamedTuple):
+    offset:   int       # offset del bloque EPB en el fichero
+    ts:       float     # segundos epoch
+    linktype: int
+    data:     bytes     # frame tal cual (radiotap incluido)
+    raw:      bytes     # bloque completo, para copiarlo sin re-serializar
+
+
+class FrameInfo(NamedTuple):
+    ftype:   int                # 0 mgmt, 1 ctrl, 2 data
+    subtype: int
+    bssid:   Optional[str]
+    client:  Optional[str]
+    seq:     int
+    eapol:   int                # 0 = no es EAPOL-Key, 1-4 = Mx
+    pmkid:   bool
+    replay:  int
+
+
+def mac(b: bytes) -> str:
+    return ":".join(f"{x:02X}" for x in b)
+
+
+def mac_bytes(s: str) -> bytes:
+    return bytes.fromhex(s.replace(":", "").replace("-", ""))
+
+
+# ── lectura de bloques ───────────────────────────────────────
+def open_capture(path: str | Path) -> BinaryIO:
+    """Captura en claro o comprimida (.gz/.xz/.zst, descomprimida en streaming)."""
+    if capstore.codec_of(path):
+        return capstore.open_stream(path)
+    return open(path, "rb", buffering=1 << 20)
+
+
+def iter_blocks(fh: BinaryIO) -> Iterator[tuple[int, int, bytes, str]]:
+    """
+    Recorre los bloques en streaming: (tipo, offset, bloque_crudo, endian).
+    Nunca carga más de un bloque en memoria.
+    """
+    end = "<"
+    offset = 0
+    while True:
+        hdr = fh.read(8)
+        if len(hdr) < 8:
+            return
+        btype = struct.unpack("<I", hdr[:4])[0]
+        if btype == BT_SHB:
+            bom = fh.read(4)
+            end = "<" if struct.unpack("<I", bom)[0] == BOM else ">"
+            blen = struct.unpack(end + "I", hdr[4:])[0]
+            rest = bom + fh.read(blen - 12)
+        else:
+            btype, blen = struct.unpack(end + "II", hdr)
+            if blen < 12:
+                return                                   # fichero truncado/corrupto
+            rest = fh.read(blen - 8)
+        if len(rest) < blen - 8:
+            return                                       # captura aún escribiéndose
+        yield btype, offset, hdr + rest, end
+        offset += blen
+
+
+def _tsresol(opts: bytes, end: str) -> float:
+    """Busca if_tsresol (código 9) en las opciones de un IDB."""
+    i = 0
+    while i + 4 <= len(opts):
+        code, olen = struct.unpack_from(end + "HH", opts, i)
+        if code == 0:
+            break
+        if code == 9 and olen >= 1:
+            v = opts[i + 4]
+            return 2.0 ** -(v & 0x7F) if v & 0x80 else 10.0 ** -v
+        i += 4 + ((olen + 3) & ~3)
+    return 1e-6
+
+
+def iter_packets(fh: BinaryIO, headers: Optional[list[int]] = None) -> Iterator[Packet]:
+    """Paquetes en orden de fichero; si se pasa `headers` anota ahí los offsets de SHB/IDB."""
+    ifaces: list[tuple[int, float]] = []     # (linktype, tsresol) por IDB
+    for btype, off, raw, end in iter_blocks(fh):
+        if btype in (BT_SHB, BT_IDB) and headers is not None:
+            headers.append(off)
+        if btype == BT_SHB:
+            ifaces = []
+        elif btype == BT_IDB:
+            lt = struct.unpack_from(end + "H", raw, 8)[0]
+            ifaces.append((lt, _tsresol(raw[16:-4], end)))
+        elif btype == BT_EPB:
+            iid, th, tl, caplen = struct.unpack_from(end + "IIII", raw, 8)
+            lt, res = ifaces[iid] if iid < len(ifaces) else (LT_80211_RADIOTAP, 1e-6)
+            yield Packet(off, ((th << 32) | tl) * res, lt, raw[28:28 + caplen], raw)
+        elif btype == BT_SPB:
+            lt = ifaces[0][0] if ifaces else LT_80211_RADIOTAP
+            caplen = struct.unpack_from(end + "I", raw, 8)[0]
+            yield Packet(off, 0.0, lt, raw[12:12 + caplen], raw)
+
+
+def shb_order(raw: bytes) -> str:
+    """Orden de bytes de la sección que abre este SHB ('<' o '>')."""
+    return "<" if struct.unpack_from("<I", raw, 8)[0] == BOM else ">"
+
+
+def read_block_at(fh: BinaryIO, offset: int, end: str = "<") -> bytes:
+    """
+    Lee un bloque entero empezando en `offset` (para índices). `end` es el
+    orden de bytes de su sección; un SHB lo lleva en su propio BOM.
+    """
+    fh.seek(offset)
+    hdr = fh.read(12)
+    if struct.unpack("<I", hdr[:4])[0] == BT_SHB:
+        end = shb_order(hdr)
+    blen = struct.unpack(end + "I", hdr[4:8])[0]
+    return hdr + fh.read(blen - 12)
+
+
+# ── decodificación 802.11 ────────────────────────────────────
+def dot11_offset(linktype: int, data: bytes) -> int:
+    """Offset de la cabecera 802.11 (salta radiotap si lo hay)."""
+    if linktype == LT_80211_RADIOTAP:
+        return struct.unpack_from("<H", data, 2)[0] if len(data) >= 4 else len(data)
+    return 0
+
+
+def addresses(d: bytes, o: int) -> tuple[int, int, int, bytes, bytes]:
+    """
+    Sólo cabecera fija: (tipo, subtipo, flags, bssid, cliente) en bytes.
+    Es lo mínimo para filtrar sin tocar el cuerpo del frame.
+    """
+    fc0, flags = d[o], d[o + 1]
+    ftype, sub = (fc0 >> 2) & 3, fc0 >> 4
+    a1, a2, a3 = d[o + 4:o + 10], d[o + 10:o + 16], d[o + 16:o + 22]
+    if ftype == 2:
+        ds = flags & 3
+        if ds == 1:                     # toDS   → AP en addr1
+            return ftype, sub, flags, a1, a2
+        if ds == 2:                     # fromDS → AP en addr2
+            return ftype, sub, flags, a2, a1
+        return ftype, sub, flags, a3, a2
+    if ftype == 0:
+        return ftype, sub, flags, a3, (a2 if a2 != a3 else a1)
+    return ftype, sub, flags, a1, a2
+
+
+def _eapol(d: bytes, body: int) -> tuple[int, bool, int]:
+    """(msgnum, pmkid, replay) para un EAPOL-Key; msgnum 0 si no lo es."""
+    if d[body:body + 8] != EAPOL_SNAP or len(d) < body + 8 + 99:
+        return 0, False, 0
+    e = body + 8
+    if d[e + 1] != 3:                   # EAPOL-Key
+        return 0, False, 0
+    info = struct.unpack_from(">H", d, e + 5)[0]
+    replay = struct.unpack_from(">Q", d, e + 9)[0]
+    if info & 0x0080:                   # ACK → M1 / M3
+        num = 3 if info & 0x0040 else 1
+    else:
+        num = 4 if info & 0x0200 else 2
+    pmkid = False
+    if num == 1:
+        kd_len = struct.unpack_from(">H", d, e + 97)[0]
+        kd = d[e + 99:e + 99 + kd_len]
+        i = kd.find(PMKID_KDE)
+        pmkid = i >= 0 and kd[i + 6:i + 22] not in (ZERO16, b"")
+    return num, pmkid, replay
+
+
+def decode(linktype: int, data: bytes) -> Optional[FrameInfo]:
+    o = dot11_offset(linktype, data)
+    if len(data) < o + 24:
+        return None
+    ftype, sub, flags, bssid, client = addresses(data, o)
+    seq = struct.unpack_from("<H", data, o + 22)[0] >> 4
+    num, pmkid, replay = 0, False, 0
+    if ftype == 2 and not flags & 0x40:
+        body = o + 24 + (6 if flags & 3 == 3 else 0) + (2 if sub & 8 else 0)
+        num, pmkid, replay = _eapol(data, body)
+    return FrameInfo(ftype, sub, mac(bssid), mac(client), seq, num, pmkid, replay)
+
+
+def beacon_essid(linktype: int, data: bytes) -> Optional[str]:
+    """ESSID de un beacon / probe-response (primer IE tras los fijos)."""
+    o = dot11_offset(linktype, data)
+    ie = o + 24 + 12
+    if len(data) < ie + 2 or data[ie] != 0:
+        return None
+    return data[ie + 2:ie + 2 + data[ie + 1]].decode(errors="replace")
+
+
+# ── filtrado por allow-list (rechazo sólo con cabecera) ──────
+def iter_filtered(fh: BinaryIO, bssids: set[bytes], essids: set[bytes],
+                  stats: Optional[dict] = None) -> Iterator[bytes]:
+    """
+    Bloques crudos de los frames cuyo BSSID está en `bssids` (o cuyo beacon /
+    probe-response anuncia un ESSID de `essids`, que añade su BSSID al set).
+    De cada EPB sólo se leen 28 B de bloque + radiotap + 22 B de 802.11; los
+    que no pasan se saltan con seek sin leer el cuerpo. SHB/IDB pasan siempre.
+    """
+    allowed = set(bssids)
+    end = "<"
+    ltypes: list[int] = []
+    total = kept = 0
+    read, seek = fh.read, fh.seek
+    while True:
+        hdr = read(8)
+        if len(hdr) < 8:
+            break
+        btype = struct.unpack_from("<I", hdr)[0]
+        if btype == BT_SHB:
+            hdr += read(4)
+            end = "<" if struct.unpack_from("<I", hdr, 8)[0] == BOM else ">"
+            ltypes = []
+        else:
+            btype = struct.unpack_from(end + "I", hdr)[0]
+        blen = struct.unpack_from(end + "I", hdr, 4)[0]
+        if blen < 12:
+            break
+        if btype != BT_EPB or blen < 28:
+            if btype not in (BT_SHB, BT_IDB):
+                seek(blen - len(hdr), 1)
+                continue
+            raw = hdr + read(blen - len(hdr))
+            if len(raw) < blen:
+                break
+            if btype == BT_IDB:
+                ltypes.append(struct.unpack_from(end + "H", raw, 8)[0])
+            yield raw
+            continue
+        hdr += read(20)
+        total += 1
+        iid, caplen = struct.unpack_from(end + "I", hdr, 8)[0], struct.unpack_from(end + "I", hdr, 20)[0]
+        lt = ltypes[iid] if iid < len(ltypes) else LT_80211_RADIOTAP
+        head = b""
+        o = 0
+        if lt == LT_80211_RADIOTAP:
+            head = read(4)
+            o = struct.unpack_from("<H", head, 2)[0] if len(head) == 4 else caplen
+        need = min(caplen, o + 22) - len(head)
+        head += read(need) if need > 0 else b""
+        got = 28 + len(head)
+        keep = False
+        if len(head) >= o + 22:
+            ftype, sub, _, bssid, _ = addresses(head, o)
+            if ftype != 1 and bssid in allowed:
+                keep = True
+            elif essids and ftype == 0 and sub in (5, 8):
+                # ESSID: primer IE tras 2 B seq + 12 B fijos → 46 B más como mucho
+                more = read(min(caplen - len(head), 2 + 12 + 2 + 32))
+                got += len(more)
+                ie = 24 + 12
+                body = head[o:] + more
+                if len(body) >= ie + 2 and body[ie] == 0 and \
+                        body[ie + 2:ie + 2 + body[ie + 1]] in essids:
+                    allowed.add(bssid)
+                    keep = True
+                head += more
+        if keep:
+            kept += 1
+            rest = read(blen - got)
+            if len(rest) < blen - got:
+                break
+            yield hdr + head + rest
+        else:
+            seek(blen - got, 1)
+    if stats is not None:
+        stats.update(total=total, kept=kept,
+                     bssids=[mac(b) for b in allowed])
+
+
+def filter_capture(src: str | Path, dst: str | Path, bssids=(), essids=()) -> dict:
+    """Escribe en `dst` sólo el tráfico de los objetivos; devuelve contadores."""
+    want_b = {mac_bytes(b) for b in bssids}
+    want_e = {e.encode() if isinstance(e, str) else e for e in essids}
+    stats: dict = {}
+    with open_capture(src) as fh, Writer(dst) as out:
+        for raw in iter_filtered(fh, want_b, want_e, stats):
+            out.block(raw)
+    return stats
+
+
+# ── escritura ────────────────────────────────────────────────
+class Writer:
+    """Copia bloques crudos (SHB/IDB/EPB) a un pcapng nuevo."""
+
+    def __init__(self, path: str | Path):
+        self.fh = open(path, "wb", buffering=1 << 20)
+        self.count = 0
+
+    def block(self, raw: bytes):
+        self.fh.write(raw)
+
+    def packet(self, raw: bytes):
+        self.fh.write(raw)
+        self.count += 1
+
+    def close(self):
+        self.fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
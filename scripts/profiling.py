@@ -0,0 +1,174 @@
+# profiling.py
+"""
+Perfilado opcional de una acción (`--profile` / WPA2LAB_PROFILE).
+
+Modos, combinables con comas (`sample,mem`):
+
+- `cprofile`: cProfile determinista del hilo que ejecuta la acción → `.pstats`
+  (`python -m pstats`, snakeviz…).
+- `sample`: muestreo de la pila de TODOS los hilos cada SAMPLE_S (escáner,
+  Live de Rich, lectores de hashcat…) → `.collapsed`, una línea
+  `hilo;mod:func;… n` por pila, lista para `flamegraph.pl` o speedscope.
+- `mem`: tracemalloc; `.mem.txt` con el pico y lo que más creció entre el
+  principio y el final, y el snapshot final en `.tracemalloc`.
+
+Con `cprofile` también se muestrea, para tener siempre el `.collapsed`. Sin
+`--profile` no se instala nada: las acciones se llaman tal cual.
+"""
+from __future__ import annotations
+import functools, sys, threading, time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional
+
+ENV = "WPA2LAB_PROFILE"
+MODES = ("cprofile", "sample", "mem")
+SAMPLE_S = 0.005                      # periodo del muestreo
+MEM_FRAMES = 8                        # profundidad de las trazas de tracemalloc
+MEM_TOP = 30                          # líneas del informe de memoria
+
+_active = threading.Lock()            # una sesión a la vez (cProfile no se anida)
+
+
+def parse(spec: Optional[str]) -> set[str]:
+    """`"sample,mem"` → {"sample", "mem"}; ValueError si hay modos desconocidos."""
+    modes = {m.strip().lower() for m in (spec or "").split(",") if m.strip()}
+    bad = modes - set(MODES)
+    if bad:
+        raise ValueError(f"modo de perfil desconocido: {', '.join(sorted(bad))} "
+                         f"(válidos: {', '.join(MODES)})")
+    return modes
+
+
+class Sampler:
+    """Hilo que cuenta las pilas de los demás hilos cada `interval` s."""
+
+    def __init__(self, interval: float = SAMPLE_S):
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self.samples = 0
+        self.labels: dict = {}                     # code → "mod:func"
+        self.halt = threading.Event()
+        self.th = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _label(self, code) -> str:
+        lbl = self.labels.get(code)
+        if lbl is None:
+            lbl = self.labels[code] = f"{Path(code.co_filename).stem}:{code.co_name}"
+        return lbl
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self.halt.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(tid, str(tid)).replace(";", ":").replace(" ", "_"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self.th.start()
+
+    def stop(self):
+        self.halt.set()
+        self.th.join()
+
+    def write(self, path: Path):
+        with open(path, "w") as fh:
+            for stack, n in sorted(self.counts.items()):
+                fh.write(f"{stack} {n}\n")
+
+
+class Session:
+    """
+    Perfila lo que se ejecute dentro del `with`. Los ficheros van a
+    `out_dir/profile-<nombre>-<fecha>.*` y quedan en `files` al salir.
+    Dentro de otra sesión no hace nada.
+    """
+
+    def __init__(self, name: str, spec: str, out_dir: Path):
+        self.modes = parse(spec)
+        self.base = Path(out_dir) / f"profile-{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.files: list[Path] = []
+        self.elapsed = 0.0
+        self.owner = False
+
+    def __enter__(self):
+        if not self.modes or not _active.acquire(blocking=False):
+            return self
+        self.owner = True
+        self.base.parent.mkdir(parents=True, exist_ok=True)
+        self.prof = self.sampler = self.snap0 = None
+        if "mem" in self.modes:
+            import tracemalloc
+            tracemalloc.start(MEM_FRAMES)
+            self.snap0 = tracemalloc.take_snapshot()
+        self.sampler = Sampler()
+        self.sampler.start()
+        if "cprofile" in self.modes:
+            import cProfile
+            self.prof = cProfile.Profile()
+        self.t0 = time.perf_counter()
+        if self.prof:
+            self.prof.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.owner:
+            return False
+        try:
+            if self.prof:
+                self.prof.disable()
+            self.elapsed = time.perf_counter() - self.t0
+            self.sampler.stop()
+            self._save(self.base.with_suffix(".collapsed"), self.sampler.write)
+            if self.prof:
+                self._save(self.base.with_suffix(".pstats"), self.prof.dump_stats)
+            if self.snap0 is not None:
+                self._memory()
+        finally:
+            self.owner = False
+            _active.release()
+        return False
+
+    def _save(self, path: Path, writer: Callable[[Path], None]):
+        writer(path)
+        self.files.append(path)
+
+    def _memory(self):
+        import tracemalloc
+        snap = tracemalloc.take_snapshot()
+        cur, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        skip = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        snap, snap0 = snap.filter_traces(skip), self.snap0.filter_traces(skip)
+        lines = [f"pico {peak / 1e6:.1f} MB · al final {cur / 1e6:.1f} MB · {self.elapsed:.1f} s", "",
+                 f"Crecimiento (top {MEM_TOP}):"]
+        lines += [str(s) for s in snap.compare_to(snap0, "lineno")[:MEM_TOP]]
+        path = self.base.with_suffix(".mem.txt")
+        path.write_text("\n".join(lines) + "\n")
+        self.files.append(path)
+        self._save(self.base.with_suffix(".tracemalloc"), snap.dump)
+
+
+def wrap(fn: Callable, spec: str, out_dir: Path,
+         on_done: Optional[Callable[[Session], None]] = None) -> Callable:
+    """`fn` perfilada en cada llamada (nombre de sesión: el de la función sin `act_`)."""
+    name = fn.__name__.removeprefix("act_")
+
+    @functools.wraps(fn)
+    def run(*a, **kw):
+        sess = Session(name, spec, out_dir)
+        try:
+            with sess:
+                return fn(*a, **kw)
+        finally:
+            if sess.files and on_done:
+                on_done(sess)
+    return run
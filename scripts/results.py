@@ -0,0 +1,118 @@
+# results.py
+"""
+Almacén persistente de resultados (ESSID, PMK, contraseña) en SQLite.
+
+Antes de lanzar una word-list cada hash nuevo se comprueba contra lo ya
+crackeado para su ESSID (con el PMK guardado: sólo HMAC, sin PBKDF2) y
+contra las contraseñas del laboratorio (config.yaml / last.yaml y la del AP
+falso). Sólo lo que quede sin resolver pasa al crack caro.
+"""
+from __future__ import annotations
+import sqlite3, time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import yaml
+
+import hash22000, wpa_crypto
+
+DB = Path(__file__).resolve().parent.parent / "hashes" / "cracked.db"
+
+
+class Store:
+    def __init__(self, path: str | Path = DB):
+        self.path = Path(path)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS cracked (
+                               essid    BLOB NOT NULL,
+                               password TEXT NOT NULL,
+                               pmk      BLOB NOT NULL,
+                               source   TEXT,
+                               ts       REAL,
+                               PRIMARY KEY (essid, password))""")
+        self.db.commit()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM cracked").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def add(self, essid: bytes, password: str, pmk: Optional[bytes] = None, source: str = "") -> bool:
+        """Guarda el resultado (calcula el PMK si no se da); False si ya estaba."""
+        if self.db.execute("SELECT 1 FROM cracked WHERE essid=? AND password=?",
+                           (essid, password)).fetchone():
+            return False
+        self.db.execute("INSERT INTO cracked VALUES (?,?,?,?,?)",
+                        (essid, password, pmk or wpa_crypto.pmk(password, essid), source, time.time()))
+        self.db.commit()
+        return True
+
+    def for_essid(self, essid: bytes) -> list[tuple[str, bytes]]:
+        return self.db.execute("SELECT password, pmk FROM cracked WHERE essid=? ORDER BY ts DESC",
+                               (essid,)).fetchall()
+
+    def history(self) -> list[tuple[bytes, str]]:
+        """(ESSID, contraseña) de todo lo crackeado, del más antiguo al más reciente."""
+        return self.db.execute("SELECT essid, password FROM cracked ORDER BY ts").fetchall()
+
+
+def unhex(field: str) -> bytes:
+    """Campo de --show: hashcat usa $HEX[…] si no es imprimible."""
+    if field.startswith("$HEX[") and field.endswith("]"):
+        try:
+            return bytes.fromhex(field[5:-1])
+        except ValueError:
+            pass
+    return field.encode("utf-8", "surrogateescape")
+
+
+def lab_passphrases(configs: Iterable[str | Path], extra: Iterable[str] = ()) -> list[str]:
+    """`ap.passphrase` de cada YAML que exista + las fijas (AP falso)."""
+    out = []
+    for cfg in configs:
+        try:
+            pw = (yaml.safe_load(Path(cfg).read_text()) or {}).get("ap", {}).get("passphrase")
+        except (OSError, yaml.YAMLError, AttributeError):
+            continue
+        if pw:
+            out.append(str(pw))
+    out += list(extra)
+    return [pw for pw in dict.fromkeys(out) if 8 <= len(pw.encode()) <= 63]
+
+
+def prepass(lines: list[hash22000.HashLine], store: Store, passphrases: list[str]
+            ) -> tuple[list[tuple[hash22000.HashLine, str]], list[hash22000.HashLine], dict]:
+    """
+    Resuelve lo que se pueda sin hashcat. Devuelve (resueltos [(línea, contraseña)],
+    pendientes, informe).
+    """
+    t0 = time.perf_counter()
+    pmks: dict[tuple[bytes, str], bytes] = {}
+    resolved, pending = [], []
+    stats = {"store": 0, "lab": 0, "pbkdf2": 0}
+    for h in lines:
+        essid = bytes.fromhex(h.essid)
+        hit = None
+        for pw, pmk in store.for_essid(essid):
+            if wpa_crypto.verify(h, pmk):
+                hit = pw
+                stats["store"] += 1
+                break
+        if hit is None:
+            for pw in passphrases:
+                if (essid, pw) not in pmks:
+                    pmks[essid, pw] = wpa_crypto.pmk(pw, essid)
+                    stats["pbkdf2"] += 1
+                if wpa_crypto.verify(h, pmks[essid, pw]):
+                    hit = pw
+                    stats["lab"] += 1
+                    store.add(essid, pw, pmks[essid, pw], "lab")
+                    break
+        if hit is None:
+            pending.append(h)
+        else:
+            resolved.append((h, hit))
+    stats.update(hashes=len(lines), resolved=len(resolved), pending=len(pending),
+                 ms=(time.perf_counter() - t0) * 1e3)
+    return resolved, pending, stats
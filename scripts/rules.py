@@ -0,0 +1,245 @@
+# rules.py
+"""
+Motor de reglas (subconjunto práctico de la sintaxis de hashcat).
+
+Cada regla se compila una vez a un programa de operaciones sobre `bytes`.
+Las reglas «uniformes» (l u t sXY $X ^X) se aplican al lote entero ya
+unido por saltos de línea (un único lower()/translate()/replace() en C);
+el resto se aplica palabra a palabra con la función compuesta. Cada lote
+se deduplica y se filtra a longitudes WPA (8-63) antes de ir al motor.
+"""
+from __future__ import annotations
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import candidates
+
+# reglas «de laboratorio»: capitalizar, dígitos al final, leetspeak básico
+LAB_RULES = [
+    ":", "c", "u", "l",
+    "$1", "$1$2$3", "$1$2$3$4", "$!", "c$1", "c$1$2$3", "c$!",
+    "$2$0$2$4", "$2$0$2$5", "c$2$0$2$4", "c$2$0$2$5",
+    "sa4", "se3", "so0", "si1", "sa4se3so0si1", "c sa4se3so0si1",
+    "sa@", "ss$", "r", "d", "^1", "T0", "c$0$1",
+]
+
+UNIFORM = set("lut:s$^")
+ARGS = {**{c: 0 for c in ":lucCtrdf{}[]kKq"},
+        **{c: 1 for c in "TpDz'ZyY$^@"},
+        **{c: 2 for c in "sxOio"}}
+
+
+def _pos(c: str) -> int:
+    """Posiciones hashcat: 0-9 y A-Z (=10-35)."""
+    if c.isdigit():
+        return int(c)
+    if "A" <= c <= "Z":
+        return ord(c) - 55
+    raise ValueError(f"posición inválida {c!r}")
+
+
+def _toggle(w: bytes, n: int) -> bytes:
+    return w[:n] + w[n:n + 1].swapcase() + w[n + 1:] if n < len(w) else w
+
+
+def _op(c: str, a: str, b: str) -> Callable[[bytes], bytes]:
+    A = a.encode("latin-1")
+    B = b.encode("latin-1")
+    if c == ":": return lambda w: w
+    if c == "l": return bytes.lower
+    if c == "u": return bytes.upper
+    if c == "c": return bytes.capitalize
+    if c == "C": return lambda w: w[:1].lower() + w[1:].upper()
+    if c == "t": return bytes.swapcase
+    if c == "r": return lambda w: w[::-1]
+    if c == "d": return lambda w: w + w
+    if c == "f": return lambda w: w + w[::-1]
+    if c == "{": return lambda w: w[1:] + w[:1]
+    if c == "}": return lambda w: w[-1:] + w[:-1]
+    if c == "[": return lambda w: w[1:]
+    if c == "]": return lambda w: w[:-1]
+    if c == "k": return lambda w: w[1:2] + w[:1] + w[2:]
+    if c == "K": return lambda w: w[:-2] + w[-1:] + w[-2:-1] if len(w) >= 2 else w
+    if c == "q": return lambda w: bytes(x for x in w for _ in (0, 1))
+    if c == "$": return lambda w: w + A
+    if c == "^": return lambda w: A + w
+    if c == "@": return lambda w: w.replace(A, b"")
+    n = _pos(a) if ARGS[c] >= 1 and c not in "$^@s" else 0
+    if c == "T": return lambda w: _toggle(w, n)
+    if c == "p": return lambda w: w * (n + 1)
+    if c == "D": return lambda w: w[:n] + w[n + 1:]
+    if c == "'": return lambda w: w[:n]
+    if c == "z": return lambda w: w[:1] * n + w
+    if c == "Z": return lambda w: w + w[-1:] * n
+    if c == "y": return lambda w: w[:n] + w
+    if c == "Y": return lambda w: w + w[-n:] if n else w
+    if c == "s":
+        tbl = bytes.maketrans(A, B)
+        return lambda w: w.translate(tbl)
+    if c == "x": m = _pos(b); return lambda w: w[n:n + m]
+    if c == "O": m = _pos(b); return lambda w: w[:n] + w[n + m:]
+    if c == "i": return lambda w: w[:n] + B + w[n:]
+    if c == "o": return lambda w: w[:n] + B + w[n + 1:] if n < len(w) else w
+    raise ValueError(f"regla no soportada {c!r}")
+
+
+def parse(rule: str) -> list[tuple[str, str, str]]:
+    """«c $1 $2» → [('c','',''), ('$','1',''), ('$','2','')]."""
+    ops = []
+    i = 0
+    while i < len(rule):
+        c = rule[i]
+        if c in " \t":
+            i += 1
+            continue
+        if c not in ARGS:
+            raise ValueError(f"regla no soportada {c!r} en {rule!r}")
+        n = ARGS[c]
+        if n and i + n >= len(rule):
+            raise ValueError(f"faltan argumentos en {rule!r}")
+        args = rule[i + 1:i + 1 + n]
+        ops.append((c, args[:1], args[1:2]))
+        i += 1 + n
+    return ops
+
+
+class Program:
+    """
+    Regla compilada = cabeza por palabra + cola uniforme por bloque.
+    «c$1$2» → capitalize() palabra a palabra y luego un solo replace() del lote.
+    """
+
+    def __init__(self, rule: str):
+        self.rule = rule
+        ops = [op for op in parse(rule) if op[0] != ":"]
+        cut = max((i + 1 for i, (c, _, _) in enumerate(ops) if c not in UNIFORM), default=0)
+        head, tail = ops[:cut], ops[cut:]
+        self.uniform = not head
+        self.delta = sum(len(a) for c, a, _ in tail if c in "$^")
+        # sXY consecutivos → una sola tabla translate, solo si equivale a
+        # aplicarlos uno a uno: X nuevo y que no salga de una sustitución previa
+        steps: list[tuple[str, object]] = []
+        for c, a, b in tail:
+            if (c == "s" and steps and steps[-1][0] == "s"
+                    and a.encode("latin-1") not in steps[-1][1][0] + steps[-1][1][1]):
+                src, dst = steps[-1][1]
+                steps[-1] = ("s", (src + a.encode("latin-1"), dst + b.encode("latin-1")))
+            elif c == "s":
+                steps.append(("s", (a.encode("latin-1"), b.encode("latin-1"))))
+            else:
+                steps.append((c, a.encode("latin-1")))
+        self.steps = [(c, bytes.maketrans(*arg) if c == "s" else arg) for c, arg in steps]
+        fns = [_op(c, a, b) for c, a, b in head]
+        if len(fns) == 1:
+            self.fn = fns[0]                    # p.ej. bytes.capitalize: map() en C
+        else:
+            def run(w: bytes, fns=fns) -> bytes:
+                for f in fns:
+                    w = f(w)
+                return w
+            self.fn = run
+
+    def block(self, blk: bytes) -> bytes:
+        """Aplica un programa uniforme a `palabra\\n…` entero."""
+        for c, arg in self.steps:
+            if c == "l":
+                blk = blk.lower()
+            elif c == "u":
+                blk = blk.upper()
+            elif c == "t":
+                blk = blk.swapcase()
+            elif c == "s":
+                blk = blk.translate(arg)
+            elif c == "$":
+                blk = blk.replace(b"\n", arg + b"\n")
+            elif c == "^":
+                blk = (arg + blk.replace(b"\n", b"\n" + arg))[:-len(arg)]
+        return blk
+
+
+def load(spec: str | Path | Iterable[str]) -> tuple[list[Program], int]:
+    """
+    'lab' = reglas incluidas; una ruta = fichero .rule de hashcat; o una lista.
+    Devuelve (programas, nº de reglas no soportadas que se han ignorado).
+    """
+    if isinstance(spec, (str, Path)) and str(spec) == "lab":
+        lines = LAB_RULES
+    elif isinstance(spec, (str, Path)):
+        lines = Path(spec).read_text(errors="ignore").splitlines()
+    else:
+        lines = list(spec)
+    progs, skipped = [], 0
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            progs.append(Program(line.strip()))
+        except ValueError:
+            skipped += 1
+    return progs, skipped
+
+
+def apply(progs: list[Program], block: bytes, dedup: bool = True) -> bytes:
+    """Aplica todas las reglas a un lote `palabra\\n…` y devuelve el lote mutado."""
+    words = block.split(b"\n")
+    if words and words[-1] == b"":
+        words.pop()
+    eligible: dict[int, bytes] = {}           # delta → bloque de palabras con longitud útil
+    out = []
+    lo, hi = candidates.WPA_MIN, candidates.WPA_MAX
+    for p in progs:
+        d = p.delta
+        if p.uniform:
+            if d not in eligible:
+                ok = [w for w in words if lo - d <= len(w) <= hi - d]
+                eligible[d] = b"\n".join(ok) + b"\n" if ok else b""
+            if eligible[d]:
+                out.append(p.block(eligible[d]))
+        else:
+            res = [x for x in map(p.fn, words) if lo - d <= len(x) <= hi - d]
+            if res:
+                out.append(p.block(b"\n".join(res) + b"\n"))
+    blob = b"".join(out)
+    if dedup and blob:
+        lines = blob.split(b"\n")
+        lines.pop()
+        blob = b"\n".join(dict.fromkeys(lines)) + b"\n"
+    return blob
+
+
+class RuleSource:
+    """
+    Fuente de candidatos = reglas × palabras de otra fuente. El keyspace se
+    cuenta en candidatos antes de filtrar/deduplicar; los rangos se alinean
+    a palabra base para que los shards no se solapen.
+    """
+
+    def __init__(self, base, progs: list[Program]):
+        self.base = base
+        self.progs = progs
+        self.n = max(1, len(progs))
+        self.keyspace = base.keyspace * self.n
+
+    def __repr__(self):
+        return f"RuleSource({self.base!r}, rules={len(self.progs)})"
+
+    def batches(self, start: int = 0, stop: Optional[int] = None,
+                size: int = candidates.BATCH) -> Iterator[tuple[int, bytes]]:
+        stop = self.keyspace if stop is None else min(stop, self.keyspace)
+        a, b = -(-start // self.n), -(-stop // self.n)
+        for cnt, blk in self.base.batches(a, b, max(1, size // self.n)):
+            yield cnt * self.n, apply(self.progs, blk)
+
+
+def bench(progs: list[Program], words: list[bytes], seconds: float = 2.0) -> dict:
+    """Candidatos/s (emitidos tras dedup) aplicando `progs` a `words` en bucle."""
+    blk = b"\n".join(words) + b"\n"
+    n = out = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        res = apply(progs, blk)
+        n += len(words) * len(progs)
+        out += res.count(b"\n")
+    dt = time.perf_counter() - t0
+    return {"rules": len(progs), "words": len(words), "raw_rate": n / dt, "out_rate": out / dt}
@@ -0,0 +1,202 @@
+# scan_table.py
+"""
+Estado del escáner en vivo a partir del CSV de airodump-ng.
+
+- `SignalHistory`: por BSSID, un anillo de las últimas RING muestras de RSSI
+  (dBm) en un único `array('b')` contiguo + media exponencial. Añadir una
+  muestra es O(1) y sin objetos Python nuevos, así que miles de AP por
+  segundo no cuestan nada.
+- `Stations`: tabla estación → (BSSID, paquetes, último aumento) mantenida
+  de forma incremental, con el conjunto de clientes de cada BSSID.
+- `ScanTable`: une ambas y ordena por "más clientes activos, mejor señal
+  estable".
+"""
+from __future__ import annotations
+import re, time
+from array import array
+from typing import Iterable, NamedTuple, Optional
+
+RING = 32                             # muestras de RSSI por BSSID
+ALPHA = 0.3                           # peso de la muestra nueva en la media
+ACTIVE_S = 30.0                       # cliente activo si sus paquetes crecieron hace < N s
+MAC_RE = re.compile(r"([0-9A-F]{2}:){5}[0-9A-F]{2}")
+
+
+# ── CSV de airodump ──────────────────────────────────────────
+class AP(NamedTuple):
+    bssid: str
+    essid: str
+    ch:    int
+    power: int                        # dBm (-1 = desconocido)
+    enc:   str
+
+
+class Station(NamedTuple):
+    mac:     str
+    bssid:   Optional[str]            # None = "(not associated)"
+    power:   int
+    packets: int
+
+
+def _int(s: str, default: int) -> int:
+    m = re.search(r"-?\d+", s)
+    return int(m.group()) if m else default
+
+
+def parse_csv(rows: Iterable[list[str]]) -> tuple[list[AP], list[Station]]:
+    """Filas del CSV → APs (antes de "Station MAC") y estaciones (después)."""
+    aps, stations, in_st = [], [], False
+    for r in rows:
+        if not r:
+            continue
+        if r[0].startswith("Station MAC"):
+            in_st = True
+            continue
+        mac = r[0].strip().upper()
+        if not MAC_RE.fullmatch(mac):
+            continue
+        if in_st:
+            b = r[5].strip().upper() if len(r) > 5 else ""
+            stations.append(Station(mac, b if MAC_RE.fullmatch(b) else None,
+                                    _int(r[3], -1) if len(r) > 3 else -1,
+                                    _int(r[4], 0) if len(r) > 4 else 0))
+        else:
+            aps.append(AP(mac, (r[13].strip() if len(r) > 13 else "") or "<Hidden>",
+                          _int(r[3], 0) if len(r) > 3 else 0,
+                          _int(r[8], -1) if len(r) > 8 else -1,
+                          (r[5] if len(r) > 5 else "OPEN").strip() or "OPEN"))
+    return aps, stations
+
+
+# ── historial de señal ───────────────────────────────────────
+class SignalHistory:
+    def __init__(self, capacity: int = 256):
+        self.slot: dict[str, int] = {}
+        self.cap = capacity
+        self.ring = array("b", bytes(capacity * RING))
+        self.pos = array("H", bytes(2 * capacity))      # próxima posición del anillo
+        self.count = array("H", bytes(2 * capacity))
+        self.ewma = array("f", bytes(4 * capacity))
+
+    def _grow(self):
+        n = self.cap
+        self.ring.extend(bytes(n * RING))
+        self.pos.extend(array("H", bytes(2 * n)))
+        self.count.extend(array("H", bytes(2 * n)))
+        self.ewma.extend(array("f", bytes(4 * n)))
+        self.cap *= 2
+
+    def add(self, bssid: str, dbm: int):
+        """Nueva muestra; airodump usa -1 (o ≥0) cuando no sabe la potencia."""
+        if dbm >= -1 or dbm < -127:
+            return
+        i = self.slot.get(bssid)
+        if i is None:
+            if len(self.slot) == self.cap:
+                self._grow()
+            i = self.slot[bssid] = len(self.slot)
+        p = self.pos[i]
+        self.ring[i * RING + p] = dbm
+        self.pos[i] = (p + 1) % RING
+        c = self.count[i]
+        self.ewma[i] = dbm if not c else ALPHA * dbm + (1 - ALPHA) * self.ewma[i]
+        if c < RING:
+            self.count[i] = c + 1
+
+    def samples(self, bssid: str) -> list[int]:
+        """Muestras en orden cronológico (la más reciente al final)."""
+        i = self.slot.get(bssid)
+        if i is None:
+            return []
+        c, p, base = self.count[i], self.pos[i], i * RING
+        return [self.ring[base + (p - c + k) % RING] for k in range(c)]
+
+    def smoothed(self, bssid: str) -> Optional[float]:
+        i = self.slot.get(bssid)
+        return float(self.ewma[i]) if i is not None and self.count[i] else None
+
+    def spread(self, bssid: str) -> float:
+        """Desviación típica del anillo (dB): cuanto menor, más estable."""
+        s = self.samples(bssid)
+        if len(s) < 2:
+            return 0.0
+        m = sum(s) / len(s)
+        return (sum((x - m) ** 2 for x in s) / len(s)) ** 0.5
+
+    def trend(self, bssid: str) -> float:
+        """dB de diferencia entre la mitad reciente y la antigua del anillo."""
+        s = self.samples(bssid)
+        if len(s) < 4:
+            return 0.0
+        h = len(s) // 2
+        return sum(s[h:]) / (len(s) - h) - sum(s[:h]) / h
+
+
+# ── estaciones ───────────────────────────────────────────────
+class Stations:
+    def __init__(self):
+        self.table: dict[str, list] = {}                # mac → [bssid, paquetes, t_último_aumento]
+        self.by_bssid: dict[str, set[str]] = {}
+
+    def update(self, st: Station, now: float):
+        row = self.table.get(st.mac)
+        if row is None:
+            row = self.table[st.mac] = [None, st.packets, 0.0]   # activo cuando crezca
+        elif st.packets > row[1]:
+            row[1], row[2] = st.packets, now
+        if row[0] != st.bssid:                           # (re)asociación: cambia de conjunto
+            if row[0]:
+                self.by_bssid[row[0]].discard(st.mac)
+            if st.bssid:
+                self.by_bssid.setdefault(st.bssid, set()).add(st.mac)
+            row[0] = st.bssid
+
+    def clients(self, bssid: str) -> set[str]:
+        return self.by_bssid.get(bssid, set())
+
+    def active(self, bssid: str, now: float, window: float = ACTIVE_S) -> int:
+        return sum(1 for m in self.clients(bssid) if now - self.table[m][2] < window)
+
+    def packets(self, bssid: str) -> int:
+        return sum(self.table[m][1] for m in self.clients(bssid))
+
+
+# ── tabla del escáner ────────────────────────────────────────
+class ScanTable:
+    def __init__(self):
+        self.aps: dict[str, AP] = {}
+        self.signal = SignalHistory()
+        self.stations = Stations()
+        self.now = 0.0
+
+    def update(self, rows: Iterable[list[str]], now: Optional[float] = None):
+        """Un refresco del CSV (airodump lo reescribe entero cada segundo)."""
+        self.now = time.time() if now is None else now
+        aps, stations = parse_csv(rows)
+        for ap in aps:
+            self.aps[ap.bssid] = ap
+            self.signal.add(ap.bssid, ap.power)
+        for st in stations:
+            self.stations.update(st, self.now)
+
+    def score(self, bssid: str) -> tuple[int, float]:
+        """(clientes activos, señal suavizada − dispersión): mayor = mejor objetivo."""
+        sm = self.signal.smoothed(bssid)
+        return (self.stations.active(bssid, self.now),
+                (sm if sm is not None else -127.0) - self.signal.spread(bssid))
+
+    def ranked(self) -> list[AP]:
+        return sorted(self.aps.values(), key=lambda ap: self.score(ap.bssid), reverse=True)
+
+    def in_order(self) -> list[AP]:
+        return list(self.aps.values())
+
+    def survey(self) -> dict[str, list[int]]:
+        """{canal: [APs, clientes asociados]}: densidad para repartir la captura."""
+        out: dict[str, list[int]] = {}
+        for ap in self.aps.values():
+            if ap.ch > 0:
+                v = out.setdefault(str(ap.ch), [0, 0])
+                v[0] += 1
+                v[1] += len(self.stations.clients(ap.bssid))
+        return out
@@ -0,0 +1,175 @@
+# segments.py
+"""
+Captura rotativa por segmentos + manifiesto por sesión.
+
+Una sesión `dump-<ts>` produce `dump-<ts>-s001.pcapng`, `-s002`, … y un
+`dump-<ts>.manifest.json` con, por segmento: rango temporal, BSSIDs vistos
+y contadores EAPOL/PMKID. Los segmentos cerrados se resumen (y, si se
+pide, se comprimen) en un hilo aparte mientras la captura sigue.
+"""
+from __future__ import annotations
+import json, os, signal, subprocess, threading, time
+from pathlib import Path
+from typing import Callable, Optional
+
+import capstore, frame_index
+
+
+def summarize(path: str | Path) -> dict:
+    """
+    Resumen de un segmento. Sale del índice sidecar, así que la misma
+    pasada deja el .idx listo para extracciones posteriores.
+    """
+    recs = frame_index.load(path).records
+    bssids = {r.bssid for r in recs} - {"FF:FF:FF:FF:FF:FF"}
+    ts = [r.ts for r in recs if r.ts]
+    eapol = [r for r in recs if r.eapol]
+    return {
+        "file":    Path(path).name,
+        "size":    Path(path).stat().st_size,
+        "start":   min(ts, default=None),
+        "end":     max(ts, default=None),
+        "packets": len(recs),
+        "eapol":   len(eapol),
+        "pmkid":   sum(r.pmkid for r in eapol),
+        "bssids":  sorted(bssids),
+    }
+
+
+# ── manifiesto ───────────────────────────────────────────────
+class Manifest:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.data = (json.loads(self.path.read_text()) if self.path.exists()
+                     else {"session": self.path.name.split(".")[0], "segments": []})
+
+    @property
+    def segments(self) -> list[dict]:
+        return self.data["segments"]
+
+    def add(self, seg: dict):
+        with self.lock:
+            self.segments[:] = [s for s in self.segments if s["file"] != seg["file"]]
+            self.segments.append(seg)
+            self.segments.sort(key=lambda s: s["file"])
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.data, indent=1))
+            os.replace(tmp, self.path)                 # nunca medio escrito
+
+    def rename(self, old: str, new: str, size: int):
+        """Un segmento cambió de fichero (p.ej. comprimido después)."""
+        with self.lock:
+            seg = next((s for s in self.segments if s["file"] == old), None)
+            self.segments[:] = [s for s in self.segments if s["file"] != old]
+        if seg:
+            self.add({**seg, "file": new, "raw_size": seg.get("raw_size", seg["size"]), "size": size})
+
+    def files(self, bssid: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> list[Path]:
+        """Segmentos relevantes (por BSSID y/o ventana temporal)."""
+        out = []
+        for s in self.segments:
+            if bssid and bssid.upper() not in s["bssids"]:
+                continue
+            if since and s["end"] and s["end"] < since:
+                continue
+            if until and s["start"] and s["start"] > until:
+                continue
+            out.append(self.path.parent / s["file"])
+        return [p for p in out if p.exists()]
+
+
+def manifests(cap_dir: Path) -> list[Manifest]:
+    return [Manifest(p) for p in sorted(cap_dir.glob("*.manifest.json"))]
+
+
+# ── captura rotativa ─────────────────────────────────────────
+class RotatingCapture:
+    """
+    Lanza hcxdumptool y lo reinicia sobre un fichero nuevo cada `max_mb` MB
+    o `max_min` minutos (0 = sin límite). hcxdumptool no rota por sí mismo,
+    así que entre segmentos hay un hueco del orden del arranque (~1 s).
+    """
+
+    def __init__(self, cmd: Callable[[Path], list[str]], cap_dir: Path,
+                 session: str, max_mb: float = 0, max_min: float = 0,
+                 on_segment: Optional[Callable[[Path, dict], None]] = None,
+                 compress: Optional[str] = None):
+        self.cmd = cmd
+        self.compress = compress
+        self.dir = cap_dir
+        self.session = session
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_secs = max_min * 60
+        self.on_segment = on_segment
+        self.manifest = Manifest(cap_dir / f"{session}.manifest.json")
+        self.workers: list[threading.Thread] = []
+        self.current: Optional[Path] = None
+        self.n = 0
+
+    def _next_path(self) -> Path:
+        self.n += 1
+        return self.dir / f"{self.session}-s{self.n:03d}.pcapng"
+
+    def _finish(self, seg: Path):
+        """Resume (y comprime) el segmento cerrado en segundo plano."""
+        def work():
+            nonlocal seg
+            if not seg.exists() or seg.stat().st_size < 100:
+                seg.unlink(missing_ok=True)
+                return
+            info = summarize(seg)
+            if self.compress:
+                idx = frame_index.load(seg)
+                seg = capstore.compress(seg, self.compress)
+                frame_index.move(idx, seg)
+                info.update(file=seg.name, raw_size=info["size"], size=seg.stat().st_size)
+            self.manifest.add(info)
+            if self.on_segment:
+                self.on_segment(seg, info)
+        t = threading.Thread(target=work, daemon=True)
+        t.start()
+        self.workers.append(t)
+
+    def _stop(self, proc: subprocess.Popen):
+        if proc.poll() is None:
+            proc.send_signal(signal.SIGINT)
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.terminate()
+                proc.wait()
+
+    def run(self, poll: float = 1.0) -> list[Path]:
+        """Bucle principal; Ctrl-C cierra el segmento en curso y vuelve."""
+        try:
+            while True:
+                seg = self._next_path()
+                self.current = seg
+                proc = subprocess.Popen(self.cmd(seg))
+                t0 = time.monotonic()
+                rotated = False
+                try:
+                    while proc.poll() is None:
+                        time.sleep(poll)
+                        size = seg.stat().st_size if seg.exists() else 0
+                        if ((self.max_bytes and size >= self.max_bytes) or
+                                (self.max_secs and time.monotonic() - t0 >= self.max_secs)):
+                            self._stop(proc)
+                            rotated = True
+                except KeyboardInterrupt:
+                    self._stop(proc)
+                    self._finish(seg)
+                    raise
+                self._finish(seg)
+                if not rotated:                    # hcxdumptool salió por su cuenta
+                    if proc.returncode not in (0, -signal.SIGINT, 130):
+                        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for t in self.workers:
+                t.join()
+        return self.manifest.files()
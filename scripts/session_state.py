@@ -0,0 +1,58 @@
+# session_state.py
+"""
+Estado de sesión compartido entre invocaciones (monitor, objetivo, última
+captura / hash, …) en un JSON junto al proyecto.
+
+Leer es un `json.load` de un fichero pequeño (decenas de µs). Cada escritura
+es una transacción: flock sobre `<estado>.lock`, se relee el fichero (otro
+proceso puede haber cambiado otras claves), se aplican los cambios y se
+sustituye de forma atómica (tmp + os.replace), así que un lector nunca ve un
+fichero a medias.
+"""
+from __future__ import annotations
+import fcntl, json, os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+
+class State(dict):
+    """dict persistente: `STATE[k] = v` y `STATE.update(...)` escriben en disco."""
+
+    def __init__(self, path: str | Path, defaults: Optional[dict] = None):
+        super().__init__(defaults or {})
+        self.path = Path(path)
+        super().update(self._read())
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lk:
+            fcntl.flock(lk, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lk, fcntl.LOCK_UN)
+
+    def update(self, *args, **kw):
+        changes = dict(*args, **kw)
+        with self._locked():
+            text = json.dumps({**self, **self._read(), **changes}, indent=1, default=str)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(text)
+            os.replace(tmp, self.path)
+        super().update(json.loads(text))              # Path → str, igual que al releer
+
+    def __setitem__(self, key: str, value: Any):
+        self.update({key: value})
+
+    def reload(self):
+        super().update(self._read())
@@ -0,0 +1,419 @@
+# sharding.py
+"""
+Reparto de una word-list entre varios procesos hashcat sin copiarla.
+
+La word-list se mapea con mmap y se corta en N rangos de bytes alineados a
+salto de línea; cada worker escribe su rango (memoryview, sin copias) en el
+stdin de su propio hashcat, con su juego de dispositivos (-d) o de cores
+(afinidad). Cuando un worker acaba, roba la mitad final del rango que más
+trabajo pendiente tiene (work stealing), de modo que todos terminan a la vez.
+
+El modo interactivo usa lo mismo por bloques (`LineBlocks`): cada bloque es
+un rango (inicio, fin) de N líneas sobre el mmap, sin ficheros temporales.
+
+Una word-list comprimida no se puede mapear: `PackedCrack` / `PackedBlocks`
+tiran de un único `wordlists.Inflater` (descompresión en otro hilo) y el
+progreso se cuenta en bytes comprimidos.
+"""
+from __future__ import annotations
+import mmap, os, tempfile, threading, time
+from pathlib import Path
+from typing import Callable, Optional
+
+import crack_engine, telemetry, wordlists
+
+PIECE = 4 << 20                    # bytes por escritura en el pipe
+MIN_STEAL = 2 * PIECE              # no merece la pena robar menos que esto
+
+
+def align(mm, pos: int, end: int) -> int:
+    """Primer inicio de línea en [pos, end] (o `end`)."""
+    if pos <= 0:
+        return 0
+    if pos >= end:
+        return end
+    i = mm.find(b"\n", pos - 1, end)
+    return end if i < 0 else i + 1
+
+
+def ranges(mm, n: int) -> list[tuple[int, int]]:
+    """N rangos de bytes contiguos, cada uno empezando en inicio de línea."""
+    size = len(mm)
+    cuts = [0] + [align(mm, size * i // n, size) for i in range(1, n)] + [size]
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
+
+
+class Shard:
+    def __init__(self, n: int, start: int, end: int):
+        self.n = n
+        self.pos = start
+        self.end = end
+        self.lock = threading.Lock()
+        self.done = 0
+
+    @property
+    def left(self) -> int:
+        return max(0, self.end - self.pos)
+
+
+def cpu_groups(n: int) -> list[set[int]]:
+    """Reparte los cores disponibles en `n` grupos disjuntos."""
+    cores = sorted(os.sched_getaffinity(0))
+    if n <= 1 or len(cores) < n:
+        return [set(cores)] * max(n, 1)
+    return [set(cores[i::n]) for i in range(n)]
+
+
+def write_range(out, mm, a: int, b: int):
+    """Escribe [a, b) del mmap en `out` por trozos de PIECE (memoryview, sin copias)."""
+    view = memoryview(mm)
+    try:
+        for p in range(a, b, PIECE):
+            out.write(view[p:min(b, p + PIECE)])
+        if b > a and mm[b - 1:b] != b"\n":
+            out.write(b"\n")                         # última línea sin salto
+    finally:
+        view.release()
+
+
+def skip_lines(mm, pos: int, n: int) -> tuple[int, int]:
+    """Avanza `n` líneas desde `pos`: (nueva posición, líneas). Memoria acotada a PIECE."""
+    end, done = len(mm), 0
+    while pos < end and done < n:
+        q = min(end, pos + PIECE)
+        piece = mm[pos:q]
+        c = piece.count(b"\n")
+        if done + c < n:
+            done += c
+            if q == end and piece[-1:] != b"\n":
+                done += 1                             # última línea sin salto
+            pos = q
+            continue
+        i = -1
+        for _ in range(n - done):
+            i = piece.find(b"\n", i + 1)
+        pos, done = pos + i + 1, n
+    return pos, done
+
+
+class LineBlocks:
+    """
+    Bloques consecutivos de N líneas de una word-list como rangos de bytes
+    del mmap: no se copia nada ni se escribe en disco, y la memoria por
+    bloque no crece con su tamaño.
+    """
+
+    def __init__(self, wordlist: str | Path):
+        self.fh = open(wordlist, "rb")
+        size = os.fstat(self.fh.fileno()).st_size
+        self.mm = mmap.mmap(self.fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.mm.madvise(mmap.MADV_SEQUENTIAL)
+        self.pos = 0
+        self.lines = 0                                # líneas entregadas hasta ahora
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return len(self.mm)
+
+    def take(self, n: int) -> tuple[int, int, int]:
+        """Siguiente bloque de hasta `n` líneas: (inicio, fin, líneas)."""
+        a = self.pos
+        self.pos, lines = skip_lines(self.mm, a, n)
+        self.lines += lines
+        return a, self.pos, lines
+
+    def crack(self, hashf: str | Path, a: int, b: int, extra: Optional[list[str]] = None,
+              tel: Optional[telemetry.Telemetry] = None) -> int:
+        """hashcat sobre [a, b) por stdin; devuelve su código de salida."""
+        proc = crack_engine.launch(["-m", "22000", str(hashf), "--quiet", *(extra or [])], tel)
+        try:
+            write_range(proc.stdin, self.mm, a, b)
+        except (BrokenPipeError, OSError):
+            pass                                      # hashcat ya terminó (todo crackeado)
+        finally:
+            try:
+                proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            proc.wait()
+        return proc.returncode
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self.fh.close()
+
+
+class PackedBlocks:
+    """
+    `LineBlocks` sobre una word-list comprimida: los bloques son rangos de
+    líneas del flujo descomprimido. Como no se sabe dónde acaba sin leerla,
+    `take` promete hasta `n` líneas y `crack` entrega las que haya (`lines`
+    lleva la cuenta real).
+    """
+
+    def __init__(self, wordlist: str | Path):
+        self.inf = wordlists.Inflater(wordlist)
+        self.carry = b""
+        self.pos = 0
+        self.lines = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return self.inf.size
+
+    def _next(self) -> bytes:
+        blk, self.carry = self.carry or self.inf.get()[0], b""
+        return blk
+
+    def take(self, n: int) -> tuple[int, int, int]:
+        if not self.carry:
+            self.carry = self.inf.get()[0]
+        if not self.carry:
+            return self.pos, self.pos, 0
+        return self.pos, self.pos + n, n
+
+    def crack(self, hashf: str | Path, a: int, b: int, extra: Optional[list[str]] = None,
+              tel: Optional[telemetry.Telemetry] = None) -> int:
+        proc = crack_engine.launch(["-m", "22000", str(hashf), "--quiet", *(extra or [])], tel)
+        left = b - a
+        try:
+            while left > 0:
+                blk = self._next()
+                if not blk:
+                    break
+                c = blk.count(b"\n")
+                if c > left:
+                    cut, _ = skip_lines(blk, 0, left)
+                    blk, self.carry, c = blk[:cut], blk[cut:], left
+                proc.stdin.write(blk)
+                left -= c
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            sent = b - a - left
+            self.pos += sent
+            self.lines += sent
+            try:
+                proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            proc.wait()
+        return proc.returncode
+
+    def close(self):
+        self.inf.close()
+
+
+def _poll_found(outs: list[str], seen: list[int], on_found: Optional[Callable[[str, str], None]]):
+    """Lee lo nuevo de los --outfile de cada worker (sólo líneas completas)."""
+    for i, path in enumerate(outs):
+        try:
+            with open(path, "rb") as f:
+                f.seek(seen[i])
+                data = f.read()
+        except OSError:
+            continue
+        data = data[:data.rfind(b"\n") + 1]
+        seen[i] += len(data)
+        for line in data.decode(errors="replace").splitlines():
+            hit = crack_engine.parse_found(line)
+            if hit and on_found:
+                on_found(*hit)
+
+
+class ShardedCrack:
+    """
+    `devices`: una lista de grupos para `hashcat -d` (p.ej. ["1,2", "3"]);
+    sin ella, con varios workers, cada hashcat se fija a un grupo de cores.
+    """
+
+    def __init__(self, hashf: str | Path, wordlist: str | Path, workers: int = 1,
+                 devices: Optional[list[str]] = None, extra: Optional[list[str]] = None,
+                 tel: Optional[telemetry.Telemetry] = None):
+        self.hashf = str(hashf)
+        self.wordlist = Path(wordlist)
+        self.devices = devices or []
+        self.workers = max(workers, len(self.devices), 1)
+        self.extra = extra or []
+        self.tel = tel
+        self.size = self.wordlist.stat().st_size
+        self.steals = 0
+        self._steal_lock = threading.Lock()
+
+    # ── work stealing ────────────────────────────────────────
+    def _steal(self, mm, me: Shard, shards: list[Shard]) -> bool:
+        with self._steal_lock:
+            victim = max((s for s in shards if s is not me), key=lambda s: s.left, default=None)
+            if victim is None:
+                return False
+            with victim.lock:
+                if victim.left < MIN_STEAL:
+                    return False
+                mid = align(mm, victim.pos + victim.left // 2, victim.end)
+                if mid >= victim.end:
+                    return False
+                with me.lock:
+                    me.pos, me.end = mid, victim.end
+                victim.end = mid
+            self.steals += 1
+            return True
+
+    # ── worker ───────────────────────────────────────────────
+    def _launch(self, n: int, outfile: str):
+        dev = ["-d", self.devices[n]] if n < len(self.devices) else []
+        cores = self._cores[n] if not dev and self.workers > 1 else None
+        return crack_engine.launch(
+            ["-m", "22000", self.hashf, "--quiet", "--session", f"wpa2lab-{os.getpid()}-{n}",
+             "-o", outfile, "--outfile-format", "1,2", *dev, *self.extra],
+            self.tel, str(n),
+            cores=cores)
+
+    def _worker(self, mm, me: Shard, shards: list[Shard], outfile: str,
+                halt: threading.Event, on_progress: Optional[Callable[[int], None]]):
+        proc = self._launch(me.n, outfile)
+        view = memoryview(mm)
+        try:
+            while not halt.is_set():
+                with me.lock:
+                    a = me.pos
+                    b = align(mm, min(a + PIECE, me.end), me.end) if a < me.end else a
+                    me.pos = b
+                if a >= b:
+                    if self._steal(mm, me, shards):
+                        continue
+                    break
+                proc.stdin.write(view[a:b])
+                if mm[b - 1:b] != b"\n":
+                    proc.stdin.write(b"\n")          # última línea sin salto
+                me.done += b - a
+                if on_progress:
+                    on_progress(b - a)
+        except (BrokenPipeError, OSError):
+            pass                                      # hashcat ya terminó
+        finally:
+            view.release()
+            try:
+                proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            proc.wait()
+
+    def run(self, on_progress: Optional[Callable[[int], None]] = None,
+            on_found: Optional[Callable[[str, str], None]] = None) -> dict:
+        """Lanza los workers; `on_found(essid, pw)` se llama según hashcat los va escribiendo."""
+        t0 = time.perf_counter()
+        if not self.size:
+            return {"bytes": 0, "elapsed": 0.0, "steals": 0, "per_worker": [], "rate": 0.0}
+        self._cores = cpu_groups(self.workers)
+        halt = threading.Event()
+        with open(self.wordlist, "rb") as fh, \
+             mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+             tempfile.TemporaryDirectory(prefix="wpa2lab-") as tmp:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            shards = [Shard(i, a, b) for i, (a, b) in enumerate(ranges(mm, self.workers))]
+            outs = [os.path.join(tmp, f"found-{s.n}") for s in shards]
+            threads = [threading.Thread(target=self._worker, daemon=True,
+                                        args=(mm, s, shards, o, halt, on_progress))
+                       for s, o in zip(shards, outs)]
+            for th in threads:
+                th.start()
+            seen = [0] * len(outs)
+            try:
+                while any(th.is_alive() for th in threads):
+                    time.sleep(0.5)
+                    _poll_found(outs, seen, on_found)
+            except KeyboardInterrupt:
+                halt.set()
+                for th in threads:
+                    th.join()
+            _poll_found(outs, seen, on_found)
+            per = [s.done for s in shards]
+        elapsed = time.perf_counter() - t0
+        return {"bytes": sum(per), "elapsed": elapsed, "steals": self.steals,
+                "per_worker": per, "rate": sum(per) / elapsed if elapsed else 0.0,
+                "interrupted": halt.is_set()}
+
+
+class PackedCrack(ShardedCrack):
+    """
+    `ShardedCrack` para una word-list comprimida. No hay rangos que robar:
+    todos los workers piden el siguiente bloque a la misma cola del
+    `Inflater`, así que el más rápido simplemente se lleva más. `size` y el
+    progreso son bytes comprimidos; `bytes`/`rate` del resultado, los
+    descomprimidos que llegaron a hashcat.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._seen = 0
+        self._lock = threading.Lock()
+
+    def _advance(self, pos: int, on_progress: Optional[Callable[[int], None]]):
+        with self._lock:
+            d, self._seen = pos - self._seen, max(self._seen, pos)
+        if d > 0 and on_progress:
+            on_progress(d)
+
+    def _worker(self, inf: wordlists.Inflater, n: int, per: list[int], outfile: str,
+                halt: threading.Event, on_progress: Optional[Callable[[int], None]]):
+        proc = self._launch(n, outfile)
+        try:
+            while not halt.is_set():
+                blk, pos = inf.get()
+                if not blk:
+                    break
+                proc.stdin.write(blk)
+                per[n] += len(blk)
+                self._advance(pos, on_progress)
+        except (BrokenPipeError, OSError):
+            pass                                      # hashcat ya terminó
+        finally:
+            try:
+                proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            proc.wait()
+
+    def run(self, on_progress: Optional[Callable[[int], None]] = None,
+            on_found: Optional[Callable[[str, str], None]] = None) -> dict:
+        t0 = time.perf_counter()
+        self._cores = cpu_groups(self.workers)
+        halt = threading.Event()
+        per = [0] * self.workers
+        with wordlists.Inflater(self.wordlist) as inf, \
+             tempfile.TemporaryDirectory(prefix="wpa2lab-") as tmp:
+            outs = [os.path.join(tmp, f"found-{n}") for n in range(self.workers)]
+            threads = [threading.Thread(target=self._worker, daemon=True,
+                                        args=(inf, n, per, o, halt, on_progress))
+                       for n, o in enumerate(outs)]
+            for th in threads:
+                th.start()
+            seen = [0] * len(outs)
+            try:
+                while any(th.is_alive() for th in threads):
+                    time.sleep(0.5)
+                    _poll_found(outs, seen, on_found)
+            except KeyboardInterrupt:
+                halt.set()
+                for th in threads:
+                    th.join()
+            _poll_found(outs, seen, on_found)
+        elapsed = time.perf_counter() - t0
+        return {"bytes": sum(per), "elapsed": elapsed, "steals": 0, "packed": self._seen,
+                "per_worker": per, "rate": sum(per) / elapsed if elapsed else 0.0,
+                "interrupted": halt.is_set()}
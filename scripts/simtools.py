@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# simtools.py
+"""
+Simuladores deterministas de las herramientas externas, para medir el
+propio pipeline sin radio ni GPU (CI, portátil).
+
+Un solo ejecutable al estilo busybox: `sim/bin/<herramienta>` son enlaces a
+este fichero y el nombre con el que se invoca decide qué simula.
+
+- `airodump-ng`: reescribe `<prefijo>-01.csv` cada `--write-interval` s con
+  APs y estaciones inventados (semilla fija): la potencia oscila y los
+  paquetes de cada estación crecen a su ritmo.
+- `hcxdumptool`: escribe en `-w` un pcapng con los frames de una captura
+  grabada (`frames`), en bucle, a `pps` frames/s y con timestamps actuales.
+- `hcxpcapngtool`: saca líneas 22000 reales (PMKID y pares M1/M2) de los
+  pcapng y el mismo resumen de texto que la herramienta de verdad.
+- `hashcat`: consume candidatos (stdin o word-list) a `rate` c/s, "crackea"
+  las contraseñas de `passwords` o el candidato nº `crack_at` de cada
+  proceso, escribe potfile / `-o` y el estado de `--status-json`; también
+  `--show`, `--version` y `-b`.
+- `sudo` (ejecuta el resto tal cual) e `iw` (`iw dev`, `set channel`).
+
+Parámetros: `sim:` en config.yaml y, por encima, `WPA2LAB_SIM_<CLAVE>`
+(listas separadas por comas). `activate()` pone `sim/bin` delante en el PATH.
+"""
+from __future__ import annotations
+import json, os, random, signal, struct, sys, tempfile, threading, time
+from pathlib import Path
+from typing import Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECTROOT = SCRIPT_DIR.parent
+SIM_BIN = PROJECTROOT / "sim" / "bin"
+ENV = "WPA2LAB_SIM"
+TOOLS = ("airodump-ng", "hcxdumptool", "hcxpcapngtool", "hashcat", "sudo", "iw")
+
+DEFAULTS = {
+    "seed": 0,
+    # airodump-ng
+    "aps": 12, "stations": 20,
+    # hcxdumptool
+    "frames": "captures/bueno.pcapng", "pps": 200.0, "duration": 0.0,
+    # hashcat
+    "rate": 0.0,                      # c/s por proceso (0 = lo que dé de sí)
+    "passwords": ["labsecret"],
+    "crack_at": [],                   # índices (desde 0, por proceso) que se dan por buenos
+    "potfile": str(Path(tempfile.gettempdir()) / "wpa2lab-sim" / "hashcat.potfile"),
+    "bench": [1_200_000.0],           # H/s por dispositivo para `-b`
+    "version": "v6.2.6",
+    # iw
+    "ifaces": ["wlan0mon", "wlan1"],
+}
+
+
+def enabled() -> bool:
+    if os.environ.get(ENV, "").lower() in ("1", "true", "yes", "on"):
+        return True
+    return bool(_file_config().get("enabled"))
+
+
+def activate():
+    """`sim/bin` delante en el PATH de este proceso y de sus hijos."""
+    path = os.environ.get("PATH", "")
+    if not path.startswith(str(SIM_BIN) + os.pathsep):
+        os.environ["PATH"] = str(SIM_BIN) + os.pathsep + path
+
+
+def _file_config() -> dict:
+    try:
+        import yaml
+        return (yaml.safe_load((PROJECTROOT / "config.yaml").read_text()) or {}).get("sim") or {}
+    except (OSError, ImportError, AttributeError, ValueError):
+        return {}
+
+
+def _coerce(raw: str, like):
+    if isinstance(like, list):
+        return [_coerce(x.strip(), like[0] if like else "") for x in raw.split(",") if x.strip()]
+    if isinstance(like, bool):
+        return raw.lower() in ("1", "true", "yes", "on")
+    if isinstance(like, (int, float)):
+        return type(like)(float(raw)) if isinstance(like, float) else int(raw)
+    return raw
+
+
+def config() -> dict:
+    """DEFAULTS ← config.yaml `sim:` ← WPA2LAB_SIM_<CLAVE>."""
+    cfg = dict(DEFAULTS)
+    cfg.update({k: v for k, v in _file_config().items() if k in DEFAULTS})
+    for k, like in DEFAULTS.items():
+        raw = os.environ.get(f"{ENV}_{k.upper()}")
+        if raw is not None:
+            cfg[k] = _coerce(raw, like)
+    at = cfg["crack_at"]
+    cfg["crack_at"] = [int(x) for x in (at if isinstance(at, list) else [at])]
+    return cfg
+
+
+def _opt(argv: list[str], name: str, default=None):
+    return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else default
+
+
+class _Stop:
+    """SIGINT/SIGTERM → salida limpia en el siguiente punto de control."""
+
+    def __init__(self):
+        self.ev = threading.Event()
+        for s in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(s, lambda *_: self.ev.set())
+
+    def wait(self, secs: float) -> bool:
+        return self.ev.wait(max(secs, 0))
+
+    def __bool__(self):
+        return self.ev.is_set()
+
+
+# ── airodump-ng ──────────────────────────────────────────────
+ESSIDS = ["MOVISTAR_{:04X}", "vodafone{:04X}", "MiFibra-{:04X}", "DIRECT-{:02X}-HP Printer",
+          "Orange-{:04X}", "WLAN_{:02X}", "", "WPA2_LAB"]
+ENCS = [("WPA2", "CCMP", "PSK")] * 6 + [("WPA2 WPA", "CCMP TKIP", "PSK"), ("OPN", "", "")]
+AP_HEAD = ("BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, "
+           "Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key")
+ST_HEAD = "Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs"
+
+
+def _mac(rng: random.Random) -> str:
+    return ":".join(f"{b:02X}" for b in [rng.randrange(256) & 0xFC, *rng.randbytes(5)])
+
+
+def airodump(argv: list[str], cfg: dict) -> int:
+    prefix, interval = _opt(argv, "-w"), float(_opt(argv, "--write-interval", 5))
+    if not prefix:
+        print("airodump-ng (sim): falta -w <prefijo>", file=sys.stderr)
+        return 1
+    rng = random.Random(cfg["seed"])
+    aps = []
+    for i in range(cfg["aps"]):
+        essid = ESSIDS[i % len(ESSIDS)].format(rng.randrange(1 << 16))
+        aps.append({"bssid": _mac(rng), "essid": essid, "ch": rng.choice([1, 6, 11, 1, 6, 11, 3, 9, 13]),
+                    "pwr": rng.randint(-88, -35), "enc": ENCS[i % len(ENCS)], "beacons": 0})
+    stas = [{"mac": _mac(rng), "ap": rng.randrange(len(aps)) if aps and rng.random() < 0.8 else None,
+             "pwr": rng.randint(-85, -40), "pps": rng.choice([0.2, 1, 3, 10]), "packets": 0}
+            for _ in range(cfg["stations"])]
+    path = Path(f"{prefix}-01.csv")
+    stop, t0 = _Stop(), time.time()
+    first = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t0))
+    while True:
+        last = time.strftime("%Y-%m-%d %H:%M:%S")
+        rows = ["", AP_HEAD]
+        for ap in aps:
+            ap["beacons"] += int(10 * interval)
+            p = ap["pwr"] + rng.randint(-3, 3)
+            rows.append(f"{ap['bssid']}, {first}, {last}, {ap['ch']:2d}, 130, {ap['enc'][0]:<4}, "
+                        f"{ap['enc'][1]}, {ap['enc'][2]}, {p:3d}, {ap['beacons']:8d}, 0,   0.  0.  0.  0, "
+                        f"{len(ap['essid']):2d}, {ap['essid']}, ")
+        rows += ["", ST_HEAD]
+        for st in stas:
+            st["packets"] += int(st["pps"] * interval + rng.random())
+            bssid = aps[st["ap"]]["bssid"] if st["ap"] is not None else "(not associated) "
+            rows.append(f"{st['mac']}, {first}, {last}, {st['pwr'] + rng.randint(-3, 3):3d}, "
+                        f"{st['packets']:8d}, {bssid}, ")
+        with open(path, "w", newline="") as fh:            # airodump reescribe el CSV entero
+            fh.write("\r\n".join(rows) + "\r\n\r\n")
+        if stop.wait(interval) or (cfg["duration"] and time.time() - t0 >= cfg["duration"]):
+            return 0
+
+
+# ── hcxdumptool ──────────────────────────────────────────────
+def _recording(cfg: dict) -> tuple[list[int], list[tuple[int, bytes]]]:
+    """(linktypes, [(iface, frame)]) de la captura grabada."""
+    import pcapng_io
+    src = Path(cfg["frames"])
+    src = src if src.is_absolute() else PROJECTROOT / src
+    kinds: list[int] = []
+    frames: list[tuple[int, bytes]] = []
+    with pcapng_io.open_capture(src) as fh:
+        for pkt in pcapng_io.iter_packets(fh):
+            if pkt.linktype not in kinds:
+                kinds.append(pkt.linktype)
+            frames.append((kinds.index(pkt.linktype), pkt.data))
+    return kinds, frames
+
+
+def hcxdumptool(argv: list[str], cfg: dict) -> int:
+    import cap_merge
+    out = _opt(argv, "-w")
+    if not out:
+        print("hcxdumptool (sim): falta -w <fichero>", file=sys.stderr)
+        return 1
+    try:
+        kinds, frames = _recording(cfg)
+    except OSError as e:
+        print(f"hcxdumptool (sim): sin frames grabados: {e}", file=sys.stderr)
+        return 1
+    if not frames:
+        return 1
+    pps, stop, t0 = cfg["pps"], _Stop(), time.time()
+    n = 0
+    with open(out, "wb") as fh:
+        fh.write(cap_merge.SHB + b"".join(cap_merge._idb(k) for k in kinds))
+        fh.flush()
+        while not stop:
+            now = time.time()
+            due = len(frames) if not pps else int((now - t0) * pps) - n
+            for _ in range(max(due, 0)):
+                iid, data = frames[n % len(frames)]
+                fh.write(cap_merge._epb(iid, now, data))
+                n += 1
+            fh.flush()                                         # bloques completos para CaptureTail
+            if cfg["duration"] and now - t0 >= cfg["duration"]:
+                break
+            stop.wait(0.05 if pps else 0)
+    print(f"\n{n} packets written (sim)", file=sys.stderr)
+    return 0
+
+
+# ── hcxpcapngtool ────────────────────────────────────────────
+def _key_fields(d: bytes, e: int) -> dict:
+    """Campos de un EAPOL-Key que empieza en `e` (versión 802.1X)."""
+    blen = struct.unpack_from(">H", d, e + 2)[0]
+    frame = bytearray(d[e:e + 4 + blen])
+    mic = bytes(frame[81:97])
+    frame[81:97] = bytes(16)
+    return {"replay": struct.unpack_from(">Q", d, e + 9)[0], "nonce": d[e + 17:e + 49],
+            "mic": mic, "eapol": bytes(frame)}
+
+
+def extract(paths: list[str]) -> tuple[list[str], list[dict]]:
+    """Líneas 22000 (PMKID y pares M1/M2 con el mismo replay counter) y resumen por fichero."""
+    import pcapng_io
+    essid: dict[str, bytes] = {}
+    m1: dict[tuple[str, str], dict] = {}
+    out: dict[str, str] = {}
+    stats = []
+    for fi, p in enumerate(paths):
+        st = {"file": Path(p).name, "packets": 0, "eapol": 0, "pmkid": 0, "first": None, "last": None,
+              "pmkid_written": 0, "pairs_written": 0}
+        with pcapng_io.open_capture(p) as fh:
+            for pkt in pcapng_io.iter_packets(fh):
+                st["packets"] += 1
+                st["first"] = st["first"] or pkt.ts
+                st["last"] = pkt.ts
+                info = pcapng_io.decode(pkt.linktype, pkt.data)
+                if info is None:
+                    continue
+                if info.ftype == 0 and info.subtype in (5, 8):
+                    e = pcapng_io.beacon_essid(pkt.linktype, pkt.data)
+                    if e:
+                        essid.setdefault(info.bssid, e.encode("utf-8", "surrogateescape"))
+                    continue
+                if not info.eapol:
+                    continue
+                st["eapol"] += 1
+                i = pkt.data.find(pcapng_io.EAPOL_SNAP)
+                k = _key_fields(pkt.data, i + 8)
+                k["file"] = fi
+                key = (info.bssid, info.client)
+                if info.eapol == 1:
+                    m1[key] = k
+                    if info.pmkid:
+                        st["pmkid"] += 1
+                        kd = pkt.data[i + 8 + 99:]
+                        j = kd.find(pcapng_io.PMKID_KDE)
+                        k["pmkid"] = kd[j + 6:j + 22]
+                elif info.eapol == 2 and key in m1 and m1[key]["replay"] == k["replay"]:
+                    k["anonce"] = m1[key]["nonce"]
+                    out.setdefault(("02",) + key + (k["mic"],), k)
+                if info.eapol == 1 and "pmkid" in k:
+                    out.setdefault(("01",) + key + (k["pmkid"],), k)
+        stats.append(st)
+    lines = []
+    for (kind, ap, cl, val), k in out.items():
+        e = essid.get(ap)
+        if not e:
+            continue                                           # sin ESSID no hay hash
+        a, c = ap.replace(":", "").lower(), cl.replace(":", "").lower()
+        if kind == "01":
+            lines.append(f"WPA*01*{val.hex()}*{a}*{c}*{e.hex()}***01")
+            stats[k["file"]]["pmkid_written"] += 1
+        else:
+            lines.append(f"WPA*02*{val.hex()}*{a}*{c}*{e.hex()}*{k['anonce'].hex()}*{k['eapol'].hex()}*00")
+            stats[k["file"]]["pairs_written"] += 1
+    return lines, stats
+
+
+def hcxpcapngtool(argv: list[str], cfg: dict) -> int:
+    out = _opt(argv, "-o")
+    skip = {out, "-o"}
+    paths = [a for a in argv if a not in skip and not a.startswith("-")]
+    if not paths:
+        print("hcxpcapngtool (sim): sin capturas", file=sys.stderr)
+        return 1
+    lines, stats = extract(paths)
+    for st in stats:
+        dur = int((st["last"] or 0) - (st["first"] or 0))
+        print(f"hcxpcapngtool 6.3.4 (sim) reading from {st['file']}...\n\n"
+              f"summary capture file\n--------------------\n"
+              f"{'file name':.<41}: {st['file']}\n"
+              f"{'duration of the dump tool (seconds)':.<41}: {dur}\n"
+              f"{'packets inside':.<41}: {st['packets']}\n"
+              f"{'EAPOL messages (total)':.<41}: {st['eapol']}\n"
+              f"{'RSN PMKID (total)':.<41}: {st['pmkid']}\n"
+              f"{'RSN PMKID written to 22000 hash file':.<41}: {st['pmkid_written']}\n"
+              f"{'EAPOL pairs written to 22000 hash file':.<41}: {st['pairs_written']}\n")
+    if out and lines:
+        Path(out).write_text("".join(l + "\n" for l in lines))
+    return 0
+
+
+# ── hashcat ──────────────────────────────────────────────────
+def _hashes(path: str) -> list[list[str]]:
+    try:
+        with open(path, errors="ignore") as fh:
+            return [p for p in (l.strip().split("*") for l in fh) if len(p) == 9 and p[0] == "WPA"]
+    except OSError:
+        return []
+
+
+HC_VALUED = {"-m", "-a", "-o", "-d", "-w", "-r", "-s", "-l", "--outfile-format", "--session",
+             "--status-timer", "--potfile-path", "--skip", "--limit", "--nonce-error-corrections"}
+
+
+def _positional(argv: list[str]) -> list[str]:
+    """hash y word-list: lo que no es opción ni valor de una opción."""
+    out, skip = [], False
+    for a in argv:
+        if skip:
+            skip = False
+        elif a in HC_VALUED:
+            skip = True
+        elif not a.startswith("-"):
+            out.append(a)
+    return out
+
+
+def _hit(h: list[str], pw: str) -> str:
+    """Formato de --show / --outfile-format 1,2 para 22000."""
+    return f"{h[2]}:{h[3]}:{h[4]}:{bytes.fromhex(h[5]).decode(errors='replace')}:{pw}\n"
+
+
+def hashcat(argv: list[str], cfg: dict) -> int:
+    if "--version" in argv:
+        print(f"{cfg['version']} (sim)")
+        return 0
+    if "-b" in argv:
+        for d, sp in enumerate(cfg["bench"], 1):
+            print(f"{d}:22000:1500:2000:{1e3 / max(sp, 1):.3f}:{sp:.0f}")
+        return 0
+    pos = _positional(argv)
+    hashf = pos[0] if pos else None
+    pot = None if "--potfile-disable" in argv else Path(_opt(argv, "--potfile-path", cfg["potfile"]))
+    lines = _hashes(hashf) if hashf else []
+    if "--show" in argv:
+        mics = {h[2] for h in lines}
+        if pot and pot.exists():
+            sys.stdout.write("".join(l for l in pot.read_text().splitlines(True) if l.split(":", 1)[0] in mics))
+        return 0
+    if not lines:
+        print(f"hashcat (sim): {hashf}: sin hashes", file=sys.stderr)
+        return 255
+    outfile = _opt(argv, "-o")
+    words = {w.encode() for w in cfg["passwords"]}
+    at = set(cfg["crack_at"])
+    rate = cfg["rate"]
+    left = list(lines)
+    n, t0, stop = 0, time.time(), _Stop()
+    lock = threading.Lock()
+
+    def status(code: int) -> str:
+        el = max(time.time() - t0, 1e-3)
+        return json.dumps({"session": _opt(argv, "--session", "hashcat"), "guess": {"guess_mode": 1},
+                           "status": code, "target": hashf, "progress": [n, n], "restore_point": n,
+                           "recovered_hashes": [len(lines) - len(left), len(lines)],
+                           "recovered_salts": [len(lines) - len(left), len(lines)], "rejected": 0,
+                           "devices": [{"device_id": 1, "device_name": "wpa2lab-sim", "device_type": "CPU",
+                                        "speed": int(n / el), "temp": -1, "util": 100}],
+                           "time_start": int(t0), "estimated_stop": int(t0 + el)})
+
+    if "--status-json" in argv:
+        timer = float(_opt(argv, "--status-timer", 10))
+
+        def emit():
+            while not stop.wait(timer):
+                with lock:
+                    print(status(3), flush=True)
+        threading.Thread(target=emit, daemon=True).start()
+
+    def crack(pw: bytes):
+        recs = "".join(_hit(h, pw.decode(errors="replace")) for h in left)
+        left.clear()
+        for path in (p for p in (pot, outfile) if p):
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a") as fh:
+                fh.write(recs)
+
+    wl = pos[1] if len(pos) > 1 else None
+    src = open(wl, "rb") if wl else sys.stdin.buffer
+    try:
+        for line in src:
+            w = line.rstrip(b"\r\n")
+            if w in words or n in at:
+                crack(w)
+            n += 1
+            if not left or stop:
+                break
+            if rate and not n % 1024:
+                ahead = n / rate - (time.time() - t0)
+                if ahead > 0:
+                    time.sleep(ahead)
+    finally:
+        if wl:
+            src.close()
+    if rate:
+        time.sleep(max(n / rate - (time.time() - t0), 0))
+    code = 6 if not left else 5                               # cracked / exhausted
+    if "--status-json" in argv:
+        with lock:
+            print(status(code), flush=True)
+    return 0 if not left else 1
+
+
+# ── sudo / iw ────────────────────────────────────────────────
+def sudo(argv: list[str], cfg: dict) -> int:
+    while argv and argv[0].startswith("-"):
+        argv = argv[1:]
+    if not argv:
+        return 0
+    try:
+        os.execvp(argv[0], argv)
+    except FileNotFoundError:
+        print(f"sudo: {argv[0]}: command not found", file=sys.stderr)
+        return 1
+
+
+def iw(argv: list[str], cfg: dict) -> int:
+    if argv == ["dev"]:
+        for i, name in enumerate(cfg["ifaces"]):
+            print(f"phy#{i}\n\tInterface {name}\n\t\tifindex {i + 3}\n\t\ttype "
+                  f"{'monitor' if name.endswith('mon') else 'managed'}")
+    return 0
+
+
+MAIN = {"airodump-ng": airodump, "hcxdumptool": hcxdumptool, "hcxpcapngtool": hcxpcapngtool,
+        "hashcat": hashcat, "sudo": sudo, "iw": iw}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv if argv is None else argv
+    tool = Path(argv[0]).name
+    args = argv[1:]
+    if tool not in MAIN:                                       # python simtools.py hashcat …
+        if not args or args[0] not in MAIN:
+            print(f"uso: simtools.py {{{','.join(TOOLS)}}} …", file=sys.stderr)
+            return 2
+        tool, args = args[0], args[1:]
+    return MAIN[tool](args, config())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# telemetry.py
+"""
+Telemetría de hashcat: `--status --status-json --status-timer N` hace que
+cada proceso escriba por stdout una línea JSON por intervalo. Aquí se parsea
+en streaming (un hilo lector por proceso), se agrega entre workers para la
+vista en vivo y cada muestra se guarda en un .jsonl para analizar después
+el throughput real de cada máquina.
+"""
+from __future__ import annotations
+import json, socket, threading, time
+from pathlib import Path
+from typing import Optional
+
+TIMER = 2                             # s entre muestras de hashcat
+
+
+def args(timer: int = TIMER) -> list[str]:
+    return ["--status", "--status-json", "--status-timer", str(timer)]
+
+
+def parse(line: bytes | str) -> Optional[dict]:
+    """Línea de --status-json → muestra normalizada (None si no es un estado)."""
+    try:
+        d = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(d, dict) or "devices" not in d:
+        return None
+    devs = [{"id": x.get("device_id"), "name": x.get("device_name"), "type": x.get("device_type"),
+             "speed": x.get("speed") or 0, "temp": x.get("temp"), "util": x.get("util")}
+            for x in d.get("devices") or []]
+    prog = d.get("progress") or [0, 0]
+    rec = d.get("recovered_hashes") or [0, 0]
+    return {"ts": time.time(), "status": d.get("status"),
+            "speed": sum(x["speed"] for x in devs),
+            "progress": prog[0], "total": prog[1],
+            "recovered": rec[0], "hashes": rec[1],
+            "rejected": d.get("rejected") or 0,
+            "stop": d.get("estimated_stop"),
+            "devices": devs}
+
+
+def fmt_speed(hs: float) -> str:
+    for unit in ("", "k", "M", "G"):
+        if hs < 1000 or unit == "G":
+            return f"{hs:.1f} {unit}H/s" if unit else f"{hs:.0f} H/s"
+        hs /= 1000
+    return ""
+
+
+class Telemetry:
+    """Última muestra por worker + registro .jsonl de todas."""
+
+    def __init__(self, log_path: Optional[str | Path] = None, **meta):
+        self.meta = {"host": socket.gethostname(), **meta}
+        self.latest: dict[str, dict] = {}
+        self.done: set[str] = set()
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.fh = None
+        if log_path:
+            Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+            self.fh = open(log_path, "a", buffering=1)
+
+    def add(self, worker: str, sample: dict):
+        with self.lock:
+            self.latest[worker] = sample
+            self.done.discard(worker)
+            self.samples += 1
+            if self.fh:
+                self.fh.write(json.dumps({**self.meta, "worker": worker, **sample}) + "\n")
+
+    def follow(self, proc, worker: str) -> threading.Thread:
+        """Lee el stdout de `proc` (hashcat con `args()`) en un hilo."""
+        def reader():
+            for line in proc.stdout:
+                s = parse(line)
+                if s:
+                    self.add(worker, s)
+            self.finish(worker)
+        th = threading.Thread(target=reader, daemon=True)
+        th.start()
+        return th
+
+    def reset(self):
+        """Nuevo tramo (p.ej. otro bloque interactivo): se olvidan las muestras previas."""
+        with self.lock:
+            self.latest.clear()
+            self.done.clear()
+
+    def finish(self, worker: str):
+        """El worker terminó: su última muestra ya no cuenta para la velocidad."""
+        with self.lock:
+            self.done.add(worker)
+
+    # ── agregados para la vista ──────────────────────────────
+    @property
+    def speed(self) -> float:
+        with self.lock:
+            return sum(s["speed"] for w, s in self.latest.items() if w not in self.done)
+
+    @property
+    def progress(self) -> int:
+        with self.lock:
+            return sum(s["progress"] for s in self.latest.values())
+
+    @property
+    def recovered(self) -> tuple[int, int]:
+        with self.lock:
+            vals = list(self.latest.values())
+        return (max((s["recovered"] for s in vals), default=0),
+                max((s["hashes"] for s in vals), default=0))
+
+    @property
+    def rejected(self) -> int:
+        with self.lock:
+            return sum(s["rejected"] for s in self.latest.values())
+
+    def devices(self) -> list[dict]:
+        with self.lock:
+            return [{**d, "worker": w} for w, s in self.latest.items() if w not in self.done
+                    for d in s["devices"]]
+
+    def eta(self, total: Optional[int] = None) -> Optional[float]:
+        """s restantes: con `total` (candidatos) por velocidad real; si no, lo que estime hashcat."""
+        speed = self.speed
+        if total and speed:
+            return max(0.0, (total - self.progress) / speed)
+        with self.lock:
+            stops = [s["stop"] for w, s in self.latest.items() if w not in self.done and s["stop"]]
+        return max(0.0, max(stops) - time.time()) if stops else None
+
+    def close(self):
+        if self.fh:
+            self.fh.close()
+            self.fh = None
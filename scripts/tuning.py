@@ -0,0 +1,202 @@
+# tuning.py
+"""
+Perfil de ajuste por máquina: se mide una vez (`hashcat -b -m 22000` y el
+PBKDF2 de `wpa_crypto`) y se guarda por host + versión de hashcat. El perfil
+fija el workload (-w), el lote de stdin y el nº de workers, y da la velocidad
+con la que estimar la ETA de un trabajo antes de lanzarlo.
+
+En modo interactivo el bloque se ajusta al ritmo medido para que cada uno
+dure ~N s; cada bloque (candidatos, s) queda en el historial del perfil y
+sirve de punto de partida a la siguiente sesión.
+"""
+from __future__ import annotations
+import json, os, re, shutil, socket, subprocess, time
+from pathlib import Path
+from typing import Optional
+
+import candidates, crack_engine, wpa_crypto
+
+CACHE = Path(__file__).resolve().parent.parent / "tuning.json"
+BLOCK_S = 30                          # s objetivo por bloque interactivo
+BATCH_S = 0.05                        # s de trabajo por lote escrito en stdin
+GPU_HS = 50_000                       # por encima, dispositivo dedicado → -w 3
+HISTORY = 50                          # bloques recordados por perfil
+UNITS = {"": 1, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12}
+
+
+def version() -> Optional[str]:
+    try:
+        out = subprocess.run([crack_engine.HASHCAT, "--version"], capture_output=True,
+                             text=True, timeout=30).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.splitlines()[0] if out else None
+
+
+def parse_bench(text: str) -> dict[int, float]:
+    """
+    Velocidad (H/s) por dispositivo. Acepta --machine-readable
+    (`disp:modo:…:H/s`) y la salida humana (`Speed.#1….: 123.4 kH/s`).
+    """
+    out: dict[int, float] = {}
+    for line in text.splitlines():
+        f = line.strip().split(":")
+        if len(f) >= 3 and f[0].isdigit() and f[1] == "22000":
+            try:
+                out[int(f[0])] = float(f[-1])
+            except ValueError:
+                pass
+            continue
+        m = re.match(r"Speed\.#(\d+)\.*:\s*([\d.]+)\s*([kMGT]?)H/s", line.strip())
+        if m:
+            out[int(m.group(1))] = float(m.group(2)) * UNITS[m.group(3)]
+    return out
+
+
+def bench_hashcat(timeout: float = 600) -> dict[int, float]:
+    try:
+        p = subprocess.run([crack_engine.HASHCAT, "-b", "-m", "22000", "--machine-readable", "--quiet"],
+                           capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    return parse_bench(p.stdout)
+
+
+def bench_cpu(seconds: float = 0.5) -> float:
+    """PMK/s del motor propio (`wpa_crypto`, un hilo) × cores disponibles."""
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        wpa_crypto.pmk(b"password%d" % n, b"essid")
+        n += 1
+    return n / (time.perf_counter() - t0) * len(os.sched_getaffinity(0))
+
+
+def _clamp(v: float, lo: int, hi: int) -> int:
+    return int(max(lo, min(hi, v)))
+
+
+def build(devices: dict[int, float], cpu: float, ver: Optional[str]) -> dict:
+    speed = sum(devices.values())
+    dedicated = [d for d, s in devices.items() if s >= GPU_HS]
+    return {
+        "host": socket.gethostname(), "hashcat": ver, "ts": time.time(),
+        "devices": {str(d): s for d, s in devices.items()},
+        "speed": speed, "cpu_engine": cpu,
+        "workload": 3 if dedicated else 2,
+        # un worker por dispositivo dedicado (cada uno con su -d)
+        "workers": max(1, len(dedicated)),
+        "device_groups": [str(d) for d in dedicated] if len(dedicated) > 1 else [],
+        "batch": _clamp(speed * BATCH_S, 1 << 12, 1 << 20) if speed else candidates.BATCH,
+    }
+
+
+def _key(ver: Optional[str]) -> str:
+    return f"{socket.gethostname()}|{ver or '?'}"
+
+
+def _load() -> dict:
+    try:
+        return json.loads(CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(data: dict):
+    tmp = CACHE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=1))
+    os.replace(tmp, CACHE)
+
+
+def _binary() -> Optional[list]:
+    """Ruta, tamaño y mtime del ejecutable de hashcat: cambia si se actualiza."""
+    path = shutil.which(crack_engine.HASHCAT)
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    return [path, st.st_size, st.st_mtime_ns] if st else None
+
+
+def cached() -> Optional[dict]:
+    """
+    Perfil guardado para este host y este mismo binario de hashcat, sin
+    lanzar `hashcat --version` (None si no lo hay o el binario cambió).
+    """
+    host, binary = socket.gethostname(), _binary()
+    for prof in _load().values():
+        if prof.get("host") == host and prof.get("binary") == binary:
+            return prof
+    return None
+
+
+def profile(force: bool = False, on_probe=None) -> dict:
+    """Perfil de la caché o, la primera vez (o con `force`), medido ahora."""
+    if not force and (prof := cached()) is not None:
+        return prof
+    ver = version()
+    data = _load()
+    key = _key(ver)
+    if not force and key in data:                 # misma versión, otro binario
+        data[key]["binary"] = _binary()
+        _save(data)
+        return data[key]
+    if on_probe:
+        on_probe()
+    prof = build(bench_hashcat() if ver else {}, bench_cpu(), ver)
+    prof["binary"] = _binary()
+    prof["history"] = data.get(key, {}).get("history", [])
+    data[key] = prof
+    _save(data)
+    return prof
+
+
+def eta(prof: dict, candidates_n: int, essids: int = 1) -> Optional[float]:
+    """s estimados: el coste dominante es un PBKDF2 por candidato y ESSID."""
+    speed = prof.get("speed") or prof.get("cpu_engine")
+    return candidates_n * max(1, essids) / speed if speed else None
+
+
+# ── bloques interactivos ─────────────────────────────────────
+class BlockSizer:
+    """
+    Tamaño del siguiente bloque para que dure ~`target` s. Parte del
+    historial (o de la velocidad medida) y se corrige con cada bloque; el
+    ritmo incluye el arranque de hashcat, que es justo lo que se quiere
+    amortizar. Cada ritmo se normaliza por ESSID (un PBKDF2 por par).
+    """
+
+    def __init__(self, prof: dict, target: float = BLOCK_S, essids: int = 1,
+                 lo: int = 1_000, hi: int = 50_000_000):
+        self.prof, self.target, self.essids = prof, target, max(1, essids)
+        self.lo, self.hi = lo, hi
+        rates = sorted(b["rate"] for b in prof.get("history", [])[-10:])
+        per_essid = rates[len(rates) // 2] if rates else (prof.get("speed") or prof.get("cpu_engine") or 0)
+        self.rate = per_essid / self.essids                       # cand/s con estos ESSID
+        self.blocks: list[dict] = []
+
+    def next(self) -> int:
+        n = self.rate * self.target if self.rate else self.lo * 10
+        if self.blocks:                                           # como mucho ×4 por bloque
+            n = min(n, self.blocks[-1]["n"] * 4)
+        return _clamp(n, self.lo, self.hi)
+
+    def feed(self, n: int, secs: float):
+        """Bloque de `n` candidatos terminado en `secs` s."""
+        if n <= 0 or secs <= 0:
+            return
+        rate = n / secs
+        self.rate = rate if not self.blocks else 0.5 * self.rate + 0.5 * rate
+        self.blocks.append({"n": n, "secs": round(secs, 3), "rate": rate * self.essids,
+                            "essids": self.essids, "ts": time.time()})
+
+    def save(self):
+        """Añade los bloques de esta sesión al historial del perfil."""
+        if not self.blocks:
+            return
+        data = _load()
+        key = _key(self.prof.get("hashcat"))
+        prof = data.setdefault(key, self.prof)
+        prof["history"] = (prof.get("history", []) + self.blocks)[-HISTORY:]
+        self.prof["history"] = prof["history"]
+        _save(data)
+        self.blocks = []
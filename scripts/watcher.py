@@ -0,0 +1,197 @@
+# watcher.py
+"""
+Vigilancia de directorios: inotify (ctypes, sin dependencias) y, si no está
+disponible, sondeo periódico por tamaño/mtime.
+
+Cada regla asocia un directorio + sufijo a un manejador. Los eventos se
+agrupan (debounce: un fichero sólo se procesa tras `quiet` s sin eventos) y
+los manejadores corren en un pool acotado por regla, sin lanzar dos veces el
+mismo fichero a la vez.
+"""
+from __future__ import annotations
+import ctypes, ctypes.util, os, select, struct, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+# ── inotify ──────────────────────────────────────────────────
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_Q_OVERFLOW  = 0x00004000
+IN_NONBLOCK    = os.O_NONBLOCK
+IN_CLOEXEC     = os.O_CLOEXEC
+EVENT = struct.Struct("iIII")           # wd, mask, cookie, len (+ nombre)
+
+
+class Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs: dict[int, Path] = {}
+
+    def add(self, path: Path, mask: int) -> int:
+        wd = self._add(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {path}")
+        self.dirs[wd] = Path(path)
+        return wd
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self) -> list[tuple[Optional[Path], int]]:
+        """(ruta, máscara) de los eventos pendientes; ruta None si hubo overflow."""
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        out, i = [], 0
+        while i + EVENT.size <= len(buf):
+            wd, mask, _, n = EVENT.unpack_from(buf, i)
+            name = buf[i + EVENT.size:i + EVENT.size + n].rstrip(b"\0")
+            i += EVENT.size + n
+            if mask & IN_Q_OVERFLOW:
+                out.append((None, mask))
+            elif wd in self.dirs and name:
+                out.append((self.dirs[wd] / os.fsdecode(name), mask))
+        return out
+
+    def close(self):
+        os.close(self.fd)
+
+
+def inotify_available() -> bool:
+    try:
+        Inotify().close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+# ── reglas / debounce ────────────────────────────────────────
+class Rule(NamedTuple):
+    directory: Path
+    suffix:    str | tuple[str, ...]
+    handler:   Callable[[Path], None]
+    quiet:     float = 5.0               # s sin eventos antes de procesar
+    workers:   int = 1                   # manejadores en paralelo
+
+
+class Watcher:
+    def __init__(self, rules: list[Rule], poll: Optional[float] = None,
+                 on_error: Optional[Callable[[Path, BaseException], None]] = None):
+        """`poll` = segundos entre sondeos; None → inotify si existe (sondeo si no)."""
+        self.rules = rules
+        self.on_error = on_error
+        self.mode = "poll" if poll or not inotify_available() else "inotify"
+        self.poll = poll or 2.0
+        self.pools = [ThreadPoolExecutor(r.workers, thread_name_prefix="watch") for r in rules]
+        self.due: dict[Path, tuple[float, int]] = {}      # ruta → (vence, regla)
+        self.busy: set[Path] = set()
+        self.seen: dict[Path, tuple[int, int]] = {}       # sondeo: (tamaño, mtime_ns)
+        self.lock = threading.Lock()
+        self.handled = 0
+        self._started = False
+
+    def _rule(self, path: Path) -> Optional[int]:
+        for i, r in enumerate(self.rules):
+            if path.parent == r.directory and path.name.endswith(r.suffix):
+                return i
+        return None
+
+    def touch(self, path: Path):
+        """Evento sobre `path`: (re)arma su temporizador de debounce."""
+        i = self._rule(path)
+        if i is not None:
+            self.due[path] = (time.monotonic() + self.rules[i].quiet, i)
+
+    def _scan(self):
+        for r in self.rules:
+            try:
+                entries = list(os.scandir(r.directory))
+            except OSError:
+                continue
+            for e in entries:
+                if not e.name.endswith(r.suffix):
+                    continue
+                try:
+                    st = e.stat()
+                except OSError:
+                    continue
+                p, sig = Path(e.path), (st.st_size, st.st_mtime_ns)
+                if self.seen.get(p) != sig:
+                    if p in self.seen or self._started:
+                        self.touch(p)
+                    self.seen[p] = sig
+
+    def _dispatch(self):
+        now = time.monotonic()
+        for p, (t, i) in list(self.due.items()):
+            if t > now:
+                continue
+            with self.lock:
+                if p in self.busy:
+                    continue                              # se reintenta al acabar
+                self.busy.add(p)
+            del self.due[p]
+            self.pools[i].submit(self._run, p, i)
+
+    def _run(self, path: Path, i: int):
+        try:
+            if path.exists():
+                self.rules[i].handler(path)
+                self.handled += 1
+        except Exception as e:                            # un fichero malo no para al resto
+            if self.on_error:
+                self.on_error(path, e)
+        finally:
+            with self.lock:
+                self.busy.discard(path)
+
+    def _timeout(self) -> float:
+        # lo que ya está en marcha no cuenta: vencido, haría girar el bucle
+        # cada 50 ms hasta que acabe (se reintenta en la siguiente vuelta)
+        with self.lock:
+            waits = [t for p, (t, _) in self.due.items() if p not in self.busy]
+        if not waits:
+            return self.poll
+        return max(0.05, min(waits) - time.monotonic())
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Bucle principal hasta `stop` (o Ctrl-C). Sólo reacciona a ficheros nuevos o cambiados."""
+        stop = stop or threading.Event()
+        ino = None
+        self._started = False
+        try:
+            if self.mode == "inotify":
+                ino = Inotify()
+                for r in self.rules:
+                    ino.add(r.directory, IN_CLOSE_WRITE | IN_MOVED_TO)
+            else:
+                self._scan()                              # estado inicial, sin disparar
+            self._started = True
+            while not stop.is_set():
+                if ino:
+                    try:
+                        ready, _, _ = select.select([ino], [], [], min(self._timeout(), 1.0))
+                    except InterruptedError:
+                        ready = []
+                    if ready:
+                        for path, _ in ino.read():
+                            if path is None:              # cola desbordada: releer todo
+                                self._scan()
+                            else:
+                                self.touch(path)
+                else:
+                    stop.wait(min(self._timeout(), self.poll))
+                    self._scan()
+                self._dispatch()
+        finally:
+            if ino:
+                ino.close()
+            for pool in self.pools:
+                pool.shutdown(wait=True, cancel_futures=True)
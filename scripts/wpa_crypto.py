@@ -0,0 +1,81 @@
+# wpa_crypto.py
+"""
+Comprobación de una contraseña contra una línea 22000 sin hashcat.
+
+    PMK   = PBKDF2-HMAC-SHA1(contraseña, ESSID, 4096, 32)
+    PMKID = HMAC-SHA1-128(PMK, "PMK Name" | AA | SPA)
+    PTK   = PRF-512(PMK, "Pairwise key expansion", min/max(AA,SPA) | min/max(ANonce,SNonce))
+    MIC   = HMAC-MD5 (key version 1) / HMAC-SHA1-128 (versión 2) del EAPOL con el MIC a cero
+
+El PBKDF2 (unos ms en C) se hace una vez por (ESSID, contraseña); con el PMK
+ya guardado cada verificación son unos pocos HMAC. Key version 3 (AES-CMAC,
+802.11w) no se comprueba: esas líneas quedan para hashcat.
+"""
+from __future__ import annotations
+import hashlib, hmac
+from typing import Optional
+
+import hash22000
+
+PMK_ITER = 4096
+NONCE_OFF = 17                        # SNonce dentro del frame EAPOL-Key
+MIC_OFF = 81                          # MIC (16 bytes) dentro del frame EAPOL-Key
+
+
+def pmk(password: str | bytes, essid: bytes) -> bytes:
+    pw = password.encode("utf-8", "surrogateescape") if isinstance(password, str) else password
+    return hashlib.pbkdf2_hmac("sha1", pw, essid, PMK_ITER, 32)
+
+
+def pmkid(pmk_: bytes, ap: bytes, client: bytes) -> bytes:
+    return hmac.new(pmk_, b"PMK Name" + ap + client, hashlib.sha1).digest()[:16]
+
+
+def _prf512(key: bytes, label: bytes, data: bytes) -> bytes:
+    out = b""
+    for i in range(4):
+        out += hmac.new(key, label + b"\x00" + data + bytes([i]), hashlib.sha1).digest()
+    return out[:64]
+
+
+def _nonces(anonce: bytes, mp: int, nc: int):
+    """ANonce tal cual y, si hace falta, con corrección de nonce (±nc LE/BE)."""
+    yield anonce
+    if not nc or mp & hash22000.MP_APLESS or not mp & hash22000.MP_NO_RC:
+        return
+    orders = [o for o, f in (("little", hash22000.MP_LE), ("big", hash22000.MP_BE)) if mp & f] \
+        or ["little", "big"]
+    for order in orders:
+        base = int.from_bytes(anonce[28:], order)
+        for d in range(-nc, nc + 1):
+            if d and 0 <= base + d < 1 << 32:
+                yield anonce[:28] + (base + d).to_bytes(4, order)
+
+
+def verify(h: hash22000.HashLine, pmk_: bytes, nc: int = hash22000.NC_DEFAULT) -> Optional[bool]:
+    """True/False si el PMK corresponde a la línea; None si no se puede comprobar aquí."""
+    try:
+        ap, client, mic = bytes.fromhex(h.ap), bytes.fromhex(h.client), bytes.fromhex(h.mic)
+    except ValueError:
+        return None
+    if h.kind == "01":
+        return hmac.compare_digest(pmkid(pmk_, ap, client), mic)
+    try:
+        anonce, eapol = bytes.fromhex(h.anonce), bytes.fromhex(h.eapol)
+    except ValueError:
+        return None
+    if len(eapol) < MIC_OFF + 16 + 2 or len(anonce) != 32:
+        return None
+    ver = int.from_bytes(eapol[5:7], "big") & 0x07
+    if ver not in (1, 2):
+        return None                               # AES-CMAC → hashcat
+    snonce = eapol[NONCE_OFF:NONCE_OFF + 32]
+    frame = eapol[:MIC_OFF] + b"\x00" * 16 + eapol[MIC_OFF + 16:]
+    macs = min(ap, client) + max(ap, client)
+    for an in _nonces(anonce, h.mp, nc):
+        kck = _prf512(pmk_, b"Pairwise key expansion",
+                      macs + min(an, snonce) + max(an, snonce))[:16]
+        calc = hmac.new(kck, frame, hashlib.md5 if ver == 1 else hashlib.sha1).digest()[:16]
+        if hmac.compare_digest(calc, mic):
+            return True
+    return False
@@ -0,0 +1,43 @@
+# conftest.py
+"""
+Las pruebas corren contra los simuladores de `sim/bin` (simtools): ni radio,
+ni GPU, ni hashcat de verdad. Cada prueba tiene su propio potfile.
+"""
+import subprocess, sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import simtools  # noqa: E402
+
+simtools.activate()
+
+CAPTURE = ROOT / "captures" / "bueno.pcapng"
+LAB_ESSID = "WPA2_LAB_FAKE"                # su par M1/M2 se crackea con LAB_PASSWORD
+LAB_PASSWORD = "12345678"
+
+
+@pytest.fixture(autouse=True)
+def sim_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("WPA2LAB_SIM_POTFILE", str(tmp_path / "hashcat.potfile"))
+    monkeypatch.setenv("WPA2LAB_SIM_PASSWORDS", LAB_PASSWORD)
+
+
+@pytest.fixture
+def capture(tmp_path) -> Path:
+    """Copia de la captura del laboratorio (el .idx queda en tmp_path)."""
+    dest = tmp_path / CAPTURE.name
+    dest.write_bytes(CAPTURE.read_bytes())
+    return dest
+
+
+@pytest.fixture
+def lab_hashes(tmp_path, capture) -> Path:
+    """Líneas 22000 de la captura, sacadas con el hcxpcapngtool simulado."""
+    out = tmp_path / "lab.22000"
+    subprocess.run(["hcxpcapngtool", "-o", str(out), str(capture)],
+                   check=True, stdout=subprocess.DEVNULL)
+    return out
@@ -0,0 +1,35 @@
+import channel_plan as cp
+
+LAYOUT = {1: (2, 1), 4: (3, 4), 6: (1, 1), 11: (1, 0)}          # canal: (APs, clientes por AP)
+DENSITY = {c: (a, a * k) for c, (a, k) in LAYOUT.items()}
+
+
+def _total(r: dict) -> int:
+    return r["handshakes"] + r["pmkids"]
+
+
+def test_simulate_is_deterministic():
+    a = cp.simulate(LAYOUT, cp.DwellPlanner((), DENSITY), 600, seed=3)
+    b = cp.simulate(LAYOUT, cp.DwellPlanner((), DENSITY), 600, seed=3)
+    assert a == b
+
+
+def test_fixed_hop_accounting():
+    r = cp.simulate(LAYOUT, cp.FixedHop([1, 6, 11], 5.0), 60, hop_cost=0.0)
+    assert r["hops"] == 12 and r["seconds"] == 60
+    assert r["per_min"] == _total(r)
+    assert _total(cp.simulate(LAYOUT, cp.FixedHop([2, 3], 5.0), 600)) == 0   # canales vacíos
+
+
+def test_adaptive_beats_fixed_hop():
+    seeds = range(5)
+    fixed = sum(_total(cp.simulate(LAYOUT, cp.FixedHop(cp.CHANNELS_24, 5.0), 1800, seed=s)) for s in seeds)
+    blind = sum(_total(cp.simulate(LAYOUT, cp.DwellPlanner(cp.CHANNELS_24), 1800, seed=s)) for s in seeds)
+    scan = sum(_total(cp.simulate(LAYOUT, cp.DwellPlanner((), DENSITY), 1800, seed=s)) for s in seeds)
+    assert blind > fixed and scan > fixed
+
+
+def test_planner_shares_follow_density():
+    shares = cp.DwellPlanner((), DENSITY).shares()
+    assert max(shares, key=shares.get) == 4
+    assert abs(sum(shares.values()) - 1) < 1e-9
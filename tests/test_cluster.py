@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import cluster, crack_engine, hash22000
+from conftest import LAB_ESSID, LAB_PASSWORD
+
+
+def _found(h: hash22000.HashLine, pw: str) -> str:
+    return f"{h.mic}:{h.ap}:{h.client}:{h.essid_text}:{pw}"
+
+
+@pytest.fixture
+def coord(lab_hashes):
+    return cluster.Coordinator(lab_hashes, cluster.mask_source("1234567?d"), [(0, 5), (5, 10)],
+                               lease=0.05)
+
+
+def test_lease_expires_and_is_reissued(coord):
+    first = coord.handle("w1", {"op": "lease", "rev": coord.rev})["unit"]
+    second = coord.handle("w1", {"op": "lease", "rev": coord.rev})["unit"]
+    assert {first["id"], second["id"]} == {0, 1}
+    assert "wait" in coord.handle("w2", {"op": "lease", "rev": coord.rev})
+    time.sleep(0.1)                                    # sin latidos: vencen los dos
+    again = coord.handle("w2", {"op": "lease", "rev": coord.rev})["unit"]
+    assert again["id"] in (0, 1)
+    assert coord.reissued == 2
+
+
+def test_beat_extends_lease(coord):
+    u = coord.handle("w1", {"op": "lease", "rev": coord.rev})["unit"]["id"]
+    for _ in range(3):
+        time.sleep(0.03)
+        coord.handle("w1", {"op": "beat", "unit": u})
+    coord._expire()
+    assert u in coord.leases and coord.reissued == 0
+
+
+def test_result_is_verified(coord, lab_hashes):
+    lines = hash22000.read(lab_hashes)
+    lab = next(h for h in lines if h.essid_text == LAB_ESSID)
+    other = next(h for h in lines if h.essid_text != LAB_ESSID)
+    coord.handle("w1", {"op": "result", "unit": 0,
+                        "found": [_found(other, LAB_PASSWORD), _found(lab, "wrongpass")]})
+    assert coord.rejected == 2
+    assert other.mic in coord.remaining and lab.mic in coord.remaining
+    assert not crack_engine.cracked_path(lab_hashes).exists()
+
+    coord.handle("w1", {"op": "result", "unit": 1, "found": [_found(lab, LAB_PASSWORD)]})
+    assert lab.mic not in coord.remaining
+    assert coord.found[lab.mic] == (LAB_ESSID, LAB_PASSWORD)
+    assert crack_engine.cracked_path(lab_hashes).read_text().strip() == _found(lab, LAB_PASSWORD)
+
+
+def test_server_refuses_open_bind_without_token(coord):
+    with pytest.raises(ValueError):
+        cluster.Server(coord, ("0.0.0.0", 0))
+    coord.token = "secreto"
+    cluster.Server(coord, ("0.0.0.0", 0)).server_close()
+
+
+def test_local_run_with_simulated_hashcat(lab_hashes):
+    # el hashcat simulado da LAB_PASSWORD por buena para TODAS las líneas:
+    # sólo la de LAB_ESSID verifica, las demás se rechazan
+    st = cluster.local(lab_hashes, cluster.mask_source("1234567?d"), 1, unit=5, beat=0.2)
+    assert st["done"] == st["units"] == 2
+    assert st["found"] == 1 and st["rejected"] == 4
+    cracked = crack_engine.cracked_path(lab_hashes).read_text().splitlines()
+    assert [crack_engine.parse_found(l) for l in cracked] == [(LAB_ESSID, LAB_PASSWORD)]
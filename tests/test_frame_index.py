@@ -0,0 +1,88 @@
+import struct
+
+import frame_index, pcapng_io
+
+
+def _block(end: str, btype: int, body: bytes) -> bytes:
+    body += b"\0" * (-len(body) % 4)
+    n = 12 + len(body)
+    return struct.pack(end + "II", btype, n) + body + struct.pack(end + "I", n)
+
+
+def _section(src, end: str) -> bytes:
+    """La captura como una sección con orden de bytes `end` (sin opciones)."""
+    out = []
+    with pcapng_io.open_capture(src) as fh:
+        for bt, _, raw, e in pcapng_io.iter_blocks(fh):
+            if bt == pcapng_io.BT_SHB:
+                out.append(_block(end, bt, struct.pack(end + "IHHq", pcapng_io.BOM, 1, 0, -1)))
+            elif bt == pcapng_io.BT_IDB:
+                lt, _, snap = struct.unpack_from(e + "HHI", raw, 8)
+                out.append(_block(end, bt, struct.pack(end + "HHI", lt, 0, snap)))
+            elif bt == pcapng_io.BT_EPB:
+                iid, th, tl, cap, orig = struct.unpack_from(e + "IIIII", raw, 8)
+                out.append(_block(end, bt, struct.pack(end + "IIIII", iid, th, tl, cap, orig)
+                                  + raw[28:28 + cap]))
+    return b"".join(out)
+
+
+def _infos(path) -> list:
+    with pcapng_io.open_capture(path) as fh:
+        return [(p.linktype, pcapng_io.decode(p.linktype, p.data)) for p in pcapng_io.iter_packets(fh)]
+
+
+def test_select_and_pairs(capture):
+    idx = frame_index.build(capture)
+    assert idx.records
+    pm = idx.pmkids()
+    assert pm and all(r.pmkid and r.eapol == 1 for r in pm)
+    bssid = pm[0].bssid
+    assert all(r.bssid == bssid for r in idx.select(bssid=bssid.lower()))
+    pairs = idx.pairs()
+    assert pairs
+    for m1, m2 in pairs:
+        assert (m1.eapol, m2.eapol) == (1, 2)
+        assert (m1.bssid, m1.client, m1.replay) == (m2.bssid, m2.client, m2.replay)
+    for m2, m3 in idx.pairs(first=2, second=3):
+        assert m3.replay == m2.replay + 1
+
+
+def test_index_roundtrip_and_staleness(capture):
+    built = frame_index.build(capture)
+    assert frame_index.is_fresh(capture)
+    assert frame_index.load(capture).records == built.records
+    with open(capture, "ab") as fh:
+        fh.write(b"\0")
+    assert not frame_index.is_fresh(capture)
+
+
+def test_extract_by_seek(capture, tmp_path):
+    idx = frame_index.build(capture)
+    recs = idx.pmkids()
+    dest = tmp_path / "pmkid.pcapng"
+    assert idx.extract(recs, dest) == len(recs)
+    assert [i.pmkid for _, i in _infos(dest)] == [True] * len(recs)
+
+
+def test_multi_section_extract_keeps_byte_order(capture, tmp_path):
+    multi = tmp_path / "multi.pcapng"
+    multi.write_bytes(_section(capture, "<") + _section(capture, ">"))
+    idx = frame_index.build(multi)
+    one = len(frame_index.build(capture).records)
+    assert len(idx.records) == 2 * one
+    recs = idx.select(eapol=(1, 2))
+    dest = tmp_path / "out.pcapng"
+    assert idx.extract(recs, dest) == len(recs)
+
+    with open(dest, "rb") as fh:
+        layout = [(bt, e) for bt, _, _, e in pcapng_io.iter_blocks(fh)]
+    shbs = [e for bt, e in layout if bt == pcapng_io.BT_SHB]
+    assert shbs == ["<", ">"]
+    # cada sección: sus cabeceras y luego sus paquetes, nunca mezclados
+    second = layout.index((pcapng_io.BT_SHB, ">"))
+    assert all(e == "<" for _, e in layout[:second]) and all(e == ">" for _, e in layout[second:])
+
+    got = _infos(dest)
+    want = [x for x in _infos(multi) if x[1] and x[1].eapol in (1, 2)]
+    assert got == want
+    assert len(list(idx.frames(recs))) == len(recs)
@@ -0,0 +1,58 @@
+import hash22000
+from hash22000 import MP_LE, MP_NO_RC
+
+AP, CL, ESSID = "0000000000a1", "1111111111a1", b"NetA".hex()
+
+
+def line(kind: str, mic: str, ap: str = AP, client: str = CL, essid: str = ESSID, mp: int = 0) -> str:
+    if kind == "01":
+        return f"WPA*01*{mic}*{ap}*{client}*{essid}***{mp:02x}"
+    return f"WPA*02*{mic}*{ap}*{client}*{essid}*{'aa' * 32}*{'bb' * 99}*{mp:02x}"
+
+
+def lines(*raw: str) -> list[hash22000.HashLine]:
+    return [hash22000.parse(r) for r in raw]
+
+
+def test_parse_rejects_garbage():
+    assert hash22000.parse("WPA*03*x") is None
+    assert hash22000.parse("hola") is None
+    h = hash22000.parse(line("02", "AB" * 16, mp=0x82))
+    assert (h.kind, h.mic, h.essid_text, h.mp) == ("02", "ab" * 16, "NetA", 0x82)
+
+
+def test_triage_keeps_best_per_key_in_order():
+    ls = lines(line("02", "11" * 16, mp=MP_NO_RC),              # NetA: EAPOL sin RC
+               line("02", "22" * 16, client="1111111111b2", mp=MP_NO_RC),
+               line("01", "33" * 16),                             # NetA: PMKID, gana
+               line("02", "44" * 16, client="1111111111b2", mp=MP_NO_RC | MP_LE))
+    kept, rep = hash22000.triage(ls)
+    assert [h.mic for h in kept] == ["33" * 16, "44" * 16]
+    assert rep["before"] == 4 and rep["after"] == 2
+    assert rep["work_before"] == 17 + 17 + 1 + 9 and rep["work_after"] == 1 + 9
+    assert (rep["essids"], rep["pmkid"], rep["eapol"]) == (1, 1, 1)
+
+
+def test_triage_prefers_checked_replay_counter():
+    kept, _ = hash22000.triage(lines(line("02", "11" * 16, mp=MP_NO_RC), line("02", "22" * 16, mp=0)))
+    assert [h.mic for h in kept] == ["22" * 16]
+
+
+def test_merge_dedups_and_triages_across_files(tmp_path):
+    a, b = tmp_path / "a.22000", tmp_path / "b.22000"
+    shared = line("01", "aa" * 16)
+    a.write_text("\n".join([shared, line("02", "bb" * 16, mp=MP_NO_RC)]) + "\n")
+    b.write_text("\n".join([shared, line("01", "cc" * 16, ap="0000000000b1", essid=b"NetB".hex()),
+                            "basura"]) + "\n")
+    kept, rep = hash22000.merge([a, b])
+    assert [h.mic for h in kept] == ["aa" * 16, "cc" * 16]
+    assert (rep["files"], rep["read"], rep["passes"]) == (2, 4, 3)
+    assert (rep["before"], rep["after"], rep["essids"]) == (3, 2, 2)
+
+
+def test_lab_capture_triage(lab_hashes):
+    ls = hash22000.read(lab_hashes)
+    kept, rep = hash22000.triage(ls)
+    assert rep["before"] == len(ls) == 5
+    assert len({h.key for h in kept}) == len(kept) == rep["after"]
+    assert rep["work_after"] <= rep["work_before"]
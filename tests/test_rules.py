@@ -0,0 +1,53 @@
+import pytest
+
+import rules
+
+
+def _hashcat(rule: str, word: bytes) -> bytes:
+    """Referencia: cada operación por separado, en orden, como hashcat."""
+    for c, a, b in rules.parse(rule):
+        word = rules._op(c, a, b)(word)
+    return word
+
+
+@pytest.mark.parametrize("rule, word, expected", [
+    (":", b"password", b"password"),
+    ("c", b"password", b"Password"),
+    ("u", b"password", b"PASSWORD"),
+    ("C", b"password", b"pASSWORD"),
+    ("t", b"PassWord", b"pASSwORD"),
+    ("r", b"password", b"drowssap"),
+    ("d", b"pass1234", b"pass1234pass1234"),
+    ("T0", b"password", b"Password"),
+    ("$1$2$3", b"password", b"password123"),
+    ("^1", b"password", b"1password"),
+    ("c $1 $2", b"password", b"Password12"),
+    ("sa4 s4b", b"bananapass", b"bbnbnbpbss"),
+    ("sab sac", b"bananapass", b"bbnbnbpbss"),
+    ("sab sba", b"bananapass", b"aananapass"),
+    ("sab scd", b"bananacats", b"bbnbnbdbts"),
+    ("sa4se3so0si1", b"passwordie", b"p4ssw0rd13"),
+    ("c sa4se3so0si1", b"adminpass", b"Adm1np4ss"),
+])
+def test_rule_semantics(rule, word, expected):
+    assert rules.apply([rules.Program(rule)], word + b"\n") == expected + b"\n"
+    assert _hashcat(rule, word) == expected
+
+
+@pytest.mark.parametrize("rule", rules.LAB_RULES + ["sa4 s4b", "sab sac", "sab sba", "s12 s23 s31", "l sa@ $1"])
+def test_block_matches_rule_by_rule(rule):
+    words = [b"password", b"bananapass", b"Admin2024", b"qwertyuiop", b"abcabc12", b"l33tsp3ak"]
+    got = rules.apply([rules.Program(rule)], b"\n".join(words) + b"\n", dedup=False)
+    want = [w for w in (_hashcat(rule, w) for w in words) if 8 <= len(w) <= 63]
+    assert got == b"".join(w + b"\n" for w in want)
+
+
+def test_wpa_length_filter_and_dedup():
+    progs = [rules.Program(":"), rules.Program("l")]
+    out = rules.apply(progs, b"short\nPassword\npassword\n")
+    assert out.split(b"\n")[:-1] == [b"Password", b"password"]
+
+
+def test_unsupported_rule_is_skipped():
+    progs, skipped = rules.load(["c", "X01", "$1"])
+    assert [p.rule for p in progs] == ["c", "$1"] and skipped == 1